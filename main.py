@@ -1,189 +1,300 @@
-import sys
-import json
 import os
 import datetime
 import shutil
+import time
+import itertools
+import queue
+import multiprocessing
+import threading
+import io
+import csv
+from collections import Counter, deque
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox, filedialog
 from tkinter.scrolledtext import ScrolledText
 from PIL import Image, ImageDraw, ImageTk
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-
-# Constants
-DATA_DIR = 'vehicle_data'
-BACKUP_DIR = 'vehicle_backups'
-LOG_FILE = 'app_log.txt'
-
-def ensure_dirs():
-    """Create necessary directories if they don't exist"""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    os.makedirs(BACKUP_DIR, exist_ok=True)
-
-def save_json(filename, data):
-    """Save data to JSON file with error handling"""
-    try:
-        with open(os.path.join(DATA_DIR, filename), 'w', encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        log_error(f"Error saving {filename}: {str(e)}")
-        messagebox.showerror("Σφάλμα αποθήκευσης δεδομένων", f"Σφάλμα αρχείου: {str(e)}")
-        return False
+from vehicle_core import (
+    BACKUP_DIR, BACKUP_LEVELS, COLLECTION_FILES, DATA_DIR, EXPORT_COLUMNS, INCREMENTAL_DIR,
+    KTEO_STATUS_LABELS, SIGNATURE_LINE_WIDTH, apply_csv_import, apply_merge, BackupStore,
+    BookingIndex, ComplianceEngine, csv_import_report, DataDirWatcher, day_label, decode_strokes,
+    describe_conflicts, describe_violation, diff_by_id, draw_stroke, ensure_dirs, export_rows,
+    ExportCancelled, filter_services, filter_trips, finish_staging, FleetAggregates,
+    kteo_status_batch, kteo_status_for_days, KteoScheduler, load_json, log_error, merge_report,
+    migrate_signature_files, month_bounds, open_backup_source, open_staging, parse_date_ordinal,
+    perf, plan_csv_import, plan_merge, plan_verify, render_fleet_report, render_strokes,
+    render_trip_pdf, render_trips_pdf, save_json, search_records, ServiceTimeline,
+    set_error_handler, set_reload_handler, SignatureStore, simplify_stroke, stage_zip,
+    strokes_from_image, swap_data_dir, timed, trip_interval, trip_pdf_name, validate_date,
+    validate_time, verify_members, verify_report, version_is_current, WriteConflict, zip_backup
+)
+
+try:
+    import openpyxl
+except ImportError:  # Optional: only needed for XLSX export
+    openpyxl = None
+
+MAX_TIMER_MS = 24 * 60 * 60 * 1000  # Longest single after() sleep
+WATCH_INTERVAL_MS = 500  # How often the data folder watcher is read
+INCREMENTAL_RELOAD_MAX = 500  # Changed rows above which a full reload is cheaper
 
-def load_json(filename):
-    """Load data from JSON file with error handling"""
-    try:
-        filepath = os.path.join(DATA_DIR, filename)
-        if os.path.exists(filepath):
-            with open(filepath, encoding="utf-8") as f:
-                data = json.load(f)
-                
-                # Migrate old data format if needed
-                if filename == 'drivers.json' and data and 'id' not in data[0]:
-                    for i, item in enumerate(data):
-                        item['id'] = i + 1
-                    save_json(filename, data)
-                    
-                elif filename == 'vehicles.json' and data and 'id' not in data[0]:
-                    for i, item in enumerate(data):
-                        item['id'] = i + 1
-                    save_json(filename, data)
-                    
-                elif filename == 'trips.json' and data and 'id' not in data[0]:
-                    for i, item in enumerate(data):
-                        item['id'] = i + 1
-                    save_json(filename, data)
-                    
-                elif filename == 'services.json' and data and 'id' not in data[0]:
-                    for i, item in enumerate(data):
-                        item['id'] = i + 1
-                    save_json(filename, data)
-                
-                return data
-        return []
-    except Exception as e:
-        log_error(f"Error loading {filename}: {str(e)}")
-        messagebox.showerror("Σφάλμα φόρτωσης δεδομένων", f"Σφάλμα αρχείου: {str(e)}")
-        return []
-
-def log_error(message):
-    """Log errors to file with timestamp"""
-    try:
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(LOG_FILE, 'a', encoding="utf-8") as f:
-            f.write(f"[{timestamp}] {message}\n")
-    except:
-        pass  # Avoid crashing if logging fails
-
-def backup_all_data(destination_folder):
-    """Backup data to specified folder with error handling"""
-    try:
-        os.makedirs(destination_folder, exist_ok=True)
-        for fname in os.listdir(DATA_DIR):
-            src = os.path.join(DATA_DIR, fname)
-            if os.path.isfile(src):
-                dst = os.path.join(destination_folder, fname)
-                shutil.copy2(src, dst)
-        return True
-    except Exception as e:
-        log_error(f"Backup error: {str(e)}")
-        messagebox.showerror("Σφάλμα Backup", f"Σφάλμα κατά τη δημιουργίας backup: {str(e)}")
-        return False
+class SignaturePad(tk.Canvas):
+    """Signature input that coalesces motion events into in-place polyline updates.
 
-def import_all_data(source_folder):
-    """Import data from backup folder with error handling"""
-    try:
-        imported = []
-        for fname in os.listdir(source_folder):
-            src = os.path.join(source_folder, fname)
-            if os.path.isfile(src) and fname.endswith('.json'):
-                dst = os.path.join(DATA_DIR, fname)
-                shutil.copy2(src, dst)
-                imported.append(fname)
-        return imported
-    except Exception as e:
-        log_error(f"Import error: {str(e)}")
-        messagebox.showerror("Σφάλμα Εισαγωγής", f"Σφάλμα κατά την εισαγωγή δεδομένων: {str(e)}")
-        return []
-
-def validate_date(date_str):
-    """Validate date format (YYYY-MM-DD)"""
-    try:
-        datetime.datetime.strptime(date_str, '%Y-%m-%d')
-        return True
-    except ValueError:
-        return False
+    Motion events only append to a buffer; a flush at most every FLUSH_MS
+    extends the current canvas line item with everything buffered, and the
+    PIL raster is drawn once when the stroke ends.
+    """
 
-def validate_time(time_str):
-    """Validate time format (HH:MM)"""
-    try:
-        datetime.datetime.strptime(time_str, '%H:%M')
-        return True
-    except ValueError:
-        return False
+    FLUSH_MS = 16  # About one frame
+    SEGMENT_POINTS = 256  # Start a new canvas item so coords() updates stay short
 
-class SignaturePad(tk.Canvas):
     def __init__(self, master, width=400, height=180, **kwargs):
         super().__init__(master, width=width, height=height, bg='white', 
                          bd=0, highlightthickness=1, relief='ridge', **kwargs)
         self.width = width
         self.height = height
-        self.image = Image.new('RGB', (width, height), 'white')
+        self.image = Image.new('L', (width, height), 255)
         self.draw = ImageDraw.Draw(self.image)
         self.last_point = None
+        self.strokes = []  # (width, points) in canvas coordinates
+        self.current = None
+        self.segment = None  # Canvas id and flat coords of the polyline being drawn
+        self.segment_coords = []
+        self.pending = []
+        self.pending_since = None
+        self.flush_job = None
+        self.latency = deque(maxlen=512)  # ms from a motion event to its point being on screen
+        self.dirty = False  # Changed since it was last loaded or reset
         self.bind("<Button-1>", self.start_draw)
         self.bind("<B1-Motion>", self.draw_motion)
         self.bind("<ButtonRelease-1>", self.end_draw)
         self.tk_image = None  # Keep reference to prevent garbage collection
 
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def _clamp(self, event):
+        return (min(max(event.x, 0), self.width - 1), min(max(event.y, 0), self.height - 1))
+
     def start_draw(self, event):
-        self.last_point = (event.x, event.y)
+        self.last_point = self._clamp(event)
+        self.current = [self.last_point]
+        self.new_segment(self.last_point)
+        self.dirty = True
+
+    def new_segment(self, point):
+        self.segment_coords = [point[0], point[1], point[0], point[1]]
+        self.segment = self.create_line(*self.segment_coords, fill='#222', width=SIGNATURE_LINE_WIDTH,
+                                        capstyle=tk.ROUND, joinstyle=tk.ROUND)
 
     def draw_motion(self, event):
-        if self.last_point:
-            self.create_line(self.last_point[0], self.last_point[1], event.x, event.y, 
-                            fill='#222', width=2)
-            self.draw.line([self.last_point, (event.x, event.y)], fill='#222', width=2)
-            self.last_point = (event.x, event.y)
+        if not self.last_point:
+            return
+        point = self._clamp(event)
+        if point == self.last_point:
+            return
+        self.last_point = point
+        self.current.append(point)
+        if not self.pending:
+            self.pending_since = time.perf_counter()
+        self.pending.append(point)
+        if self.flush_job is None:
+            self.flush_job = self.after(self.FLUSH_MS, self.flush)
+
+    def flush(self):
+        """Move buffered points onto the canvas in one coords() call per segment"""
+        self.flush_job = None
+        if not self.pending or self.segment is None:
+            self.pending = []
+            return
+        for x, y in self.pending:
+            if len(self.segment_coords) >= 2 * self.SEGMENT_POINTS:
+                self.coords(self.segment, *self.segment_coords)
+                self.new_segment((self.segment_coords[-2], self.segment_coords[-1]))
+            self.segment_coords += (x, y)
+        self.coords(self.segment, *self.segment_coords)
+        self.latency.append((time.perf_counter() - self.pending_since) * 1000)
+        self.pending = []
 
     def end_draw(self, event):
+        if self.flush_job is not None:
+            self.after_cancel(self.flush_job)
+        self.flush()
+        if self.current:
+            stroke = (SIGNATURE_LINE_WIDTH, simplify_stroke(self.current))
+            self.strokes.append(stroke)
+            draw_stroke(self.draw, *stroke)
+        self.current = None
         self.last_point = None
+        self.segment = None
+
+    def latency_stats(self):
+        """(samples, median ms, 95th percentile ms, max ms) of recent flushes"""
+        samples = sorted(self.latency)
+        if not samples:
+            return (0, 0.0, 0.0, 0.0)
+        return (len(samples), samples[len(samples) // 2],
+                samples[min(len(samples) - 1, int(len(samples) * 0.95))], samples[-1])
 
     def clear(self):
+        if self.flush_job is not None:
+            self.after_cancel(self.flush_job)
+            self.flush_job = None
+        self.pending = []
+        self.segment = None
         self.delete('all')
-        self.image = Image.new('RGB', (self.width, self.height), 'white')
+        self.image = Image.new('L', (self.width, self.height), 255)
+        self.draw = ImageDraw.Draw(self.image)
+        self.strokes = []
+        self.dirty = True
+
+    def reset(self):
+        """Clear for a new record"""
+        self.clear()
+        self.dirty = False
+
+    def save_to(self, store):
+        """Store the signature; returns its digest, or None when blank"""
+        return store.put(self.strokes, self.size) if self.strokes else None
+
+    def set_strokes(self, strokes, image=None):
+        self.reset()
+        self.strokes = list(strokes)
+        if image is None:
+            image = render_strokes(self.strokes, self.size)
+        self.image = image.convert('L')
         self.draw = ImageDraw.Draw(self.image)
+        self.tk_image = ImageTk.PhotoImage(self.image)
+        self.create_image(0, 0, image=self.tk_image, anchor='nw')
 
-    def save(self, filename):
+    def load_trip(self, trip, data_dir):
+        """Show a trip's signature; legacy PNGs are vectorized on the way in"""
         try:
-            self.image.save(filename)
-            return True
-        except Exception as e:
-            log_error(f"Signature save error: {str(e)}")
-            return False
-
-    def load(self, filename):
-        if os.path.exists(filename):
-            try:
-                img = Image.open(filename)
-                self.image.paste(img)
-                self.draw = ImageDraw.Draw(self.image)
-                self.delete('all')
-                self.tk_image = ImageTk.PhotoImage(img)
-                self.create_image(0, 0, image=self.tk_image, anchor='nw')
+            if trip.get('signature_ref'):
+                store = SignatureStore(data_dir)
+                _, strokes = store.strokes(trip['signature_ref'])
+                with Image.open(io.BytesIO(store.png(trip['signature_ref']))) as img:
+                    self.set_strokes(strokes, img)
                 return True
-            except Exception as e:
-                log_error(f"Signature load error: {str(e)}")
+            if trip.get('signature_strokes'):
+                _, strokes = decode_strokes(trip['signature_strokes'])
+                self.set_strokes(strokes)
+                return True
+            if trip.get('signature'):
+                path = os.path.join(data_dir, trip['signature'])
+                if os.path.exists(path):
+                    with Image.open(path) as img:
+                        self.set_strokes(strokes_from_image(img))
+                    return True
+        except Exception as e:
+            log_error(f"Signature load error: {str(e)}")
+        self.reset()
         return False
 
+class ChunkedTableLoader:
+    """Populate a Treeview in time-sliced batches so the window stays responsive"""
+
+    BATCH_SIZE = 200
+
+    def __init__(self, tree, progress=None, budget_ms=15, name=None):
+        self.tree = tree
+        self.progress = progress
+        self.name = name  # Full loads are timed as "table:<name>" when set
+        self.budget = budget_ms / 1000.0
+        self.generation = 0
+        self.job = None
+        self.rows = None
+        self.total = 0
+        self.done = 0
+
+    def load(self, rows, total=0):
+        """Replace the table contents with rows of (iid, values, tags).
+
+        A load that is still running is cancelled first, so the newest
+        reload always wins.
+        """
+        self.cancel()
+        self.generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self.rows = iter(rows)
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+        self._step(self.generation)
+
+    def update(self, rows, removed=()):
+        """Change or append individual rows of (iid, values, tags) and delete removed iids"""
+        for iid in removed:
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+        for iid, values, tags in rows:
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values, tags=tags)
+            else:
+                self._insert(iid, values, tags)
+
+    def cancel(self):
+        """Stop a running load, leaving the rows inserted so far"""
+        if self.job is not None:
+            self.tree.after_cancel(self.job)
+            self.job = None
+        self.rows = None
+        self._hide_progress()
+
+    @property
+    def running(self):
+        return self.rows is not None
+
+    def _step(self, generation):
+        self.job = None
+        if generation != self.generation or self.rows is None:
+            return
+
+        deadline = time.perf_counter() + self.budget
+        while True:
+            batch = list(itertools.islice(self.rows, self.BATCH_SIZE))
+            for iid, values, tags in batch:
+                self._insert(iid, values, tags)
+            self.done += len(batch)
+
+            if len(batch) < self.BATCH_SIZE:
+                self.rows = None
+                self._hide_progress()
+                if self.name:
+                    perf.record(f"table:{self.name}", time.perf_counter() - self.started)
+                return
+            if time.perf_counter() >= deadline:
+                break
+
+        self._show_progress()
+        self.job = self.tree.after(1, self._step, generation)
+
+    def _insert(self, iid, values, tags):
+        try:
+            self.tree.insert('', 'end', iid=iid, values=values, tags=tags)
+        except tk.TclError:
+            # Duplicate IDs in hand-edited data files; fall back to an automatic iid
+            self.tree.insert('', 'end', values=values, tags=tags)
+
+    def _show_progress(self):
+        if self.progress is None:
+            return
+        self.progress['maximum'] = max(self.total, 1)
+        self.progress['value'] = self.done
+        self.progress.grid()
+
+    def _hide_progress(self):
+        if self.progress is not None:
+            self.progress.grid_remove()
+
 class VehicleManager(tk.Tk):
     def __init__(self):
         super().__init__()
+        set_error_handler(messagebox.showerror)
+        # Saves merge in other seats' changes, or take theirs on a conflict
+        set_reload_handler(lambda fname: self.after_idle(self.collection_merged, fname))
         ensure_dirs()
         
         # Application setup
@@ -206,17 +317,43 @@ class VehicleManager(tk.Tk):
         self.trips = load_json('trips.json')
         self.services = load_json('services.json')
         
+        # Derived indexes over the data
+        self.aggregates = FleetAggregates()
+        self.kteo_scheduler = KteoScheduler()
+        self.bookings = BookingIndex()
+        self.compliance = ComplianceEngine()
+        self.service_timeline = ServiceTimeline()
+        self.signatures = SignatureStore(DATA_DIR)
+        self.kteo_job = None
+        self.kteo_alerted = False
+        self.rebuild_indexes()
+        
         # State variables
         self.edit_driver_row = None
         self.edit_vehicle_row = None
         self.edit_trip_row = None
         self.edit_service_row = None
+        # Copies of the records being edited, to find them again after a reload
+        self.edit_driver_record = None
+        self.edit_vehicle_record = None
+        self.edit_trip_record = None
+        self.edit_service_record = None
+        self.table_loaders = {}
+        self.dashboard_dirty = True
+        self.pdf_job = None
+        self.table_export_job = None
+        self.backup_job = None
+        self.verify_job = None
         
         # Create tabs
         self.create_tabs()
         
-        # Start periodic KΤΕΟ check
-        self.after(1000, self.check_kteo_dates)
+        # First KΤΕΟ check; later checks are scheduled for the next status change
+        self.kteo_job = self.after(1000, self.check_kteo_dates)
+        
+        # Pick up changes other seats, scripts or restores make to the data folder
+        self.watcher = DataDirWatcher(DATA_DIR)
+        self.after(WATCH_INTERVAL_MS, self.poll_watcher)
 
     def create_tabs(self):
         """Create all application tabs"""
@@ -225,10 +362,12 @@ class VehicleManager(tk.Tk):
         self.trip_tab()
         self.service_tab()
         self.search_tab()
+        self.dashboard_tab()
         self.backup_tab()
         self.about_tab()
+        self.diagnostics_tab()
 
-    def create_scrollable_table(self, parent, columns, height=10):
+    def create_scrollable_table(self, parent, columns, height=10, name=None):
         """Create a frame with treeview and scrollbars"""
         frame = ttk.Frame(parent)
         frame.pack(fill='both', expand=True, padx=8, pady=6)
@@ -246,6 +385,12 @@ class VehicleManager(tk.Tk):
         vsb.grid(row=0, column=1, sticky="ns")
         hsb.grid(row=1, column=0, sticky="ew")
         
+        # Progress indicator for chunked loading, hidden until needed
+        progress = ttk.Progressbar(frame, orient="horizontal", mode="determinate")
+        progress.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(4, 0))
+        progress.grid_remove()
+        self.table_loaders[tree] = ChunkedTableLoader(tree, progress, name=name)
+        
         # Configure grid weights
         frame.grid_columnconfigure(0, weight=1)
         frame.grid_rowconfigure(0, weight=1)
@@ -275,7 +420,8 @@ class VehicleManager(tk.Tk):
         self.driver_add_btn.pack(side='left', padx=5)
         
         # Table
-        self.driver_table = self.create_scrollable_table(frame, ("id", "Όνομα", "Επεξεργασία", "Διαγραφή"))
+        self.driver_table = self.create_scrollable_table(frame, ("id", "Όνομα", "Επεξεργασία", "Διαγραφή"),
+                                                         name="drivers")
         self.driver_table.heading("id", text="ID", anchor='center')
         self.driver_table.heading("Όνομα", text="Όνομα Οδηγού", anchor='w')
         self.driver_table.heading("Επεξεργασία", text="Επεξεργασία", anchor='center')
@@ -339,22 +485,27 @@ class VehicleManager(tk.Tk):
                 self.update_driver_comboboxes()
 
     def refresh_driver_table(self):
-        self.driver_table.delete(*self.driver_table.get_children())
-        for driver in self.drivers:
-            self.driver_table.insert('', 'end', values=(
-                driver['id'], 
-                driver['name'], 
-                "✏️ Επεξεργασία", 
-                "🗑️ Διαγραφή"
-            ))
+        drivers = list(self.drivers)
+        self.table_loaders[self.driver_table].load(map(self.driver_row, drivers), len(drivers))
+
+    def driver_row(self, driver):
+        return str(driver['id']), (
+            driver['id'], 
+            driver['name'], 
+            "✏️ Επεξεργασία", 
+            "🗑️ Διαγραφή"
+        ), ()
 
     def start_edit_driver(self, row):
         self.edit_driver_row = row
+        self.edit_driver_record = dict(self.drivers[row])
         self.driver_name.delete(0, 'end')
         self.driver_name.insert(0, self.drivers[row]['name'])
         self.driver_add_btn.config(text="💾 Ενημέρωση", command=self.finish_edit_driver)
 
     def finish_edit_driver(self):
+        if not self.check_edit('drivers'):
+            return
         row = self.edit_driver_row
         name = self.driver_name.get().strip()
         if not name:
@@ -371,6 +522,7 @@ class VehicleManager(tk.Tk):
             self.driver_name.delete(0, 'end')
             self.refresh_driver_table()
             self.edit_driver_row = None
+            self.edit_driver_record = None
             self.driver_add_btn.config(text="➕ Καταχώρηση", command=self.add_driver)
             self.update_driver_comboboxes()
             messagebox.showinfo("Επιτυχία", "Τα στοιχεία ενημερώθηκαν επιτυχώς")
@@ -420,7 +572,7 @@ class VehicleManager(tk.Tk):
         
         # Table
         self.vehicle_table = self.create_scrollable_table(frame, 
-            ("id", "Πινακίδα", "ΚΤΕΟ πέρασε", "ΚΤΕΟ επόμενο", "Κατάσταση", "Επεξεργασία", "Διαγραφή"))
+            ("id", "Πινακίδα", "ΚΤΕΟ πέρασε", "ΚΤΕΟ επόμενο", "Κατάσταση", "Επεξεργασία", "Διαγραφή"), name="vehicles")
         
         self.vehicle_table.heading("id", text="ID", anchor='center')
         self.vehicle_table.heading("Πινακίδα", text="Πινακίδα", anchor='w')
@@ -476,12 +628,14 @@ class VehicleManager(tk.Tk):
         # Generate new ID
         new_id = max([v['id'] for v in self.vehicles]) + 1 if self.vehicles else 1
             
-        self.vehicles.append({
+        vehicle = {
             'id': new_id,
             'plate': plate,
             'kteo_passed': passed,
             'kteo_next': next_
-        })
+        }
+        self.vehicles.append(vehicle)
+        self.index_vehicle(vehicle)
         
         if save_json('vehicles.json', self.vehicles):
             self.plate_input.delete(0, 'end')
@@ -506,7 +660,7 @@ class VehicleManager(tk.Tk):
     def delete_vehicle(self, row):
         plate = self.vehicles[row]['plate']
         if messagebox.askyesno("Επιβεβαίωση Διαγραφής", f"Θέλετε να διαγράψετε το όχημα {plate};"):
-            self.vehicles.pop(row)
+            self.unindex_vehicle(self.vehicles.pop(row))
             if save_json('vehicles.json', self.vehicles):
                 # Reindex IDs
                 for idx, vehicle in enumerate(self.vehicles):
@@ -516,50 +670,49 @@ class VehicleManager(tk.Tk):
                 self.update_vehicle_comboboxes()
 
     def refresh_vehicle_table(self):
-        self.vehicle_table.delete(*self.vehicle_table.get_children())
-        for vehicle in self.vehicles:
-            status = self.get_kteo_status(vehicle['kteo_next'])
-            status_text, style = self.get_status_display(status)
-            
-            self.vehicle_table.insert('', 'end', values=(
-                vehicle['id'],
-                vehicle['plate'],
-                vehicle['kteo_passed'],
-                vehicle['kteo_next'],
-                status_text,
-                "✏️ Επεξεργασία",
-                "🗑️ Διαγραφή"
-            ), tags=(style,))
+        vehicles = list(self.vehicles)
+        due = self.kteo_scheduler.due
+        statuses = kteo_status_batch([due.get(v['plate']) for v in vehicles], datetime.date.today())
+        self.table_loaders[self.vehicle_table].load(
+            (self.vehicle_row(v, status) for v, status in zip(vehicles, statuses)), len(vehicles))
+
+    def vehicle_row(self, vehicle, status=None):
+        if status is None:
+            status = self.vehicle_kteo_status(vehicle)
+        status_text, style = self.get_status_display(status)
+        
+        return str(vehicle['id']), (
+            vehicle['id'],
+            vehicle['plate'],
+            vehicle['kteo_passed'],
+            vehicle['kteo_next'],
+            status_text,
+            "✏️ Επεξεργασία",
+            "🗑️ Διαγραφή"
+        ), (style,)
 
     def get_kteo_status(self, date_next):
-        today = datetime.date.today()
-        try:
-            kteo_next = datetime.datetime.strptime(date_next, "%Y-%m-%d").date()
-            delta = (kteo_next - today).days
-            
-            if delta < 0:
-                return "expired"
-            elif delta < 15:
-                return "warning"
-            elif delta < 30:
-                return "notice"
-            else:
-                return "ok"
-        except Exception:
+        due = parse_date_ordinal(date_next)
+        if due is None:
+            return "error"
+        return kteo_status_for_days(due - datetime.date.today().toordinal())
+
+    def vehicle_kteo_status(self, vehicle):
+        """Status from the ordinal parsed when the vehicle was loaded or edited"""
+        plate = vehicle['plate']
+        if plate not in self.kteo_scheduler.due:
+            return self.get_kteo_status(vehicle['kteo_next'])
+        due = self.kteo_scheduler.due[plate]
+        if due is None:
             return "error"
+        return kteo_status_for_days(due - datetime.date.today().toordinal())
 
     def get_status_display(self, status):
-        status_map = {
-            "expired": ("ΛΗΓΜΕΝΟ", "danger"),
-            "warning": ("ΠΡΟΣΕΧΩΣ", "warning"),
-            "notice": ("ΚΟΝΤΑ", "info"),
-            "ok": ("ΕΝΤΑΞΕΙ", "success"),
-            "error": ("ΛΑΘΟΣ", "danger")
-        }
-        return status_map.get(status, ("ΑΓΝΩΣΤΟ", "secondary"))
+        return KTEO_STATUS_LABELS.get(status, ("ΑΓΝΩΣΤΟ", "secondary"))
 
     def start_edit_vehicle(self, row):
         self.edit_vehicle_row = row
+        self.edit_vehicle_record = dict(self.vehicles[row])
         v = self.vehicles[row]
         self.plate_input.delete(0, 'end')
         self.plate_input.insert(0, v['plate'])
@@ -570,6 +723,8 @@ class VehicleManager(tk.Tk):
         self.vehicle_add_btn.config(text="💾 Ενημέρωση", command=self.finish_edit_vehicle)
 
     def finish_edit_vehicle(self):
+        if not self.check_edit('vehicles'):
+            return
         row = self.edit_vehicle_row
         plate = self.plate_input.get().strip().upper()
         passed = self.kteo_passed.get().strip()
@@ -593,32 +748,65 @@ class VehicleManager(tk.Tk):
             messagebox.showwarning("Duplicate", "Η πινακίδα υπάρχει ήδη στο σύστημα")
             return
             
+        self.unindex_vehicle(self.vehicles[row])
         self.vehicles[row]['plate'] = plate
         self.vehicles[row]['kteo_passed'] = passed
         self.vehicles[row]['kteo_next'] = next_
+        self.index_vehicle(self.vehicles[row])
         
         if save_json('vehicles.json', self.vehicles):
             self.plate_input.delete(0, 'end')
             self.refresh_vehicle_table()
             self.edit_vehicle_row = None
+            self.edit_vehicle_record = None
             self.vehicle_add_btn.config(text="➕ Καταχώρηση", command=self.add_vehicle)
             self.update_vehicle_comboboxes()
             messagebox.showinfo("Επιτυχία", "Τα στοιχεία ενημερώθηκαν επιτυχώς")
 
     def check_kteo_dates(self):
+        """Handle KΤΕΟ status crossings that are due, then sleep until the next one"""
+        self.kteo_job = None
+        changed = self.kteo_scheduler.pop_due(datetime.date.today())
+        
+        if self.kteo_alerted:
+            alert_plates = [p for p, (_, new) in changed.items() if new in ("expired", "warning")]
+        else:
+            # First check after startup reports every vehicle needing attention
+            alert_plates = [p for p, status in self.kteo_scheduler.status.items() if status in ("expired", "warning")]
+            self.kteo_alerted = True
+        
         alerts = []
-        for v in self.vehicles:
-            status = self.get_kteo_status(v['kteo_next'])
-            if status == "expired":
-                alerts.append(f"🚨 Όχημα {v['plate']} έχει ληγμένο ΚΤΕΟ!")
-            elif status == "warning":
-                alerts.append(f"⚠️ Όχημα {v['plate']} χρειάζεται ΚΤΕΟ εντός 15 ημερών!")
+        for plate in alert_plates:
+            if self.kteo_scheduler.status[plate] == "expired":
+                alerts.append(f"🚨 Όχημα {plate} έχει ληγμένο ΚΤΕΟ!")
+            else:
+                alerts.append(f"⚠️ Όχημα {plate} χρειάζεται ΚΤΕΟ εντός 15 ημερών!")
+        
+        if changed:
+            by_plate = {v['plate']: v for v in self.vehicles}
+            for plate, (_, status) in changed.items():
+                self.aggregates.set_vehicle_status(plate, status)
+                vehicle = by_plate.get(plate)
+                if vehicle is not None and self.vehicle_table.exists(str(vehicle['id'])):
+                    iid, values, tags = self.vehicle_row(vehicle, status)
+                    self.vehicle_table.item(iid, values=values, tags=tags)
+            self.mark_dashboard_dirty()
+        
+        self.schedule_kteo_check()
         
         if alerts:
             messagebox.showwarning("Ειδοποίηση ΚΤΕΟ", "\n".join(alerts))
+
+    def schedule_kteo_check(self):
+        """Arm the KΤΕΟ timer for the next crossing, or the next day rollover"""
+        if self.kteo_job is not None:
+            self.after_cancel(self.kteo_job)
         
-        self.refresh_vehicle_table()
-        self.after(60 * 60 * 1000, self.check_kteo_dates)  # Check every hour
+        today = datetime.date.today()
+        wake = self.kteo_scheduler.next_crossing() or today.toordinal() + 1
+        wake_at = datetime.datetime.combine(datetime.date.fromordinal(max(wake, today.toordinal() + 1)), datetime.time.min)
+        delay_ms = int((wake_at - datetime.datetime.now()).total_seconds() * 1000) + 1000
+        self.kteo_job = self.after(min(max(delay_ms, 1000), MAX_TIMER_MS), self.check_kteo_dates)
 
     def trip_tab(self):
         frame = ttk.Frame(self.notebook)
@@ -708,7 +896,7 @@ class VehicleManager(tk.Tk):
         table_frame.pack(fill='both', expand=True, padx=12, pady=8)
         
         self.trip_table = self.create_scrollable_table(table_frame, 
-            ("id", "Οδηγός", "Όχημα", "Αναχώρηση", "Άφιξη", "Επεξεργασία", "Διαγραφή"))
+            ("id", "Οδηγός", "Όχημα", "Αναχώρηση", "Άφιξη", "Επεξεργασία", "Διαγραφή"), name="trips")
         
         self.trip_table.heading("id", text="ID", anchor='center')
         self.trip_table.heading("Οδηγός", text="Οδηγός", anchor='w')
@@ -734,7 +922,16 @@ class VehicleManager(tk.Tk):
         export_frame = ttk.Frame(frame)
         export_frame.pack(pady=8)
         export_btn = ttk.Button(export_frame, text="⤴️ Εξαγωγή σε PDF", command=self.export_trip_pdf)
-        export_btn.pack()
+        export_btn.pack(side='left', padx=5)
+        batch_btn = ttk.Button(export_frame, text="📚 Μαζική Εξαγωγή PDF", command=self.open_batch_pdf_dialog)
+        batch_btn.pack(side='left', padx=5)
+        table_export_btn = ttk.Button(export_frame, text="📄 Εξαγωγή CSV/XLSX",
+                                      command=lambda: self.open_table_export_dialog('trips'))
+        table_export_btn.pack(side='left', padx=5)
+        conflicts_btn = ttk.Button(export_frame, text="⚠️ Έλεγχος Επικαλύψεων", command=self.show_conflict_report)
+        conflicts_btn.pack(side='left', padx=5)
+        compliance_btn = ttk.Button(export_frame, text="⏱️ Έλεγχος Ωραρίου Οδηγών", command=self.show_compliance_report)
+        compliance_btn.pack(side='left', padx=5)
         
         self.refresh_trip_table()
 
@@ -772,6 +969,12 @@ class VehicleManager(tk.Tk):
             messagebox.showwarning("Μη έγκυρη ώρα", "Μη έγκυρη ώρα άφιξης (HH:MM)")
             return
             
+        if not self.confirm_no_overlap(driver, vehicle, f"{depart_date} {depart_time}", f"{arrive_date} {arrive_time}"):
+            return
+        
+        if not self.confirm_compliance(driver, f"{depart_date} {depart_time}", f"{arrive_date} {arrive_time}"):
+            return
+            
         # Create trip record
         # Generate new ID
         new_id = max([t['id'] for t in self.trips]) + 1 if self.trips else 1
@@ -782,20 +985,24 @@ class VehicleManager(tk.Tk):
             'vehicle': vehicle,
             'depart': f"{depart_date} {depart_time}",
             'arrive': f"{arrive_date} {arrive_time}",
-            'details': details,
-            'signature': f"signature_{new_id}.png"
+            'details': details
         }
         
-        # Save signature
-        sig_path = os.path.join(DATA_DIR, trip['signature'])
-        if not self.signature_pad.save(sig_path):
+        # Signatures are referenced by content digest, never by trip ID
+        try:
+            signature = self.signature_pad.save_to(self.signatures)
+        except OSError as e:
+            log_error(f"Signature save error: {str(e)}")
             messagebox.showwarning("Σφάλμα Αρχείου", "Σφάλμα αποθήκευσης υπογραφής")
             return
+        if signature:
+            trip['signature_ref'] = signature
             
         self.trips.append(trip)
+        self.index_trip(trip)
         if save_json('trips.json', self.trips):
             self.trip_details.delete('1.0', 'end')
-            self.signature_pad.clear()
+            self.signature_pad.reset()
             self.refresh_trip_table()
             messagebox.showinfo("Επιτυχία", "Η διαδρομή καταχωρήθηκε επιτυχώς")
 
@@ -816,15 +1023,15 @@ class VehicleManager(tk.Tk):
     def delete_trip(self, row):
         if messagebox.askyesno("Επιβεβαίωση Διαγραφής", "Θέλετε να διαγράψετε αυτή τη διαδρομή;"):
             # Delete signature file
-            sig_file = self.trips[row]['signature']
-            sig_path = os.path.join(DATA_DIR, sig_file)
-            if os.path.exists(sig_path):
+            sig_file = self.trips[row].get('signature')
+            sig_path = os.path.join(DATA_DIR, sig_file) if sig_file else None
+            if sig_path and os.path.exists(sig_path):
                 try:
                     os.remove(sig_path)
                 except:
                     pass
                     
-            self.trips.pop(row)
+            self.unindex_trip(self.trips.pop(row))
             if save_json('trips.json', self.trips):
                 # Reindex IDs
                 for idx, trip in enumerate(self.trips):
@@ -833,20 +1040,23 @@ class VehicleManager(tk.Tk):
                 self.refresh_trip_table()
 
     def refresh_trip_table(self):
-        self.trip_table.delete(*self.trip_table.get_children())
-        for trip in self.trips:
-            self.trip_table.insert('', 'end', values=(
-                trip['id'],
-                trip['driver'],
-                trip['vehicle'],
-                trip['depart'],
-                trip['arrive'],
-                "✏️ Επεξεργασία",
-                "🗑️ Διαγραφή"
-            ))
+        trips = list(self.trips)
+        self.table_loaders[self.trip_table].load(map(self.trip_row, trips), len(trips))
+
+    def trip_row(self, trip):
+        return str(trip['id']), (
+            trip['id'],
+            trip['driver'],
+            trip['vehicle'],
+            trip['depart'],
+            trip['arrive'],
+            "✏️ Επεξεργασία",
+            "🗑️ Διαγραφή"
+        ), ()
 
     def start_edit_trip(self, row):
         self.edit_trip_row = row
+        self.edit_trip_record = dict(self.trips[row])
         t = self.trips[row]
         self.trip_driver.set(t['driver'])
         self.trip_vehicle.set(t['vehicle'])
@@ -867,12 +1077,13 @@ class VehicleManager(tk.Tk):
         self.trip_details.delete('1.0', 'end')
         self.trip_details.insert('1.0', t['details'])
         
-        sig_path = os.path.join(DATA_DIR, t['signature'])
-        self.signature_pad.load(sig_path)
+        self.signature_pad.load_trip(t, DATA_DIR)
         
         self.trip_add_btn.config(text="💾 Ενημέρωση", command=self.finish_edit_trip)
 
     def finish_edit_trip(self):
+        if not self.check_edit('trips'):
+            return
         row = self.edit_trip_row
         driver = self.trip_driver.get().strip()
         vehicle = self.trip_vehicle.get().strip()
@@ -907,27 +1118,130 @@ class VehicleManager(tk.Tk):
             messagebox.showwarning("Μη έγκυρη ώρα", "Μη έγκυρη ώρα άφιξης (HH:MM)")
             return
             
+        if not self.confirm_no_overlap(driver, vehicle, f"{depart_date} {depart_time}", f"{arrive_date} {arrive_time}",
+                                       exclude=self.trips[row]):
+            return
+        
+        if not self.confirm_compliance(driver, f"{depart_date} {depart_time}", f"{arrive_date} {arrive_time}",
+                                       replacing=self.trips[row]):
+            return
+            
         # Update trip record
+        self.unindex_trip(self.trips[row])
         self.trips[row]['driver'] = driver
         self.trips[row]['vehicle'] = vehicle
         self.trips[row]['depart'] = f"{depart_date} {depart_time}"
         self.trips[row]['arrive'] = f"{arrive_date} {arrive_time}"
         self.trips[row]['details'] = details
+        self.index_trip(self.trips[row])
         
-        # Save signature
-        sig_path = os.path.join(DATA_DIR, self.trips[row]['signature'])
-        if not self.signature_pad.save(sig_path):
-            messagebox.showwarning("Σφάλμα Αρχείου", "Σφάλμα αποθήκευσης υπογραφής")
-            return
+        # Replace the signature only if it was redrawn or cleared
+        old_file = None
+        if self.signature_pad.dirty:
+            try:
+                signature = self.signature_pad.save_to(self.signatures)
+            except OSError as e:
+                log_error(f"Signature save error: {str(e)}")
+                messagebox.showwarning("Σφάλμα Αρχείου", "Σφάλμα αποθήκευσης υπογραφής")
+                return
+            if signature:
+                self.trips[row]['signature_ref'] = signature
+            else:
+                self.trips[row].pop('signature_ref', None)
+            self.trips[row].pop('signature_strokes', None)
+            old_file = self.trips[row].pop('signature', None)
             
         if save_json('trips.json', self.trips):
+            if old_file:
+                try:
+                    os.remove(os.path.join(DATA_DIR, old_file))
+                except OSError:
+                    pass
             self.trip_details.delete('1.0', 'end')
-            self.signature_pad.clear()
+            self.signature_pad.reset()
             self.refresh_trip_table()
             self.edit_trip_row = None
+            self.edit_trip_record = None
             self.trip_add_btn.config(text="➕ Καταχώρηση", command=self.add_trip)
             messagebox.showinfo("Επιτυχία", "Η διαδρομή ενημερώθηκε επιτυχώς")
 
+    def confirm_no_overlap(self, driver, vehicle, depart, arrive, exclude=None):
+        """Warn if the trip double-books its driver or vehicle; True to go ahead"""
+        interval = trip_interval({'depart': depart, 'arrive': arrive})
+        if interval is None:
+            return True
+        
+        clashes = self.bookings.check(driver, vehicle, *interval, exclude=exclude)
+        if not clashes:
+            return True
+        
+        lines = []
+        for t in clashes[:10]:
+            who = "Ο οδηγός" if t['driver'] == driver else "Το όχημα"
+            lines.append(f"• {who}: {t['driver']} - {t['vehicle']} ({t['depart']} → {t['arrive']})")
+        if len(clashes) > 10:
+            lines.append(f"... και {len(clashes) - 10} ακόμη")
+        
+        return messagebox.askyesno(
+            "Επικάλυψη Διαδρομών",
+            "Η διαδρομή επικαλύπτεται με υπάρχουσες διαδρομές:\n\n" + "\n".join(lines) +
+            "\n\nΘέλετε να καταχωρηθεί παρ' όλα αυτά;"
+        )
+
+    def show_conflict_report(self):
+        conflicts = self.bookings.conflicts()
+        if not conflicts:
+            messagebox.showinfo("Έλεγχος Επικαλύψεων", "Δεν βρέθηκαν επικαλυπτόμενες διαδρομές")
+            return
+        
+        lines = [f"Βρέθηκαν {len(conflicts)} επικαλύψεις:", ""]
+        lines.extend(describe_conflicts(conflicts))
+        self.show_report("Έλεγχος Επικαλύψεων", "\n".join(lines))
+
+    def confirm_compliance(self, driver, depart, arrive, replacing=None):
+        """Warn if the trip breaks driving-time or rest limits; True to go ahead"""
+        candidate = {'driver': driver, 'depart': depart, 'arrive': arrive}
+        violations = self.compliance.check_trip(candidate, replacing=replacing)
+        if not violations:
+            return True
+        
+        lines = [f"• {describe_violation(v)}" for v in violations]
+        return messagebox.askyesno(
+            "Ωράριο Οδηγού",
+            "Η διαδρομή παραβιάζει τα όρια οδήγησης/ανάπαυσης:\n\n" + "\n".join(lines) +
+            "\n\nΘέλετε να καταχωρηθεί παρ' όλα αυτά;"
+        )
+
+    def show_compliance_report(self):
+        violations = self.compliance.audit()
+        if not violations:
+            messagebox.showinfo("Έλεγχος Ωραρίου", "Δεν βρέθηκαν παραβάσεις ωραρίου")
+            return
+        
+        lines = [f"Βρέθηκαν {len(violations)} παραβάσεις:", ""]
+        lines.extend(describe_violation(v) for v in violations)
+        self.show_report("Έλεγχος Ωραρίου Οδηγών", "\n".join(lines))
+
+    def show_report(self, title, text, on_confirm=None, confirm_text="Εφαρμογή"):
+        """Show a read-only text report in its own window, optionally with a confirm button"""
+        win = tk.Toplevel(self)
+        win.title(title)
+        win.geometry("800x600")
+        
+        report = ScrolledText(win, font=self.font)
+        report.pack(fill='both', expand=True, padx=10, pady=10)
+        report.insert('1.0', text)
+        report.config(state='disabled')
+        
+        buttons = ttk.Frame(win)
+        buttons.pack(pady=(0, 10))
+        if on_confirm is not None:
+            def confirm():
+                win.destroy()
+                on_confirm()
+            ttk.Button(buttons, text=confirm_text, command=confirm).pack(side='left', padx=5)
+        ttk.Button(buttons, text="Κλείσιμο", command=win.destroy).pack(side='left', padx=5)
+
     def export_trip_pdf(self):
         selected = self.trip_table.selection()
         if not selected:
@@ -947,79 +1261,361 @@ class VehicleManager(tk.Tk):
             return
             
         try:
-            # Create PDF document
-            doc = SimpleDocTemplate(fname, pagesize=letter)
-            styles = getSampleStyleSheet()
-            elements = []
-            
-            # Title
-            title_style = styles['Heading1']
-            title_style.alignment = 1  # Center alignment
-            title = Paragraph("<b>ΚΑΤΑΓΓΕΛΙΑ ΔΙΑΔΡΟΜΗΣ</b>", title_style)
-            elements.append(title)
-            elements.append(Spacer(1, 24))
-            
-            # Driver and Vehicle
-            driver_text = f"<b>Οδηγός:</b> {trip['driver']}"
-            vehicle_text = f"<b>Όχημα:</b> {trip['vehicle']}"
-            
-            info_style = styles['BodyText']
-            driver_para = Paragraph(driver_text, info_style)
-            vehicle_para = Paragraph(vehicle_text, info_style)
-            
-            elements.append(driver_para)
-            elements.append(Spacer(1, 12))
-            elements.append(vehicle_para)
-            elements.append(Spacer(1, 24))
-            
-            # Departure and Arrival
-            depart_text = f"<b>Αναχώρηση:</b> {trip['depart']}"
-            arrive_text = f"<b>Άφιξη:</b> {trip['arrive']}"
-            
-            depart_para = Paragraph(depart_text, info_style)
-            arrive_para = Paragraph(arrive_text, info_style)
-            
-            elements.append(depart_para)
-            elements.append(Spacer(1, 12))
-            elements.append(arrive_para)
-            elements.append(Spacer(1, 24))
-            
-            # Details
-            details_title = Paragraph("<b>Λεπτομέρειες Διαδρομής:</b>", info_style)
-            elements.append(details_title)
-            elements.append(Spacer(1, 8))
-            
-            details_style = styles['BodyText']
-            details_para = Paragraph(trip['details'], details_style)
-            elements.append(details_para)
-            elements.append(Spacer(1, 36))
-            
-            # Signature
-            signature_path = os.path.join(DATA_DIR, trip['signature'])
-            if os.path.exists(signature_path):
-                img = Image.open(signature_path)
-                img_width, img_height = img.size
-                aspect = img_height / float(img_width)
-                max_width = 300
-                max_height = max_width * aspect
-                
-                # Draw image
-                c = canvas.Canvas(fname)
-                c.drawImage(signature_path, 100, 150, width=max_width, height=max_height)
-                
-                # Add caption
-                c.setFont("Helvetica", 10)
-                c.drawString(100, 140, "Υπογραφή Οδηγού:")
-                c.save()
-            
-            # Build PDF
-            doc.build(elements)
+            render_trip_pdf(trip, fname, DATA_DIR)
             messagebox.showinfo("Εξαγωγή Ολοκληρώθηκε", "Το PDF δημιουργήθηκε επιτυχώς")
             
         except Exception as e:
             log_error(f"PDF export error: {str(e)}")
             messagebox.showerror("Σφάλμα Εξαγωγής", f"Σφάλμα δημιουργίας PDF: {str(e)}")
 
+    def create_filter_form(self, form, date_from, date_to, with_driver=True):
+        """Date range, driver and vehicle filter fields on rows 0-2 of a grid"""
+        tk.Label(form, text="Από:", width=10, anchor='w').grid(row=0, column=0, sticky='w', pady=4)
+        from_entry = ttk.Entry(form, width=12)
+        from_entry.grid(row=0, column=1, sticky='w')
+        from_entry.insert(0, date_from.strftime("%Y-%m-%d"))
+        
+        tk.Label(form, text="Έως:", width=10, anchor='w').grid(row=0, column=2, sticky='w', padx=(20, 0))
+        to_entry = ttk.Entry(form, width=12)
+        to_entry.grid(row=0, column=3, sticky='w')
+        to_entry.insert(0, date_to.strftime("%Y-%m-%d"))
+        
+        driver = None
+        if with_driver:
+            tk.Label(form, text="Οδηγός:", width=10, anchor='w').grid(row=1, column=0, sticky='w', pady=4)
+            driver = ttk.Combobox(form, values=[""] + [d['name'] for d in self.drivers], width=25)
+            driver.grid(row=1, column=1, columnspan=3, sticky='w')
+        
+        tk.Label(form, text="Όχημα:", width=10, anchor='w').grid(row=2, column=0, sticky='w', pady=4)
+        vehicle = ttk.Combobox(form, values=[""] + [v['plate'] for v in self.vehicles], width=12)
+        vehicle.grid(row=2, column=1, columnspan=3, sticky='w')
+        
+        return from_entry, to_entry, driver, vehicle
+
+    def open_table_export_dialog(self, collection):
+        """Dialog for exporting trips or services to CSV/XLSX"""
+        if self.table_export_job is not None:
+            self.table_export_job['window'].lift()
+            return
+        
+        win = tk.Toplevel(self)
+        win.title("Εξαγωγή Διαδρομών" if collection == 'trips' else "Εξαγωγή Service")
+        win.geometry("600x380")
+        win.protocol("WM_DELETE_WINDOW", self.cancel_table_export)
+        
+        form = ttk.Frame(win)
+        form.pack(fill='x', padx=12, pady=12)
+        date_from, date_to, driver, vehicle = self.create_filter_form(
+            form, datetime.date.today().replace(month=1, day=1), datetime.date.today(),
+            with_driver=(collection == 'trips'))
+        
+        tk.Label(form, text="Στήλες:", width=10, anchor='w').grid(row=3, column=0, sticky='nw', pady=(8, 0))
+        columns_frame = ttk.Frame(form)
+        columns_frame.grid(row=3, column=1, columnspan=3, sticky='w', pady=(8, 0))
+        column_vars = []
+        for key, header in EXPORT_COLUMNS[collection]:
+            var = tk.BooleanVar(value=True)
+            ttk.Checkbutton(columns_frame, text=header, variable=var).pack(side='left', padx=(0, 8))
+            column_vars.append((key, header, var))
+        
+        tk.Label(form, text="Μορφή:", width=10, anchor='w').grid(row=4, column=0, sticky='w', pady=(8, 0))
+        fmt = tk.StringVar(value='csv')
+        ttk.Radiobutton(form, text="CSV", variable=fmt, value='csv').grid(row=4, column=1, sticky='w', pady=(8, 0))
+        ttk.Radiobutton(form, text="XLSX", variable=fmt, value='xlsx').grid(row=4, column=2, sticky='w', pady=(8, 0))
+        
+        progress = ttk.Progressbar(win, orient="horizontal", mode="determinate")
+        progress.pack(fill='x', padx=12, pady=(8, 4))
+        status = tk.Label(win, text="", anchor='w')
+        status.pack(fill='x', padx=12)
+        
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(pady=10)
+        start_btn = ttk.Button(btn_frame, text="⤴️ Εξαγωγή")
+        start_btn.pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="✖ Ακύρωση", command=self.cancel_table_export).pack(side='left', padx=5)
+        
+        self.table_export_job = {
+            'window': win, 'progress': progress, 'status': status,
+            'start_btn': start_btn, 'thread': None,
+        }
+        start_btn.config(command=lambda: self.start_table_export(
+            collection, date_from.get().strip(), date_to.get().strip(),
+            driver.get().strip() if driver else "", vehicle.get().strip(),
+            [(key, header) for key, header, var in column_vars if var.get()], fmt.get()))
+
+    def start_table_export(self, collection, date_from, date_to, driver, vehicle, columns, fmt):
+        job = self.table_export_job
+        if job['thread'] is not None:
+            return
+        
+        for value in (date_from, date_to):
+            if value and not validate_date(value):
+                messagebox.showwarning("Μη έγκυρη ημερομηνία", "Μη έγκυρη ημερομηνία (YYYY-MM-DD)", parent=job['window'])
+                return
+        if not columns:
+            messagebox.showwarning("Απαιτούμενο πεδίο", "Επιλέξτε τουλάχιστον μία στήλη", parent=job['window'])
+            return
+        if fmt == 'xlsx' and openpyxl is None:
+            messagebox.showerror("Σφάλμα Εξαγωγής", "Η εξαγωγή XLSX απαιτεί το πακέτο openpyxl", parent=job['window'])
+            return
+        
+        path = filedialog.asksaveasfilename(
+            parent=job['window'],
+            defaultextension=f".{fmt}",
+            filetypes=[("Excel", "*.xlsx")] if fmt == 'xlsx' else [("CSV", "*.csv")],
+            title="Αποθήκευση Εξαγωγής"
+        )
+        if not path:
+            return
+        
+        # The worker gets the matching records up front, so progress has a true total;
+        # the rows themselves are still produced lazily
+        if collection == 'trips':
+            records = list(filter_trips(self.trips, date_from, date_to, driver, vehicle))
+        else:
+            records = list(filter_services(self.services, date_from, date_to, vehicle))
+        total = len(records)
+        keys = [key for key, _ in columns]
+        rows = ([record.get(key, '') for key in keys] for record in records)
+        
+        events = queue.Queue()
+        cancel = threading.Event()
+        
+        def worker():
+            try:
+                count = export_rows(path, fmt, [header for _, header in columns], rows,
+                                    on_progress=lambda n: events.put(('progress', n)), cancel=cancel)
+                events.put(('done', count))
+            except ExportCancelled:
+                events.put(('cancelled', None))
+            except Exception as e:
+                events.put(('error', e))
+        
+        job.update({'thread': threading.Thread(target=worker, daemon=True), 'events': events,
+                    'cancel': cancel, 'path': path})
+        job['progress'].config(maximum=max(total, 1), value=0)
+        job['status'].config(text="Εξαγωγή σε εξέλιξη...")
+        job['start_btn'].config(state='disabled')
+        job['thread'].start()
+        self.after(100, self.poll_table_export)
+
+    def poll_table_export(self):
+        job = self.table_export_job
+        if job is None or job['thread'] is None:
+            return
+        
+        while True:
+            try:
+                kind, value = job['events'].get_nowait()
+            except queue.Empty:
+                self.after(100, self.poll_table_export)
+                return
+            
+            if kind == 'progress':
+                job['progress']['value'] = value
+                job['status'].config(text=f"Εξήχθησαν {value} εγγραφές...")
+                continue
+            
+            job['thread'] = None
+            if kind == 'done':
+                messagebox.showinfo("Εξαγωγή Ολοκληρώθηκε", f"Εξήχθησαν {value} εγγραφές:\n{job['path']}",
+                                    parent=job['window'])
+            elif kind == 'error':
+                log_error(f"Table export error: {str(value)}")
+                messagebox.showerror("Σφάλμα Εξαγωγής", f"Σφάλμα εξαγωγής: {str(value)}", parent=job['window'])
+            job['window'].destroy()
+            self.table_export_job = None
+            return
+
+    def cancel_table_export(self):
+        """Ask a running export to stop; it removes its partial file itself"""
+        job = self.table_export_job
+        if job is None:
+            return
+        if job['thread'] is not None:
+            job['cancel'].set()
+            job['status'].config(text="Ακύρωση...")
+        else:
+            job['window'].destroy()
+            self.table_export_job = None
+
+    def open_batch_pdf_dialog(self):
+        """Dialog for exporting many trips at once, filtered by date, driver and vehicle"""
+        if self.pdf_job is not None:
+            self.pdf_job['window'].lift()
+            return
+        
+        win = tk.Toplevel(self)
+        win.title("Μαζική Εξαγωγή PDF")
+        win.geometry("560x330")
+        win.protocol("WM_DELETE_WINDOW", lambda: self.cancel_batch_pdf(close=True))
+        
+        today = datetime.date.today()
+        form = ttk.Frame(win)
+        form.pack(fill='x', padx=12, pady=12)
+        date_from, date_to, driver, vehicle = self.create_filter_form(form, today.replace(day=1), today)
+        
+        combined = tk.BooleanVar(value=False)
+        ttk.Radiobutton(form, text="Ένα PDF ανά διαδρομή", variable=combined, value=False).grid(
+            row=3, column=0, columnspan=2, sticky='w', pady=(8, 0))
+        ttk.Radiobutton(form, text="Ενιαίο PDF", variable=combined, value=True).grid(
+            row=3, column=2, columnspan=2, sticky='w', pady=(8, 0))
+        
+        progress = ttk.Progressbar(win, orient="horizontal", mode="determinate")
+        progress.pack(fill='x', padx=12, pady=(8, 4))
+        status = tk.Label(win, text="", anchor='w')
+        status.pack(fill='x', padx=12)
+        
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(pady=10)
+        start_btn = ttk.Button(btn_frame, text="⤴️ Εξαγωγή")
+        start_btn.pack(side='left', padx=5)
+        cancel_btn = ttk.Button(btn_frame, text="✖ Ακύρωση", command=lambda: self.cancel_batch_pdf(close=True))
+        cancel_btn.pack(side='left', padx=5)
+        
+        self.pdf_job = {
+            'window': win, 'progress': progress, 'status': status,
+            'start_btn': start_btn, 'pool': None,
+        }
+        start_btn.config(command=lambda: self.start_batch_pdf(
+            date_from.get().strip(), date_to.get().strip(),
+            driver.get().strip(), vehicle.get().strip(), combined.get()))
+
+    def start_batch_pdf(self, date_from, date_to, driver, vehicle, combined):
+        job = self.pdf_job
+        if job['pool'] is not None:
+            return
+        
+        for value in (date_from, date_to):
+            if value and not validate_date(value):
+                messagebox.showwarning("Μη έγκυρη ημερομηνία", "Μη έγκυρη ημερομηνία (YYYY-MM-DD)", parent=job['window'])
+                return
+        
+        trips = list(filter_trips(self.trips, date_from, date_to, driver, vehicle))
+        if not trips:
+            messagebox.showwarning("Καμία διαδρομή", "Δεν βρέθηκαν διαδρομές με αυτά τα κριτήρια", parent=job['window'])
+            return
+        
+        if combined:
+            target = filedialog.asksaveasfilename(
+                parent=job['window'],
+                defaultextension=".pdf",
+                filetypes=[("PDF Files", "*.pdf")],
+                title="Αποθήκευση PDF"
+            )
+            tasks = [(render_trips_pdf, (trips, target, DATA_DIR))] if target else []
+        else:
+            target = filedialog.askdirectory(parent=job['window'], title="Φάκελος για τα PDF")
+            tasks = [(render_trip_pdf, (trip, os.path.join(target, trip_pdf_name(trip)), DATA_DIR))
+                     for trip in trips] if target else []
+        if not tasks:
+            return
+        
+        results = queue.Queue()
+        job.update({
+            'pool': multiprocessing.Pool(),
+            'results': results,
+            'total': len(tasks),
+            'done': 0,
+            'errors': [],
+            'outputs': [args[1] for _, args in tasks],
+            'finished': set(),
+            'trip_count': len(trips),
+            'started': time.perf_counter(),
+        })
+        job['start_btn'].config(state='disabled')
+        
+        if combined:
+            # One document cannot be split across workers, so show activity instead
+            job['progress'].config(mode='indeterminate')
+            job['progress'].start(15)
+        else:
+            job['progress'].config(mode='determinate', maximum=len(tasks), value=0)
+        job['status'].config(text=f"Εξαγωγή {len(trips)} διαδρομών...")
+        
+        # Pool callbacks run on a helper thread; the UI picks results up in poll_batch_pdf
+        for func, args in tasks:
+            job['pool'].apply_async(func, args,
+                                    callback=lambda path: results.put((path, None)),
+                                    error_callback=lambda e: results.put((None, e)))
+        job['pool'].close()
+        self.after(100, self.poll_batch_pdf)
+
+    def poll_batch_pdf(self):
+        job = self.pdf_job
+        if job is None or job['pool'] is None:
+            return
+        
+        while True:
+            try:
+                path, error = job['results'].get_nowait()
+            except queue.Empty:
+                break
+            job['done'] += 1
+            if error is not None:
+                job['errors'].append(str(error))
+                log_error(f"PDF export error: {str(error)}")
+            else:
+                job['finished'].add(path)
+        
+        if str(job['progress']['mode']) == 'determinate':
+            job['progress']['value'] = job['done']
+        job['status'].config(text=f"Ολοκληρώθηκαν {job['done']} από {job['total']}")
+        
+        if job['done'] < job['total']:
+            self.after(100, self.poll_batch_pdf)
+            return
+        
+        job['pool'].join()
+        job['pool'] = None
+        job['progress'].stop()
+        # The workers' own timings stay in their processes, so time the whole batch here
+        perf.record('pdf:batch', time.perf_counter() - job['started'])
+        
+        if job['errors']:
+            messagebox.showerror("Σφάλμα Εξαγωγής",
+                                 f"Απέτυχαν {len(job['errors'])} εξαγωγές:\n" + "\n".join(job['errors'][:5]),
+                                 parent=job['window'])
+        else:
+            messagebox.showinfo("Εξαγωγή Ολοκληρώθηκε",
+                                f"Εξήχθησαν {job['trip_count']} διαδρομές σε PDF", parent=job['window'])
+        self.close_batch_pdf()
+
+    def cancel_batch_pdf(self, close=False):
+        """Stop the workers immediately and remove files that were not finished"""
+        job = self.pdf_job
+        if job is None:
+            return
+        
+        if job['pool'] is not None:
+            job['pool'].terminate()
+            job['pool'].join()
+            job['pool'] = None
+            
+            # Anything not reported as finished may be half-written
+            finished = job['finished']
+            while True:
+                try:
+                    path, error = job['results'].get_nowait()
+                except queue.Empty:
+                    break
+                if error is None:
+                    finished.add(path)
+            for path in job['outputs']:
+                if path not in finished and os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+        
+        if close:
+            self.close_batch_pdf()
+
+    def close_batch_pdf(self):
+        if self.pdf_job is not None:
+            self.pdf_job['window'].destroy()
+            self.pdf_job = None
+
     def service_tab(self):
         frame = ttk.Frame(self.notebook)
         self.notebook.add(frame, text="Service")
@@ -1062,9 +1658,14 @@ class VehicleManager(tk.Tk):
         self.service_add_btn = ttk.Button(btn_frame, text="➕ Καταχώρηση", command=self.add_service)
         self.service_add_btn.pack(pady=5)
         
+        # Service history of the selected vehicle
+        self.service_info = tk.Label(frame, text="", anchor='w', justify='left')
+        self.service_info.pack(fill='x', padx=22)
+        self.service_vehicle.bind('<<ComboboxSelected>>', lambda e: self.update_service_info())
+        
         # Table
         self.service_table = self.create_scrollable_table(frame, 
-            ("id", "Όχημα", "Ημερομηνία", "Λεπτομέρειες", "Επεξεργασία", "Διαγραφή"))
+            ("id", "Όχημα", "Ημερομηνία", "Λεπτομέρειες", "Επεξεργασία", "Διαγραφή"), name="services")
         
         self.service_table.heading("id", text="ID", anchor='center')
         self.service_table.heading("Όχημα", text="Όχημα", anchor='w')
@@ -1083,6 +1684,14 @@ class VehicleManager(tk.Tk):
         self.service_table["displaycolumns"] = ("Όχημα", "Ημερομηνία", "Λεπτομέρειες", "Επεξεργασία", "Διαγραφή")
         
         self.service_table.bind('<Button-1>', self.service_table_action)
+        
+        # Export button
+        export_frame = ttk.Frame(frame)
+        export_frame.pack(pady=8)
+        export_btn = ttk.Button(export_frame, text="📄 Εξαγωγή CSV/XLSX",
+                                command=lambda: self.open_table_export_dialog('services'))
+        export_btn.pack()
+        
         self.refresh_service_table()
 
     def add_service(self):
@@ -1106,12 +1715,14 @@ class VehicleManager(tk.Tk):
         # Generate new ID
         new_id = max([s['id'] for s in self.services]) + 1 if self.services else 1
             
-        self.services.append({
+        service = {
             'id': new_id,
             'vehicle': vehicle,
             'date': date,
             'details': details
-        })
+        }
+        self.services.append(service)
+        self.index_service(service)
         
         if save_json('services.json', self.services):
             self.service_detail.delete(0, 'end')
@@ -1134,7 +1745,7 @@ class VehicleManager(tk.Tk):
 
     def delete_service(self, row):
         if messagebox.askyesno("Επιβεβαίωση Διαγραφής", "Θέλετε να διαγράψετε αυτό το service;"):
-            self.services.pop(row)
+            self.unindex_service(self.services.pop(row))
             if save_json('services.json', self.services):
                 # Reindex IDs
                 for idx, service in enumerate(self.services):
@@ -1143,19 +1754,22 @@ class VehicleManager(tk.Tk):
                 self.refresh_service_table()
 
     def refresh_service_table(self):
-        self.service_table.delete(*self.service_table.get_children())
-        for service in self.services:
-            self.service_table.insert('', 'end', values=(
-                service['id'],
-                service['vehicle'],
-                service['date'],
-                service['details'],
-                "✏️ Επεξεργασία",
-                "🗑️ Διαγραφή"
-            ))
+        services = list(self.services)
+        self.table_loaders[self.service_table].load(map(self.service_row, services), len(services))
+
+    def service_row(self, service):
+        return str(service['id']), (
+            service['id'],
+            service['vehicle'],
+            service['date'],
+            service['details'],
+            "✏️ Επεξεργασία",
+            "🗑️ Διαγραφή"
+        ), ()
 
     def start_edit_service(self, row):
         self.edit_service_row = row
+        self.edit_service_record = dict(self.services[row])
         s = self.services[row]
         self.service_vehicle.set(s['vehicle'])
         self.service_date.delete(0, 'end')
@@ -1165,6 +1779,8 @@ class VehicleManager(tk.Tk):
         self.service_add_btn.config(text="💾 Ενημέρωση", command=self.finish_edit_service)
 
     def finish_edit_service(self):
+        if not self.check_edit('services'):
+            return
         row = self.edit_service_row
         vehicle = self.service_vehicle.get().strip()
         date = self.service_date.get().strip()
@@ -1183,14 +1799,17 @@ class VehicleManager(tk.Tk):
             messagebox.showwarning("Απαιτούμενο πεδίο", "Συμπληρώστε λεπτομέρειες service")
             return
             
+        self.unindex_service(self.services[row])
         self.services[row]['vehicle'] = vehicle
         self.services[row]['date'] = date
         self.services[row]['details'] = details
+        self.index_service(self.services[row])
         
         if save_json('services.json', self.services):
             self.service_detail.delete(0, 'end')
             self.refresh_service_table()
             self.edit_service_row = None
+            self.edit_service_record = None
             self.service_add_btn.config(text="➕ Καταχώρηση", command=self.add_service)
             messagebox.showinfo("Επιτυχία", "Το service ενημερώθηκε επιτυχώς")
 
@@ -1222,6 +1841,7 @@ class VehicleManager(tk.Tk):
         self.search_results = ScrolledText(results_frame, font=self.font, state='disabled')
         self.search_results.pack(fill='both', expand=True, padx=10, pady=10)
 
+    @timed('search')
     def do_search(self):
         query = self.search_input.get().strip().lower()
         if not query:
@@ -1229,42 +1849,19 @@ class VehicleManager(tk.Tk):
             return
             
         results = []
-        
-        # Search drivers
-        for d in self.drivers:
-            if query in d['name'].lower():
-                results.append(f"ΟΔΗΓΟΣ: {d['name']}")
-        
-        # Search vehicles
-        for v in self.vehicles:
-            plate_match = query in v['plate'].lower()
-            passed_match = query in v['kteo_passed'].lower()
-            next_match = query in v['kteo_next'].lower()
-            
-            if plate_match or passed_match or next_match:
-                status = self.get_kteo_status(v['kteo_next'])
-                status_text, _ = self.get_status_display(status)
-                results.append(f"ΟΧΗΜΑ: {v['plate']} (ΚΤΕΟ: {v['kteo_passed']} - {v['kteo_next']}, Κατάσταση: {status_text})")
-        
-        # Search trips
-        for t in self.trips:
-            driver_match = query in t['driver'].lower()
-            vehicle_match = query in t['vehicle'].lower()
-            details_match = query in t['details'].lower()
-            depart_match = query in t['depart'].lower()
-            arrive_match = query in t['arrive'].lower()
-            
-            if driver_match or vehicle_match or details_match or depart_match or arrive_match:
-                results.append(f"ΔΙΑΔΡΟΜΗ: {t['driver']} - {t['vehicle']} ({t['depart']} → {t['arrive']})\n   Λεπτομέρειες: {t['details'][:100]}{'...' if len(t['details']) > 100 else ''}")
-        
-        # Search services
-        for s in self.services:
-            vehicle_match = query in s['vehicle'].lower()
-            details_match = query in s['details'].lower()
-            date_match = query in s['date'].lower()
-            
-            if vehicle_match or details_match or date_match:
-                results.append(f"SERVICE: {s['vehicle']} ({s['date']})\n   Λεπτομέρειες: {s['details'][:100]}{'...' if len(s['details']) > 100 else ''}")
+        collections = {'drivers': self.drivers, 'vehicles': self.vehicles, 'trips': self.trips, 'services': self.services}
+        for kind, record in search_records(query, collections):
+            if kind == 'drivers':
+                results.append(f"ΟΔΗΓΟΣ: {record['name']}")
+            elif kind == 'vehicles':
+                status_text, _ = self.get_status_display(self.vehicle_kteo_status(record))
+                results.append(f"ΟΧΗΜΑ: {record['plate']} (ΚΤΕΟ: {record['kteo_passed']} - {record['kteo_next']}, Κατάσταση: {status_text})")
+            elif kind == 'trips':
+                details = record['details']
+                results.append(f"ΔΙΑΔΡΟΜΗ: {record['driver']} - {record['vehicle']} ({record['depart']} → {record['arrive']})\n   Λεπτομέρειες: {details[:100]}{'...' if len(details) > 100 else ''}")
+            else:
+                details = record['details']
+                results.append(f"SERVICE: {record['vehicle']} ({record['date']})\n   Λεπτομέρειες: {details[:100]}{'...' if len(details) > 100 else ''}")
         
         # Display results
         self.search_results.config(state='normal')
@@ -1278,6 +1875,181 @@ class VehicleManager(tk.Tk):
         
         self.search_results.config(state='disabled')
 
+    def dashboard_tab(self):
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text="Πίνακας Ελέγχου")
+        self.dashboard_frame = frame
+        
+        # Title
+        title_frame = ttk.Frame(frame)
+        title_frame.pack(fill='x', pady=(0, 10))
+        tk.Label(title_frame, text="📊 Πίνακας Ελέγχου Στόλου", font=self.title_font).pack(side='left', padx=12, pady=8)
+        
+        self.report_btn = ttk.Button(title_frame, text="🖨️ Μηνιαία Αναφορά PDF", command=self.export_fleet_report)
+        self.report_btn.pack(side='right', padx=12)
+        self.report_month = ttk.Entry(title_frame, width=9)
+        self.report_month.pack(side='right')
+        self.report_month.insert(0, datetime.date.today().strftime("%Y-%m"))
+        tk.Label(title_frame, text="Μήνας:").pack(side='right', padx=(0, 4))
+        
+        # KΤΕΟ status counters
+        kteo_frame = ttk.LabelFrame(frame, text="Κατάσταση ΚΤΕΟ")
+        kteo_frame.pack(fill='x', padx=12, pady=8)
+        
+        self.kteo_count_labels = {}
+        for status in ("ok", "notice", "warning", "expired", "error"):
+            status_text, _ = self.get_status_display(status)
+            label = tk.Label(kteo_frame, text="", font=self.font)
+            label.pack(side='left', padx=16, pady=8)
+            self.kteo_count_labels[status] = (label, status_text)
+        
+        # Aggregate tables
+        tables = ttk.Frame(frame)
+        tables.pack(fill='both', expand=True, padx=12, pady=8)
+        
+        driver_frame = ttk.LabelFrame(tables, text="Διαδρομές ανά Οδηγό")
+        driver_frame.pack(side='left', fill='both', expand=True, padx=(0, 6))
+        self.dash_driver_table = self.create_scrollable_table(driver_frame, ("Οδηγός", "Διαδρομές"),
+                                                              name="dashboard_drivers")
+        self.dash_driver_table.heading("Οδηγός", text="Οδηγός", anchor='w')
+        self.dash_driver_table.heading("Διαδρομές", text="Διαδρομές", anchor='center')
+        self.dash_driver_table.column("Οδηγός", width=200, anchor='w')
+        self.dash_driver_table.column("Διαδρομές", width=90, anchor='center')
+        
+        month_frame = ttk.LabelFrame(tables, text="Διαδρομές ανά Όχημα & Μήνα")
+        month_frame.pack(side='left', fill='both', expand=True, padx=6)
+        self.dash_month_table = self.create_scrollable_table(month_frame, ("Όχημα", "Μήνας", "Διαδρομές"),
+                                                             name="dashboard_months")
+        self.dash_month_table.heading("Όχημα", text="Όχημα", anchor='w')
+        self.dash_month_table.heading("Μήνας", text="Μήνας", anchor='center')
+        self.dash_month_table.heading("Διαδρομές", text="Διαδρομές", anchor='center')
+        self.dash_month_table.column("Όχημα", width=120, anchor='w')
+        self.dash_month_table.column("Μήνας", width=90, anchor='center')
+        self.dash_month_table.column("Διαδρομές", width=90, anchor='center')
+        
+        service_frame = ttk.LabelFrame(tables, text="Service ανά Όχημα")
+        service_frame.pack(side='left', fill='both', expand=True, padx=(6, 0))
+        self.dash_service_table = self.create_scrollable_table(
+            service_frame, ("Όχημα", "Service", "Τελευταίο", "Επόμενο"), name="dashboard_services")
+        self.dash_service_table.heading("Όχημα", text="Όχημα", anchor='w')
+        self.dash_service_table.heading("Service", text="Service", anchor='center')
+        self.dash_service_table.heading("Τελευταίο", text="Τελευταίο", anchor='center')
+        self.dash_service_table.heading("Επόμενο", text="Επόμενο (εκτίμηση)", anchor='center')
+        self.dash_service_table.column("Όχημα", width=120, anchor='w')
+        self.dash_service_table.column("Service", width=70, anchor='center')
+        self.dash_service_table.column("Τελευταίο", width=100, anchor='center')
+        self.dash_service_table.column("Επόμενο", width=120, anchor='center')
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed, add='+')
+
+    def on_tab_changed(self, event=None):
+        if self.dashboard_dirty and self.notebook.select() == str(self.dashboard_frame):
+            self.refresh_dashboard()
+
+    def mark_dashboard_dirty(self):
+        """Re-render the dashboard now if it is visible, otherwise when it is next shown"""
+        self.dashboard_dirty = True
+        if hasattr(self, "dashboard_frame"):
+            self.on_tab_changed()
+
+    def refresh_dashboard(self):
+        agg = self.aggregates
+        for status, (label, status_text) in self.kteo_count_labels.items():
+            label.config(text=f"{status_text}: {agg.kteo_status.get(status, 0)}")
+        
+        drivers = agg.trips_per_driver.most_common()
+        self.table_loaders[self.dash_driver_table].load(
+            ((None, (name, count), ()) for name, count in drivers), len(drivers))
+        
+        months = sorted(agg.trips_per_vehicle_month.items())
+        self.table_loaders[self.dash_month_table].load(
+            ((None, (plate, month, count), ()) for (plate, month), count in months), len(months))
+        
+        services = sorted(agg.services_per_vehicle.items())
+        self.table_loaders[self.dash_service_table].load(
+            ((None, (plate, count) + self.service_forecast_cells(plate), ()) for plate, count in services),
+            len(services))
+        
+        self.dashboard_dirty = False
+
+    def export_fleet_report(self):
+        month = self.report_month.get().strip()
+        try:
+            month_bounds(month)
+        except ValueError:
+            messagebox.showwarning("Μη έγκυρος μήνας", "Μη έγκυρος μήνας (YYYY-MM)")
+            return
+        
+        fname = filedialog.asksaveasfilename(
+            defaultextension=".pdf",
+            filetypes=[("PDF Files", "*.pdf")],
+            initialfile=f"fleet_report_{month}.pdf",
+            title="Αποθήκευση Αναφοράς"
+        )
+        if not fname:
+            return
+        
+        # Render on a worker thread from snapshots; the counters are copied and the
+        # service timeline rebuilt from copied records, so edits made meanwhile do
+        # not change them under the report
+        vehicles = list(self.vehicles)
+        due = self.kteo_scheduler.due
+        statuses = kteo_status_batch([due.get(v['plate']) for v in vehicles], datetime.date.today())
+        aggregates = FleetAggregates()
+        aggregates.trips_per_driver_month = Counter(self.aggregates.trips_per_driver_month)
+        aggregates.trips_per_vehicle_month = Counter(self.aggregates.trips_per_vehicle_month)
+        timeline = ServiceTimeline()
+        timeline.rebuild([dict(s) for s in self.services])
+        args = (fname, month, list(self.trips), vehicles, statuses, aggregates, timeline)
+        done = queue.Queue()
+        
+        def worker():
+            try:
+                render_fleet_report(*args)
+                done.put(None)
+            except Exception as e:
+                done.put(e)
+        
+        def poll():
+            try:
+                error = done.get_nowait()
+            except queue.Empty:
+                self.after(200, poll)
+                return
+            self.report_btn.config(state='normal', text="🖨️ Μηνιαία Αναφορά PDF")
+            if error is None:
+                messagebox.showinfo("Εξαγωγή Ολοκληρώθηκε", f"Η αναφορά δημιουργήθηκε:\n{fname}")
+            else:
+                log_error(f"Fleet report error: {str(error)}")
+                messagebox.showerror("Σφάλμα Εξαγωγής", f"Σφάλμα δημιουργίας αναφοράς: {str(error)}")
+        
+        self.report_btn.config(state='disabled', text="⏳ Δημιουργία...")
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(200, poll)
+
+    def service_forecast_cells(self, plate):
+        last = self.service_timeline.last_service(plate)
+        forecast = self.service_timeline.forecast_next(plate)
+        return (last['date'] if last else "-",
+                day_label(forecast[2]) if forecast else "-")
+
+    def update_service_info(self):
+        """Show the last and forecast next service of the selected vehicle"""
+        if not hasattr(self, "service_info"):
+            return
+        plate = self.service_vehicle.get().strip()
+        last = self.service_timeline.last_service(plate) if plate else None
+        if last is None:
+            self.service_info.config(text="")
+            return
+        
+        text = f"Τελευταίο service: {last['date']} ({len(self.service_timeline.by_vehicle[plate])} συνολικά)"
+        forecast = self.service_timeline.forecast_next(plate)
+        if forecast:
+            _, typical, next_day = forecast
+            text += f"  •  Συνήθες διάστημα: {typical} ημέρες  •  Επόμενο (εκτίμηση): {day_label(next_day)}"
+        self.service_info.config(text=text)
+
     def backup_tab(self):
         frame = ttk.Frame(self.notebook)
         self.notebook.add(frame, text="Backup")
@@ -1301,9 +2073,25 @@ class VehicleManager(tk.Tk):
         path_btn_frame.pack(fill='x', padx=10, pady=5)
         
         ttk.Button(path_btn_frame, text="📂 Επιλογή Φακέλου", command=self.select_backup_folder).pack(side='left', padx=(0, 10))
+        self.incremental_backup = tk.BooleanVar(value=False)
+        ttk.Checkbutton(path_btn_frame, text="Επαυξητικό (μόνο οι αλλαγές)", variable=self.incremental_backup).pack(side='left')
         
         self.backup_btn = ttk.Button(path_btn_frame, text="💾 Δημιουργία Backup", command=self.do_backup)
         self.backup_btn.pack(side='right')
+        self.backup_cancel_btn = ttk.Button(path_btn_frame, text="⛔ Ακύρωση", command=self.cancel_backup, state='disabled')
+        self.backup_cancel_btn.pack(side='right', padx=(0, 10))
+        self.backup_level = ttk.Combobox(path_btn_frame, state='readonly', width=16,
+                                         values=[label for label, _ in BACKUP_LEVELS])
+        self.backup_level.set(BACKUP_LEVELS[2][0])
+        self.backup_level.pack(side='right', padx=(0, 10))
+        tk.Label(path_btn_frame, text="Συμπίεση:").pack(side='right')
+        
+        progress_frame = ttk.Frame(backup_frame)
+        progress_frame.pack(fill='x', padx=10, pady=(0, 5))
+        self.backup_progress = ttk.Progressbar(progress_frame, mode='determinate')
+        self.backup_progress.pack(fill='x')
+        self.backup_status = tk.Label(progress_frame, text="", anchor='w')
+        self.backup_status.pack(fill='x')
         
         # Restore section
         restore_frame = ttk.LabelFrame(frame, text="Επαναφορά Δεδομένων")
@@ -1321,6 +2109,41 @@ class VehicleManager(tk.Tk):
         
         self.restore_btn = ttk.Button(restore_btn_frame, text="🔄 Επαναφορά Δεδομένων", command=self.do_import)
         self.restore_btn.pack(side='right')
+        ttk.Button(restore_btn_frame, text="🔀 Συγχώνευση", command=self.merge_import).pack(side='right', padx=(0, 10))
+        self.verify_btn = ttk.Button(restore_btn_frame, text="🔍 Έλεγχος Backup", command=self.verify_backups)
+        self.verify_btn.pack(side='right', padx=(0, 10))
+        
+        # Incremental backups live in the selected backup folder
+        inc_frame = ttk.LabelFrame(frame, text="Επαυξητικά Backups")
+        inc_frame.pack(fill='x', padx=12, pady=8)
+        
+        self.incremental_list = ttk.Combobox(inc_frame, state='readonly', width=30, postcommand=self.refresh_incremental_list)
+        self.incremental_list.pack(side='left', padx=10, pady=5)
+        ttk.Button(inc_frame, text="📦 Εξαγωγή σε zip", command=self.export_incremental).pack(side='right', padx=10, pady=5)
+        ttk.Button(inc_frame, text="🔄 Επαναφορά", command=self.restore_incremental).pack(side='right', pady=5)
+        
+        # Bulk import
+        csv_frame = ttk.LabelFrame(frame, text="Μαζική Εισαγωγή CSV")
+        csv_frame.pack(fill='x', padx=12, pady=8)
+        
+        self.csv_sources = {}
+        labels = {'drivers': "Οδηγοί", 'vehicles': "Οχήματα", 'trips': "Διαδρομές", 'services': "Service"}
+        for row, (name, label) in enumerate(labels.items()):
+            tk.Label(csv_frame, text=f"{label}:", width=10, anchor='w').grid(row=row, column=0, padx=10, pady=2, sticky='w')
+            entry = ttk.Entry(csv_frame)
+            entry.grid(row=row, column=1, pady=2, sticky='ew')
+            ttk.Button(csv_frame, text="📂", width=3,
+                       command=lambda e=entry: self.select_csv_file(e)).grid(row=row, column=2, padx=5, pady=2)
+            self.csv_sources[name] = entry
+        csv_frame.columnconfigure(1, weight=1)
+        ttk.Button(csv_frame, text="📥 Έλεγχος & Εισαγωγή", command=self.import_csv).grid(row=0, column=3, rowspan=4, padx=10)
+        
+        # Maintenance section
+        maint_frame = ttk.LabelFrame(frame, text="Συντήρηση")
+        maint_frame.pack(fill='x', padx=12, pady=8)
+        
+        tk.Label(maint_frame, text="Μετατροπή παλιών υπογραφών και καθαρισμός αχρησιμοποίητων:").pack(side='left', padx=10, pady=5)
+        ttk.Button(maint_frame, text="✍️ Μετατροπή Υπογραφών", command=self.migrate_signatures).pack(side='right', padx=10, pady=5)
         
         # Info section
         info_frame = ttk.LabelFrame(frame, text="Πληροφορίες")
@@ -1333,6 +2156,32 @@ class VehicleManager(tk.Tk):
         )
         tk.Label(info_frame, text=info_text, justify='left').pack(anchor='w', padx=10, pady=10)
 
+    def migrate_signatures(self):
+        try:
+            count, old_files = migrate_signature_files(self.trips, DATA_DIR)
+        except Exception as e:
+            log_error(f"Signature migration error: {str(e)}")
+            messagebox.showerror("Σφάλμα", f"Σφάλμα μετατροπής υπογραφών:\n{str(e)}")
+            self.trips = load_json('trips.json')
+            self.rebuild_indexes()
+            return
+        if count and not save_json('trips.json', self.trips):
+            return
+        for path in old_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        try:
+            removed = self.signatures.collect(self.trips)
+        except (WriteConflict, OSError) as e:
+            log_error(f"Signature cleanup error: {str(e)}")
+            removed = 0
+        messagebox.showinfo(
+            "Μετατροπή Υπογραφών",
+            f"Μετατράπηκαν {count} υπογραφές\nΔιαγράφηκαν {removed} αχρησιμοποίητα αρχεία υπογραφών"
+        )
+
     def select_backup_folder(self):
         folder = filedialog.askdirectory(
             title="Επιλογή φακέλου για backup",
@@ -1352,11 +2201,91 @@ class VehicleManager(tk.Tk):
             self.restore_path.delete(0, 'end')
             self.restore_path.insert(0, file)
 
+    def incremental_store(self):
+        folder = self.backup_path.get().strip() or BACKUP_DIR
+        return BackupStore(os.path.join(folder, INCREMENTAL_DIR))
+
+    def refresh_incremental_list(self):
+        names = self.incremental_store().manifests()
+        self.incremental_list['values'] = names[::-1]
+        if names and self.incremental_list.get() not in names:
+            self.incremental_list.set(names[-1])
+
+    def do_incremental_backup(self):
+        try:
+            name, stats = self.incremental_store().backup(DATA_DIR)
+        except Exception as e:
+            log_error(f"Incremental backup error: {str(e)}")
+            messagebox.showerror("Σφάλμα Backup", f"Σφάλμα δημιουργίας backup: {str(e)}")
+            return
+        self.refresh_incremental_list()
+        messagebox.showinfo(
+            "Backup Ολοκληρώθηκε",
+            f"Επαυξητικό backup: {name}\n"
+            f"Αρχεία: {stats['files']} (αμετάβλητα: {stats['unchanged']})\n"
+            f"Νέα αντικείμενα: {stats['objects']} ({stats['bytes'] / 1024:.1f} KB)"
+        )
+
+    def restore_incremental(self):
+        name = self.incremental_list.get()
+        if not name:
+            messagebox.showwarning("Απαιτούμενο πεδίο", "Επιλέξτε επαυξητικό backup")
+            return
+        if not messagebox.askyesno(
+            "Επιβεβαίωση Επαναφοράς",
+            "Η επαναφορά θα αντικαταστήσει τα τρέχοντα δεδομένα σας. Θέλετε να συνεχίσετε;"
+        ):
+            return
+        try:
+            staging = open_staging(DATA_DIR)
+            self.incremental_store().restore_to(name, staging)
+            self.apply_restore(staging)
+        except Exception as e:
+            shutil.rmtree(os.path.normpath(DATA_DIR) + '.staging', ignore_errors=True)
+            log_error(f"Incremental restore error: {str(e)}")
+            messagebox.showerror("Σφάλμα Επαναφοράς", f"Σφάλμα επαναφοράς δεδομένων: {str(e)}")
+
+    def export_incremental(self):
+        name = self.incremental_list.get()
+        if not name:
+            messagebox.showwarning("Απαιτούμενο πεδίο", "Επιλέξτε επαυξητικό backup")
+            return
+        fname = filedialog.asksaveasfilename(
+            title="Εξαγωγή backup",
+            initialdir=BACKUP_DIR,
+            initialfile=f"vehicle_backup_{name}.zip",
+            defaultextension=".zip",
+            filetypes=[("Backup Files", "*.zip")]
+        )
+        if not fname:
+            return
+        try:
+            self.incremental_store().export_zip(name, fname)
+            messagebox.showinfo("Εξαγωγή Ολοκληρώθηκε", f"Το backup εξήχθη:\n{fname}")
+        except Exception as e:
+            log_error(f"Incremental export error: {str(e)}")
+            messagebox.showerror("Σφάλμα Εξαγωγής", f"Σφάλμα εξαγωγής backup: {str(e)}")
+
+    def apply_restore(self, staging):
+        """Validate a staged backup, swap it in and reload what changed"""
+        changed = finish_staging(staging, DATA_DIR)
+        swap_data_dir(staging, DATA_DIR)
+        self.reload_collections(changed)
+        messagebox.showinfo(
+            "Επαναφορά Ολοκληρώθηκε",
+            f"Τα δεδομένα επαναφέρθηκαν επιτυχώς\nΑλλαγμένα αρχεία: {len(changed)}"
+        )
+
     def do_backup(self):
         folder = self.backup_path.get().strip()
         if not folder:
             messagebox.showwarning("Απαιτούμενο πεδίο", "Επιλέξτε φάκελο για το backup")
             return
+        if self.backup_job is not None:
+            return
+        if self.incremental_backup.get():
+            self.do_incremental_backup()
+            return
             
         try:
             os.makedirs(folder, exist_ok=True)
@@ -1364,13 +2293,82 @@ class VehicleManager(tk.Tk):
             backup_name = f"vehicle_backup_{timestamp}.zip"
             backup_file = os.path.join(folder, backup_name)
             
-            # Create zip backup
-            shutil.make_archive(backup_file.replace('.zip', ''), 'zip', DATA_DIR)
-            
-            messagebox.showinfo("Backup Ολοκληρώθηκε", f"Το backup δημιουργήθηκε επιτυχώς:\n{backup_file}")
+            # Collections are rewritten in place by save_json on this thread, so
+            # the worker gets a consistent copy; signature blobs never change
+            snapshots = {}
+            for fname in os.listdir(DATA_DIR):
+                src = os.path.join(DATA_DIR, fname)
+                if fname.endswith('.json') and os.path.isfile(src):
+                    with open(src, 'rb') as f:
+                        snapshots[fname] = f.read()
         except Exception as e:
             log_error(f"Backup creation error: {str(e)}")
             messagebox.showerror("Σφάλμα Backup", f"Σφάλμα δημιουργίας backup: {str(e)}")
+            return
+        level = dict(BACKUP_LEVELS).get(self.backup_level.get(), 6)
+        
+        events = queue.Queue()
+        cancel = threading.Event()
+        
+        def worker():
+            try:
+                result = zip_backup(DATA_DIR, backup_file, level, snapshots,
+                                    on_progress=lambda *p: events.put(('progress', p)), cancel=cancel)
+                events.put(('done', result))
+            except ExportCancelled:
+                events.put(('cancelled', None))
+            except Exception as e:
+                events.put(('error', e))
+        
+        self.backup_job = {'thread': threading.Thread(target=worker, daemon=True), 'events': events,
+                           'cancel': cancel, 'path': backup_file}
+        self.backup_progress.config(maximum=1, value=0)
+        self.backup_status.config(text="Backup σε εξέλιξη...")
+        self.backup_btn.config(state='disabled')
+        self.backup_cancel_btn.config(state='normal')
+        self.backup_job['thread'].start()
+        self.after(100, self.poll_backup)
+
+    def poll_backup(self):
+        job = self.backup_job
+        if job is None:
+            return
+        
+        while True:
+            try:
+                kind, value = job['events'].get_nowait()
+            except queue.Empty:
+                self.after(100, self.poll_backup)
+                return
+            
+            if kind == 'progress':
+                files, done, total_files, total = value
+                self.backup_progress.config(maximum=max(total, 1), value=done)
+                self.backup_status.config(
+                    text=f"Αρχεία {files}/{total_files} — {done / 1048576:.1f}/{total / 1048576:.1f} MB"
+                )
+                continue
+            
+            self.backup_job = None
+            self.backup_btn.config(state='normal')
+            self.backup_cancel_btn.config(state='disabled')
+            if kind == 'done':
+                self.backup_status.config(text=f"Ολοκληρώθηκε: {value[0]} αρχεία, {value[1] / 1048576:.1f} MB")
+                messagebox.showinfo("Backup Ολοκληρώθηκε", f"Το backup δημιουργήθηκε επιτυχώς:\n{job['path']}")
+            elif kind == 'cancelled':
+                self.backup_progress['value'] = 0
+                self.backup_status.config(text="Το backup ακυρώθηκε")
+            else:
+                self.backup_status.config(text="")
+                log_error(f"Backup creation error: {str(value)}")
+                messagebox.showerror("Σφάλμα Backup", f"Σφάλμα δημιουργίας backup: {str(value)}")
+            return
+
+    def cancel_backup(self):
+        """Ask a running backup to stop; it removes its partial archive itself"""
+        if self.backup_job is not None:
+            self.backup_job['cancel'].set()
+            self.backup_status.config(text="Ακύρωση...")
 
     def do_import(self):
         backup_file = self.restore_path.get().strip()
@@ -1389,27 +2387,145 @@ class VehicleManager(tk.Tk):
             return
             
         try:
-            # Extract backup
-            temp_dir = os.path.join(BACKUP_DIR, "temp_restore")
-            shutil.unpack_archive(backup_file, temp_dir)
-            
-            # Restore files
-            for fname in os.listdir(temp_dir):
-                if fname.endswith('.json'):
-                    src = os.path.join(temp_dir, fname)
-                    dst = os.path.join(DATA_DIR, fname)
-                    shutil.copy2(src, dst)
-            
-            # Clean up
-            shutil.rmtree(temp_dir)
-            
-            # Reload data
-            self.reload_all_data()
-            messagebox.showinfo("Επαναφορά Ολοκληρώθηκε", "Τα δεδομένα επαναφέρθηκαν επιτυχώς")
+            # Stream the archive into a staging copy; live data is untouched until the swap
+            staging = open_staging(DATA_DIR)
+            stage_zip(backup_file, staging)
+            self.apply_restore(staging)
         except Exception as e:
+            shutil.rmtree(os.path.normpath(DATA_DIR) + '.staging', ignore_errors=True)
             log_error(f"Restore error: {str(e)}")
             messagebox.showerror("Σφάλμα Επαναφοράς", f"Σφάλμα επαναφοράς δεδομένων: {str(e)}")
 
+    def verify_backups(self):
+        """Check one or more backup archives on worker processes without extracting them"""
+        if self.verify_job is not None:
+            return
+        paths = filedialog.askopenfilenames(
+            title="Επιλογή αρχείων backup για έλεγχο",
+            initialdir=BACKUP_DIR,
+            filetypes=[("Backup Files", "*.zip")]
+        )
+        if not paths:
+            return
+        workers = os.cpu_count() or 1
+        tasks, results = plan_verify(paths, workers)
+        self.verify_job = {'results': results, 'outcomes': queue.Queue(), 'total': len(tasks), 'done': 0, 'pool': None}
+        if tasks:
+            pool = self.verify_job['pool'] = multiprocessing.Pool(min(workers, len(tasks)))
+            outcomes = self.verify_job['outcomes']
+            for args in tasks:
+                pool.apply_async(verify_members, args, callback=outcomes.put,
+                                 error_callback=lambda e, path=args[0]: outcomes.put((path, 0, [f"Σφάλμα ελέγχου: {e}"])))
+            pool.close()
+        self.verify_btn.config(state='disabled')
+        self.poll_verify()
+
+    def poll_verify(self):
+        job = self.verify_job
+        while True:
+            try:
+                path, checked, problems = job['outcomes'].get_nowait()
+            except queue.Empty:
+                break
+            job['results'][path]['checked'] += checked
+            job['results'][path]['problems'] += problems
+            job['done'] += 1
+        if job['done'] < job['total']:
+            self.after(100, self.poll_verify)
+            return
+        if job['pool'] is not None:
+            job['pool'].join()
+        self.verify_job = None
+        self.verify_btn.config(state='normal')
+        self.show_report("Έλεγχος Backup", verify_report(job['results']))
+
+    def select_csv_file(self, entry):
+        file = filedialog.askopenfilename(title="Επιλογή αρχείου CSV", filetypes=[("CSV", "*.csv")])
+        if file:
+            entry.delete(0, 'end')
+            entry.insert(0, file)
+
+    def import_csv(self):
+        """Validate the chosen CSV files in one pass and offer to commit the valid rows"""
+        sources = {name: entry.get().strip() for name, entry in self.csv_sources.items() if entry.get().strip()}
+        if not sources:
+            messagebox.showwarning("Απαιτούμενο πεδίο", "Επιλέξτε τουλάχιστον ένα αρχείο CSV")
+            return
+        collections = {'drivers': self.drivers, 'vehicles': self.vehicles, 'trips': self.trips, 'services': self.services}
+        try:
+            plan = plan_csv_import(collections, sources)
+        except (OSError, ValueError, csv.Error) as e:
+            log_error(f"CSV import error: {str(e)}")
+            messagebox.showerror("Σφάλμα Εισαγωγής", f"Σφάλμα ανάγνωσης CSV: {str(e)}")
+            return
+        if not any(plan['added'].values()):
+            self.show_report("Μαζική Εισαγωγή CSV", csv_import_report(plan))
+            return
+        self.show_report("Μαζική Εισαγωγή CSV", csv_import_report(plan),
+                         on_confirm=lambda: self.commit_csv_import(plan), confirm_text="📥 Εισαγωγή Έγκυρων Γραμμών")
+
+    def commit_csv_import(self, plan):
+        collections = {'drivers': self.drivers, 'vehicles': self.vehicles, 'trips': self.trips, 'services': self.services}
+        changed = apply_csv_import(collections, plan)
+        # One write per collection, then a single index rebuild
+        failed = None
+        for fname in COLLECTION_FILES:
+            if fname in changed and not save_json(fname, collections[fname[:-5]]):
+                # Later files may refer to this one's new rows, so stop here
+                failed = fname
+                break
+        # Rows that were not saved are dropped by reloading from disk
+        self.reload_collections(changed)
+        if failed:
+            log_error(f"CSV import error: could not save {failed}")
+            messagebox.showerror("Σφάλμα Εισαγωγής", f"Σφάλμα αποθήκευσης {failed}, η εισαγωγή διακόπηκε")
+            return
+        added = sum(len(records) for records in plan['added'].values())
+        messagebox.showinfo("Εισαγωγή Ολοκληρώθηκε", f"Καταχωρήθηκαν {added} εγγραφές")
+
+    def merge_import(self):
+        """Preview merging another installation's backup into the current data"""
+        source = self.restore_path.get().strip()
+        if not source:
+            messagebox.showwarning("Απαιτούμενο πεδίο", "Επιλέξτε αρχείο backup")
+            return
+        plan = self.plan_merge_import(source)
+        if plan is None:
+            return
+        self.show_report("Συγχώνευση Δεδομένων", merge_report(plan),
+                         on_confirm=lambda: self.apply_merge_import(source), confirm_text="🔀 Εφαρμογή Συγχώνευσης")
+
+    def plan_merge_import(self, source):
+        local = {'drivers': self.drivers, 'vehicles': self.vehicles, 'trips': self.trips, 'services': self.services}
+        try:
+            with open_backup_source(source) as (incoming, read):
+                return plan_merge(local, incoming, read)
+        except Exception as e:
+            log_error(f"Merge import error: {str(e)}")
+            messagebox.showerror("Σφάλμα Συγχώνευσης", f"Σφάλμα ανάγνωσης backup: {str(e)}")
+            return None
+
+    def apply_merge_import(self, source):
+        # The preview window is modeless, so plan again against the data as it is now
+        plan = self.plan_merge_import(source)
+        if plan is None:
+            return
+        try:
+            changed = apply_merge(plan, DATA_DIR)
+        except Exception as e:
+            log_error(f"Merge import error: {str(e)}")
+            messagebox.showerror("Σφάλμα Συγχώνευσης", f"Σφάλμα αποθήκευσης υπογραφών: {str(e)}")
+            return
+        failed = [fname for fname in COLLECTION_FILES
+                  if fname in changed and not save_json(fname, plan['collections'][fname[:-5]])]
+        self.reload_collections(changed)
+        if failed:
+            log_error(f"Merge import error: could not save {', '.join(failed)}")
+            messagebox.showerror("Σφάλμα Συγχώνευσης",
+                                 f"Η συγχώνευση ολοκληρώθηκε μερικώς, δεν αποθηκεύτηκαν: {', '.join(failed)}")
+            return
+        messagebox.showinfo("Συγχώνευση Ολοκληρώθηκε", f"Ενημερώθηκαν {len(changed)} αρχεία δεδομένων")
+
     def about_tab(self):
         frame = ttk.Frame(self.notebook)
         self.notebook.add(frame, text="Πληροφορίες")
@@ -1444,6 +2560,95 @@ class VehicleManager(tk.Tk):
         footer_frame.pack(side='bottom', fill='x', pady=10)
         tk.Label(footer_frame, text="© 2023 Vehicle Manager. Με επιφύλαξη παντός δικαιώματος.").pack()
 
+    def diagnostics_tab(self):
+        """Timings of the slow paths; hidden until Ctrl+Shift+D"""
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text="Διαγνωστικά")
+        self.diagnostics_frame = frame
+        
+        # Title
+        title_frame = ttk.Frame(frame)
+        title_frame.pack(fill='x', pady=(0, 10))
+        tk.Label(title_frame, text="Χρόνοι Λειτουργιών", font=self.title_font).pack(side='left', padx=12, pady=8)
+        
+        controls = ttk.Frame(frame)
+        controls.pack(fill='x', padx=12)
+        self.perf_enabled = tk.BooleanVar(value=perf.enabled)
+        ttk.Checkbutton(controls, text="Καταγραφή χρόνων", variable=self.perf_enabled,
+                        command=lambda: setattr(perf, 'enabled', self.perf_enabled.get())).pack(side='left', padx=5)
+        ttk.Button(controls, text="🔄 Ανανέωση", command=self.refresh_diagnostics).pack(side='left', padx=5)
+        ttk.Button(controls, text="💾 Αποθήκευση...", command=self.dump_diagnostics).pack(side='left', padx=5)
+        ttk.Button(controls, text="🗑️ Καθαρισμός",
+                   command=lambda: (perf.clear(), self.refresh_diagnostics())).pack(side='left', padx=5)
+        self.signature_latency = tk.Label(frame, text="", anchor='w')
+        self.signature_latency.pack(fill='x', padx=12, pady=(8, 0))
+        
+        tk.Label(frame, text="Ανά λειτουργία (τελευταίες κλήσεις):", anchor='w').pack(fill='x', padx=12, pady=(8, 0))
+        self.perf_table = self.create_scrollable_table(
+            frame, ("Λειτουργία", "Κλήσεις", "p50 ms", "p90 ms", "p99 ms", "Μέγιστο ms"), height=8)
+        self.perf_table.heading("Λειτουργία", text="Λειτουργία", anchor='w')
+        self.perf_table.heading("Κλήσεις", text="Κλήσεις", anchor='center')
+        self.perf_table.heading("p50 ms", text="p50 ms", anchor='center')
+        self.perf_table.heading("p90 ms", text="p90 ms", anchor='center')
+        self.perf_table.heading("p99 ms", text="p99 ms", anchor='center')
+        self.perf_table.heading("Μέγιστο ms", text="Μέγιστο ms", anchor='center')
+        self.perf_table.column("Λειτουργία", width=260, anchor='w')
+        self.perf_table.column("Κλήσεις", width=80, anchor='center')
+        self.perf_table.column("p50 ms", width=80, anchor='center')
+        self.perf_table.column("p90 ms", width=80, anchor='center')
+        self.perf_table.column("p99 ms", width=80, anchor='center')
+        self.perf_table.column("Μέγιστο ms", width=90, anchor='center')
+        tk.Label(frame, text="Πιο αργές πρόσφατες λειτουργίες:", anchor='w').pack(fill='x', padx=12)
+        self.perf_slowest_table = self.create_scrollable_table(frame, ("Ώρα", "Λειτουργία", "ms"), height=8)
+        self.perf_slowest_table.heading("Ώρα", text="Ώρα", anchor='center')
+        self.perf_slowest_table.heading("Λειτουργία", text="Λειτουργία", anchor='w')
+        self.perf_slowest_table.heading("ms", text="ms", anchor='center')
+        self.perf_slowest_table.column("Ώρα", width=90, anchor='center')
+        self.perf_slowest_table.column("Λειτουργία", width=260, anchor='w')
+        self.perf_slowest_table.column("ms", width=80, anchor='center')
+        
+        self.notebook.hide(frame)
+        self.bind_all('<Control-Shift-D>', self.toggle_diagnostics)
+
+    def toggle_diagnostics(self, event=None):
+        frame = self.diagnostics_frame
+        if self.notebook.tab(frame, 'state') == 'hidden':
+            self.notebook.add(frame)
+            self.notebook.select(frame)
+            self.refresh_diagnostics()
+        else:
+            self.notebook.hide(frame)
+
+    def refresh_diagnostics(self):
+        samples, median, p95, worst = self.signature_pad.latency_stats()
+        self.signature_latency.config(
+            text=f"Υπογραφή: {samples} δείγματα, διάμεσος {median:.1f} ms, p95 {p95:.1f} ms, μέγιστο {worst:.1f} ms")
+        stats = perf.stats()
+        self.table_loaders[self.perf_table].load(
+            ((None, (name, calls, f"{p50:.1f}", f"{p90:.1f}", f"{p99:.1f}", f"{top:.1f}"), ())
+             for name, calls, p50, p90, p99, top in stats), len(stats))
+        slowest = perf.slowest()
+        self.table_loaders[self.perf_slowest_table].load(
+            ((None, (datetime.datetime.fromtimestamp(when).strftime('%H:%M:%S'), name, f"{ms:.1f}"), ())
+             for when, name, ms in slowest), len(slowest))
+
+    def dump_diagnostics(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON Files", "*.json")],
+            initialfile=f"vehicle_perf_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            title="Αποθήκευση χρόνων"
+        )
+        if not path:
+            return
+        try:
+            perf.dump(path)
+        except OSError as e:
+            log_error(f"Perf dump error: {str(e)}")
+            messagebox.showerror("Σφάλμα", f"Σφάλμα αποθήκευσης: {str(e)}")
+            return
+        messagebox.showinfo("Αποθήκευση", f"Οι χρόνοι αποθηκεύτηκαν:\n{path}")
+
     def update_driver_comboboxes(self):
         names = [d['name'] for d in self.drivers]
         if hasattr(self, "trip_driver"):
@@ -1456,25 +2661,195 @@ class VehicleManager(tk.Tk):
         if hasattr(self, "service_vehicle"):
             self.service_vehicle['values'] = plates
 
+    def rebuild_indexes(self):
+        """Recompute every derived index from the loaded collections"""
+        today = datetime.date.today()
+        self.kteo_scheduler = KteoScheduler()
+        for vehicle in self.vehicles:
+            self.kteo_scheduler.track(vehicle['plate'], vehicle['kteo_next'], today)
+        self.aggregates.rebuild(self.kteo_scheduler.status, self.trips, self.services)
+        self.bookings.rebuild(self.trips)
+        self.compliance.rebuild(self.trips)
+        self.service_timeline.rebuild(self.services)
+        self.update_service_info()
+        self.mark_dashboard_dirty()
+        if self.kteo_alerted:
+            self.schedule_kteo_check()
+
+    def index_vehicle(self, vehicle):
+        status = self.kteo_scheduler.track(vehicle['plate'], vehicle['kteo_next'], datetime.date.today())
+        self.aggregates.set_vehicle_status(vehicle['plate'], status)
+        self.mark_dashboard_dirty()
+        if self.kteo_alerted:
+            self.schedule_kteo_check()
+
+    def unindex_vehicle(self, vehicle):
+        self.kteo_scheduler.untrack(vehicle['plate'])
+        self.aggregates.remove_vehicle(vehicle['plate'])
+        self.mark_dashboard_dirty()
+
+    def index_trip(self, trip):
+        self.aggregates.add_trip(trip)
+        self.bookings.add_trip(trip)
+        self.compliance.add_trip(trip)
+        self.mark_dashboard_dirty()
+
+    def unindex_trip(self, trip):
+        self.aggregates.remove_trip(trip)
+        self.bookings.remove_trip(trip)
+        self.compliance.remove_trip(trip)
+        self.mark_dashboard_dirty()
+
+    def index_service(self, service):
+        self.aggregates.add_service(service)
+        self.service_timeline.add_service(service)
+        self.mark_dashboard_dirty()
+        self.update_service_info()
+
+    def unindex_service(self, service):
+        self.aggregates.remove_service(service)
+        self.service_timeline.remove_service(service)
+        self.mark_dashboard_dirty()
+        self.update_service_info()
+
     def reload_all_data(self):
-        self.drivers = load_json('drivers.json')
-        self.vehicles = load_json('vehicles.json')
-        self.trips = load_json('trips.json')
-        self.services = load_json('services.json')
-        
-        self.refresh_driver_table()
-        self.refresh_vehicle_table()
-        self.refresh_trip_table()
-        self.refresh_service_table()
+        self.reload_collections(COLLECTION_FILES)
+
+    def poll_watcher(self):
+        for fname in sorted(self.watcher.changes()):
+            # Our own saves also show up here; they match what is loaded
+            if not version_is_current(os.path.join(DATA_DIR, fname)):
+                self.apply_external_change(fname)
+        self.after(WATCH_INTERVAL_MS, self.poll_watcher)
+
+    def apply_external_change(self, fname):
+        """Bring one collection in line with its file, touching only the rows that differ"""
+        name = fname[:-5]
+        records = getattr(self, name)
+        new = load_json(fname)
+        changed, added, removed = diff_by_id(records, new)
+        if not (changed or added or removed):
+            return
+        table = getattr(self, f"{name[:-1]}_table")
+        loader = self.table_loaders[table]
+        if len(changed) + len(added) + len(removed) > INCREMENTAL_RELOAD_MAX or loader.running:
+            # e.g. a delete elsewhere renumbered every later row
+            setattr(self, name, new)
+            self.refresh_collections({fname})
+            return
         
-        self.update_driver_comboboxes()
-        self.update_vehicle_comboboxes()
+        unindex = getattr(self, f"unindex_{name[:-1]}", None)
+        index = getattr(self, f"index_{name[:-1]}", None)
+        if unindex:
+            for record in itertools.chain(removed, (old for old, _ in changed)):
+                unindex(record)
+        # Unchanged rows keep their old dicts, which the indexes are keyed on
+        old_by_id = {r['id']: r for r in records}
+        records[:] = [before if before == r else r for r, before in ((r, old_by_id.get(r['id'])) for r in new)]
+        if index:
+            for record in itertools.chain((rec for _, rec in changed), added):
+                index(record)
+        
+        self.check_edit(name)
+        row = getattr(self, f"{name[:-1]}_row")
+        loader.update([row(r) for r in itertools.chain((rec for _, rec in changed), added)],
+                      [str(r['id']) for r in removed])
+        if name == 'drivers':
+            self.update_driver_comboboxes()
+        elif name == 'vehicles':
+            self.update_vehicle_comboboxes()
+
+    def reload_collections(self, changed):
+        """Reload the given collection files and only what depends on them"""
+        changed = set(changed)
+        if 'drivers.json' in changed:
+            self.drivers = load_json('drivers.json')
+        if 'vehicles.json' in changed:
+            self.vehicles = load_json('vehicles.json')
+        if 'trips.json' in changed:
+            self.trips = load_json('trips.json')
+        if 'services.json' in changed:
+            self.services = load_json('services.json')
+        self.refresh_collections(changed)
+
+    def refresh_collections(self, changed):
+        """Rebuild the indexes and tables that depend on the given collection files"""
+        changed = set(changed)
+        if changed & {'vehicles.json', 'trips.json', 'services.json'}:
+            self.rebuild_indexes()
+        
+        if 'drivers.json' in changed:
+            self.refresh_driver_table()
+            self.update_driver_comboboxes()
+        if 'vehicles.json' in changed:
+            self.refresh_vehicle_table()
+            self.update_vehicle_comboboxes()
+        if 'trips.json' in changed:
+            self.refresh_trip_table()
+        if 'services.json' in changed:
+            self.refresh_service_table()
+        for fname in changed:
+            self.check_edit(fname[:-5])
+
+    def collection_merged(self, fname):
+        """save_json merged in or took another seat's version of fname, renumbering its rows"""
+        name = fname[:-5]
+        # A successful edit has already left edit mode by now
+        if getattr(self, f"edit_{name[:-1]}_record") is not None:
+            self.cancel_edit(name)
+            messagebox.showwarning("Η επεξεργασία ακυρώθηκε",
+                                   "Τα δεδομένα ενημερώθηκαν με αλλαγές άλλου σταθμού, επαναλάβετε την επεξεργασία")
+        self.refresh_collections({fname})
+
+    def check_edit(self, name):
+        """Follow the record being edited to its current row; False if edit mode was left.
+
+        A reload can add, drop or renumber rows under an open edit, so the
+        record is found again by its fields. If it was changed or deleted
+        elsewhere the edit is cancelled rather than written over another row.
+        """
+        kind = name[:-1]
+        before = getattr(self, f"edit_{kind}_record")
+        if before is None:
+            return False
+        records = getattr(self, name)
+        row = getattr(self, f"edit_{kind}_row")
+        if not (row < len(records) and records[row] == before):
+            fields = {k: v for k, v in before.items() if k != 'id'}
+            row = next((i for i, r in enumerate(records)
+                        if {k: v for k, v in r.items() if k != 'id'} == fields), None)
+            if row is None:
+                self.cancel_edit(name)
+                messagebox.showwarning("Η επεξεργασία ακυρώθηκε",
+                                       "Η εγγραφή που επεξεργάζεστε άλλαξε ή διαγράφηκε από άλλο σταθμό")
+                return False
+            setattr(self, f"edit_{kind}_row", row)
+            setattr(self, f"edit_{kind}_record", dict(records[row]))
+        return True
+
+    def cancel_edit(self, name):
+        """Leave edit mode for a collection, clearing the form as a finished edit does"""
+        kind = name[:-1]
+        setattr(self, f"edit_{kind}_row", None)
+        setattr(self, f"edit_{kind}_record", None)
+        if name == 'drivers':
+            self.driver_name.delete(0, 'end')
+        elif name == 'vehicles':
+            self.plate_input.delete(0, 'end')
+        elif name == 'trips':
+            self.trip_details.delete('1.0', 'end')
+            self.signature_pad.reset()
+        else:
+            self.service_detail.delete(0, 'end')
+        getattr(self, f"{kind}_add_btn").config(text="➕ Καταχώρηση", command=getattr(self, f"add_{kind}"))
 
     def on_close(self):
         """Handle application close event"""
         if messagebox.askyesno("Κλείσιμο Εφαρμογής", "Θέλετε να κλείσετε την εφαρμογή;"):
+            self.watcher.close()
             self.destroy()
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     app = VehicleManager()
     app.mainloop()
\ No newline at end of file
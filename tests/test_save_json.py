@@ -0,0 +1,129 @@
+"""Lock and merge behaviour of save_json when two seats share a data folder.
+
+Run with ``python -m unittest discover tests`` from the project folder.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import vehicle_core
+from vehicle_core import WriteConflict, file_lock, load_json, merge_records, save_json
+
+OTHER_SEAT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from vehicle_core import load_json, save_json
+data_dir, filename, record = sys.argv[2], sys.argv[3], eval(sys.argv[4])
+records = load_json(filename, data_dir)
+found = [r for r in records if r['id'] == record['id']]
+if found:
+    found[0].update(record)
+else:
+    records.append(record)
+sys.exit(0 if save_json(filename, records, data_dir) else 1)
+"""
+
+def other_seat_saves(data_dir, filename, record):
+    """Save record from a second process, as another workstation would"""
+    subprocess.run([sys.executable, '-c', OTHER_SEAT, ROOT, data_dir, filename, repr(record)], check=True)
+
+class SaveJsonTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        log_file = vehicle_core.LOG_FILE
+        vehicle_core.LOG_FILE = os.path.join(self.data_dir, 'app_log.txt')
+        self.addCleanup(setattr, vehicle_core, 'LOG_FILE', log_file)
+        self.errors = []
+        vehicle_core.set_error_handler(lambda title, message: self.errors.append(message))
+        self.addCleanup(vehicle_core.set_error_handler, vehicle_core.default_error_handler)
+        self.reloaded = []
+        with open(os.path.join(self.data_dir, 'services.json'), 'w', encoding='utf-8') as f:
+            json.dump([{'id': 1, 'vehicle': 'ABC-1', 'date': '2026-01-01', 'details': 'λάδια'},
+                       {'id': 2, 'vehicle': 'ABC-1', 'date': '2026-02-01', 'details': 'φρένα'}], f)
+
+    def save(self, records):
+        return save_json('services.json', records, self.data_dir, on_reload=self.reloaded.append)
+
+    def test_two_writers_merge(self):
+        ours = load_json('services.json', self.data_dir)
+        other_seat_saves(self.data_dir, 'services.json',
+                         {'id': 3, 'vehicle': 'XYZ-9', 'date': '2026-03-01', 'details': 'ελαστικά'})
+        ours[0]['details'] = 'λάδια και φίλτρα'
+        ours.append({'id': 3, 'vehicle': 'ABC-1', 'date': '2026-04-01', 'details': 'μπαταρία'})
+        self.assertTrue(self.save(ours))
+        self.assertEqual(self.reloaded, ['services.json'])
+        saved = load_json('services.json', self.data_dir)
+        self.assertEqual(saved, ours)
+        self.assertEqual([r['id'] for r in saved], [1, 2, 3, 4])
+        self.assertEqual({r['details'] for r in saved}, {'λάδια και φίλτρα', 'φρένα', 'ελαστικά', 'μπαταρία'})
+
+    def test_unchanged_file_is_not_merged(self):
+        ours = load_json('services.json', self.data_dir)
+        ours[1]['details'] = 'τακάκια'
+        self.assertTrue(self.save(ours))
+        self.assertEqual(self.reloaded, [])
+        self.assertEqual(load_json('services.json', self.data_dir)[1]['details'], 'τακάκια')
+
+    def test_conflict_takes_their_version(self):
+        ours = load_json('services.json', self.data_dir)
+        other_seat_saves(self.data_dir, 'services.json', {'id': 1, 'details': 'αλλαγή αλλού'})
+        ours[0]['details'] = 'αλλαγή εδώ'
+        self.assertFalse(self.save(ours))
+        self.assertEqual(self.reloaded, ['services.json'])
+        self.assertEqual(len(self.errors), 1)
+        self.assertEqual(ours[0]['details'], 'αλλαγή αλλού')
+        self.assertEqual(load_json('services.json', self.data_dir), ours)
+
+    def test_held_lock_is_a_conflict(self):
+        # Waits out LOCK_TIMEOUT
+        with file_lock(os.path.join(self.data_dir, 'services.json')):
+            self.assertFalse(self.save(load_json('services.json', self.data_dir)))
+        self.assertEqual(len(self.errors), 1)
+
+class MergeRecordsTest(unittest.TestCase):
+    base = [{'id': 1, 'name': 'Νίκος'}, {'id': 2, 'name': 'Μαρία'}, {'id': 3, 'name': 'Γιάννης'}]
+
+    def copy(self):
+        return [dict(r) for r in self.base]
+
+    def test_disjoint_changes(self):
+        ours, theirs = self.copy(), self.copy()
+        ours[0]['name'] = 'Νικόλαος'
+        del theirs[1]
+        theirs.append({'id': 3, 'name': 'Ελένη'})
+        merged = merge_records('drivers.json', self.base, ours, theirs)
+        self.assertEqual([(r['id'], r['name']) for r in merged],
+                         [(1, 'Νικόλαος'), (2, 'Γιάννης'), (3, 'Ελένη')])
+
+    def test_same_record_changed_on_both_sides(self):
+        ours, theirs = self.copy(), self.copy()
+        ours[1]['name'] = 'Μαρίνα'
+        theirs[1]['name'] = 'Μαίρη'
+        with self.assertRaises(WriteConflict):
+            merge_records('drivers.json', self.base, ours, theirs)
+
+    def test_edited_here_deleted_there(self):
+        ours, theirs = self.copy(), self.copy()
+        ours[2]['name'] = 'Ιωάννης'
+        del theirs[2]
+        with self.assertRaises(WriteConflict):
+            merge_records('drivers.json', self.base, ours, theirs)
+
+    def test_same_new_name_added_on_both_sides(self):
+        ours, theirs = self.copy(), self.copy()
+        ours.append({'id': 4, 'name': 'Ελένη'})
+        theirs.append({'id': 4, 'name': 'ελένη'})
+        with self.assertRaises(WriteConflict):
+            merge_records('drivers.json', self.base, ours, theirs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+"""Local HTTP/JSON API over one FleetStore, for several workstations.
+
+One process holds the data in memory and serves any number of GUI or
+script clients (``python vehicle_api.py --help``). Reads are answered
+straight from memory on the event loop; every change goes through a single
+writer task, so writes are applied one at a time and each touched
+collection is saved once per batch.
+
+    GET    /drivers?offset=0&limit=100    page of records
+    GET    /drivers/3                     one record
+    POST   /drivers                       create, body is a JSON object
+    PUT    /drivers/3                     change the given fields
+    DELETE /drivers/3                     delete (IDs are renumbered)
+    GET    /search?q=text                 search all collections
+    GET    /kteo                          KTEO status of the fleet
+
+Trips accept ``?allow_overlap=1`` on POST and PUT.
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+from urllib.parse import urlsplit, parse_qs
+from vehicle_core import DATA_DIR, FleetStore, log_error
+
+COLLECTIONS = ('drivers', 'vehicles', 'trips', 'services')
+DEFAULT_PAGE = 100
+MAX_PAGE = 1000
+MAX_BODY = 1 << 20
+MAX_BATCH = 256  # writes applied before the touched collections are saved
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def find_row(records, record_id):
+    """Row of the record with record_id; IDs normally equal row + 1"""
+    row = record_id - 1
+    if 0 <= row < len(records) and records[row]['id'] == record_id:
+        return row
+    for row, record in enumerate(records):
+        if record['id'] == record_id:
+            return row
+    raise ApiError(404, f"Δεν βρέθηκε εγγραφή με ID {record_id}")
+
+def int_param(query, name, default):
+    try:
+        return int(query.get(name, [default])[0])
+    except ValueError:
+        raise ApiError(400, f"Μη έγκυρη τιμή για {name}")
+
+class FleetServer:
+    """Serves a FleetStore over HTTP/1.1 with keep-alive."""
+
+    def __init__(self, store):
+        self.store = store
+        self.writes = None
+        self.writer_task = None
+
+    async def start(self, host, port):
+        self.writes = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self.write_loop())
+        return await asyncio.start_server(self.handle, host, port)
+
+    # Writer
+
+    async def submit(self, name, op):
+        """Queue op(store) for the writer; returns its result once saved"""
+        future = asyncio.get_running_loop().create_future()
+        await self.writes.put((name, op, future))
+        return await future
+
+    async def write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.writes.get()]
+            while len(batch) < MAX_BATCH and not self.writes.empty():
+                batch.append(self.writes.get_nowait())
+            results = []
+            touched = set()
+            # Rows and IDs before the batch, to undo it if the save fails;
+            # delete renumbers the remaining records in place
+            undo = {}
+            for name, op, future in batch:
+                if name not in undo:
+                    records = getattr(self.store, name)
+                    undo[name] = (list(records), [r['id'] for r in records])
+                try:
+                    results.append(op(self.store))
+                    touched.add(name)
+                except Exception as e:
+                    results.append(e)
+            # Nothing else mutates the store, so the lists stay still while saved
+            failed = set()
+            for name in touched:
+                if not await loop.run_in_executor(None, self.store.save, name):
+                    failed.add(name)
+                    self.rollback(name, *undo[name])
+            for (name, _, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                elif name in failed:
+                    future.set_exception(ApiError(500, f"Αποτυχία αποθήκευσης {name}.json"))
+                else:
+                    future.set_result(result)
+
+    def rollback(self, name, rows, ids):
+        """Put a collection back as it was before a batch that could not be saved"""
+        getattr(self.store, name)[:] = rows
+        for record, record_id in zip(rows, ids):
+            record['id'] = record_id
+        self.store.reindex(f"{name}.json")
+
+    # Routing
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split('/') if p]
+        if parts == ['search']:
+            if method != 'GET':
+                raise ApiError(405, "Μη επιτρεπτή μέθοδος")
+            text = query.get('q', [''])[0]
+            limit = min(int_param(query, 'limit', DEFAULT_PAGE), MAX_PAGE)
+            found = []
+            for name, record in self.store.search(text):
+                found.append({'collection': name, 'record': record})
+                if len(found) >= limit:
+                    break
+            return 200, {'items': found}
+        if parts == ['kteo']:
+            if method != 'GET':
+                raise ApiError(405, "Μη επιτρεπτή μέθοδος")
+            return 200, {'items': [{'plate': v['plate'], 'kteo_next': v['kteo_next'], 'status': status}
+                                   for v, status in self.store.kteo_statuses()]}
+        if not parts or parts[0] not in COLLECTIONS or len(parts) > 2:
+            raise ApiError(404, "Άγνωστη διαδρομή")
+        name = parts[0]
+        records = getattr(self.store, name)
+        if len(parts) == 1:
+            if method == 'GET':
+                offset = max(int_param(query, 'offset', 0), 0)
+                limit = min(max(int_param(query, 'limit', DEFAULT_PAGE), 0), MAX_PAGE)
+                return 200, {'items': records[offset:offset + limit], 'total': len(records),
+                             'offset': offset, 'limit': limit}
+            if method == 'POST':
+                fields = self.parse_body(body)
+                allow_overlap = query.get('allow_overlap', ['0'])[0] == '1'
+                return 201, await self.submit(name, lambda s: s.add(name, fields, allow_overlap))
+            raise ApiError(405, "Μη επιτρεπτή μέθοδος")
+        try:
+            record_id = int(parts[1])
+        except ValueError:
+            raise ApiError(404, "Μη έγκυρο ID")
+        if method == 'GET':
+            return 200, records[find_row(records, record_id)]
+        if method == 'PUT':
+            fields = self.parse_body(body)
+            allow_overlap = query.get('allow_overlap', ['0'])[0] == '1'
+            # Rows are looked up by the writer, after any earlier queued delete
+            return 200, await self.submit(name, lambda s: s.update(
+                name, find_row(records, record_id), fields, allow_overlap))
+        if method == 'DELETE':
+            return 200, await self.submit(name, lambda s: s.delete(name, find_row(records, record_id)))
+        raise ApiError(405, "Μη επιτρεπτή μέθοδος")
+
+    @staticmethod
+    def parse_body(body):
+        try:
+            fields = json.loads(body.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError):
+            raise ApiError(400, "Μη έγκυρο JSON")
+        if not isinstance(fields, dict):
+            raise ApiError(400, "Αναμένεται αντικείμενο JSON")
+        return fields
+
+    # Connection handling
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, 400, {'error': "Μη έγκυρο αίτημα"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self.respond(writer, 400, {'error': "Μη έγκυρο αίτημα"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {'error': "Πολύ μεγάλο αίτημα"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                try:
+                    status, payload = await self.route(method.upper(), target, body)
+                except ApiError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except ValueError as e:
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    log_error(f"API {method} {target} error: {str(e)}")
+                    status, payload = 500, {'error': str(e)}
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+async def serve(data_dir, host, port):
+    server = await FleetServer(FleetStore(data_dir)).start(host, port)
+    print(f"API στο http://{host}:{port}/ για {data_dir}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='vehicle_api', description="Τοπικός διακομιστής HTTP/JSON για τα δεδομένα")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="φάκελος δεδομένων (προεπιλογή: %(default)s)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.data_dir, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
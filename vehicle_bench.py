@@ -0,0 +1,321 @@
+"""Synthetic fleet data and an end-to-end benchmark of the app at scale.
+
+    python vehicle_bench.py generate DIR --scale 100k
+    python vehicle_bench.py run --scale 1k --output bench.json [--compare old.json]
+
+run generates a data set in a scratch folder, times the core operations
+(and the GUI ones when a display is available) and writes the results as
+JSON. With --compare it reports each result against an earlier run and
+exits with 1 if any got slower than the tolerance.
+"""
+
+import sys
+import os
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+from collections import Counter
+from vehicle_core import (
+    BackupStore, COLLECTION_FILES, DATA_DIR, FleetStore, KteoScheduler, SignatureStore,
+    finish_staging, kteo_status_batch, load_json, open_staging, parse_date_ordinal,
+    save_json, search_records, stage_zip, swap_data_dir, zip_backup,
+)
+
+# Trips per scale; the other collections are sized from it
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+SIGNATURE_POOL = 200  # distinct signatures, shared as content-addressed blobs
+SIGNED_SHARE = 0.6
+REGRESSION_TOLERANCE = 1.25
+
+FIRST_NAMES = ["Γιώργος", "Νίκος", "Δημήτρης", "Κώστας", "Γιάννης", "Παναγιώτης", "Βασίλης", "Χρήστος",
+               "Αθανάσιος", "Μιχάλης", "Σπύρος", "Ευάγγελος", "Θανάσης", "Στέλιος", "Αντώνης", "Ηλίας"]
+LAST_NAMES = ["Παπαδόπουλος", "Οικονόμου", "Γεωργίου", "Νικολάου", "Κωνσταντίνου", "Ιωάννου",
+              "Δημητρίου", "Παπανικολάου", "Καραγιάννης", "Βασιλείου", "Μακρής", "Αντωνίου"]
+PLATE_LETTERS = "ΑΒΕΖΗΙΚΜΝΟΡΤΥΧ"  # the Greek letters used on plates
+PLACES = ["Αθήνα", "Θεσσαλονίκη", "Πάτρα", "Ηράκλειο", "Λάρισα", "Βόλος", "Ιωάννινα", "Καβάλα",
+          "Χανιά", "Καλαμάτα", "Σέρρες", "Κοζάνη", "Πειραιάς", "Ελευσίνα"]
+CARGO = ["δέματα", "παλέτες τροφίμων", "ανταλλακτικά", "φαρμακευτικό υλικό", "οικοδομικά υλικά",
+         "έπιπλα", "ηλεκτρικές συσκευές", "επιβάτες"]
+SERVICE_WORK = ["Αλλαγή λαδιών και φίλτρων", "Αντικατάσταση τακακιών φρένων", "Έλεγχος ελαστικών",
+                "Αντικατάσταση μπαταρίας", "Γενικό σέρβις", "Ευθυγράμμιση", "Επισκευή κλιματισμού",
+                "Αλλαγή ιμάντα χρονισμού"]
+
+def scale_size(scale):
+    """Trips for a named scale or a plain number"""
+    return SCALES.get(str(scale).lower()) or int(scale)
+
+def signature_strokes(rng, size=(400, 180)):
+    """A handwriting-like signature: a few wavy strokes left to right"""
+    strokes = []
+    x = rng.randint(20, 60)
+    for _ in range(rng.randint(2, 4)):
+        points = []
+        base = rng.randint(60, 120)
+        amp, freq = rng.uniform(10, 35), rng.uniform(0.05, 0.15)
+        for _ in range(rng.randint(20, 60)):
+            x = min(x + rng.randint(2, 6), size[0] - 5)
+            points.append((x, int(base + amp * math.sin(x * freq) + rng.uniform(-3, 3))))
+        strokes.append((2, points))
+        x = min(x + rng.randint(5, 20), size[0] - 60)
+    return strokes
+
+def generate(data_dir, trips=1_000, seed=1):
+    """Write a realistic data set with the given number of trips; returns the counts"""
+    rng = random.Random(seed)
+    n_vehicles = max(10, trips // 200)
+    n_drivers = n_vehicles + n_vehicles // 5
+    os.makedirs(data_dir, exist_ok=True)
+
+    seen = Counter()
+    drivers = []
+    for i in range(n_drivers):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        seen[name] += 1
+        if seen[name] > 1:
+            name = f"{name} {seen[name]}"
+        drivers.append({'id': i + 1, 'name': name})
+
+    today = datetime.date.today()
+    plates = set()
+    while len(plates) < n_vehicles:
+        plates.add(f"{''.join(rng.choices(PLATE_LETTERS, k=3))}-{rng.randint(1000, 9999)}")
+    vehicles = []
+    for i, plate in enumerate(sorted(plates)):
+        # Mostly valid, some due soon and some expired, as in a real fleet
+        next_due = today + datetime.timedelta(days=rng.randint(-60, 700))
+        passed = next_due - datetime.timedelta(days=730)
+        vehicles.append({'id': i + 1, 'plate': plate, 'kteo_passed': passed.isoformat(),
+                         'kteo_next': next_due.isoformat()})
+
+    signatures = SignatureStore(data_dir)
+    pool = [signatures.put(signature_strokes(rng), (400, 180)) for _ in range(SIGNATURE_POOL)]
+
+    # Each vehicle runs its trips back to back with one driver per vehicle,
+    # so the data has no double bookings
+    start = datetime.datetime.combine(today - datetime.timedelta(days=730), datetime.time(6))
+    clocks = [start + datetime.timedelta(minutes=rng.randint(0, 600)) for _ in vehicles]
+    trip_list = []
+    for i in range(trips):
+        v = rng.randrange(n_vehicles)
+        depart = clocks[v] + datetime.timedelta(minutes=rng.randint(30, 720))
+        arrive = depart + datetime.timedelta(minutes=rng.randint(20, 540))
+        clocks[v] = arrive
+        trip = {
+            'id': i + 1,
+            'driver': drivers[v % n_drivers]['name'],
+            'vehicle': vehicles[v]['plate'],
+            'depart': depart.strftime('%Y-%m-%d %H:%M'),
+            'arrive': arrive.strftime('%Y-%m-%d %H:%M'),
+            'details': f"{rng.choice(PLACES)} → {rng.choice(PLACES)}, {rng.choice(CARGO)}",
+        }
+        if rng.random() < SIGNED_SHARE:
+            trip['signature_ref'] = rng.choice(pool)
+        trip_list.append(trip)
+
+    services = []
+    for i in range(max(1, trips // 10)):
+        date = today - datetime.timedelta(days=rng.randint(0, 730))
+        services.append({'id': i + 1, 'vehicle': rng.choice(vehicles)['plate'], 'date': date.isoformat(),
+                         'details': rng.choice(SERVICE_WORK)})
+
+    collections = {'drivers': drivers, 'vehicles': vehicles, 'trips': trip_list, 'services': services}
+    for name, records in collections.items():
+        if not save_json(f"{name}.json", records, data_dir):
+            raise OSError(f"Αποτυχία αποθήκευσης {name}.json")
+    return {name: len(records) for name, records in collections.items()}
+
+def measure(fn, repeat=3):
+    """Run fn repeat times; returns its timings in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+def core_benchmarks(data_dir, scratch, repeat):
+    """{name: callable} for everything that does not need a display"""
+    collections = {fname[:-5]: load_json(fname, data_dir) for fname in COLLECTION_FILES}
+    archive = os.path.join(scratch, 'bench_backup.zip')
+    restore_dir = os.path.join(scratch, 'restore_target')
+    # Restores need an archive and a live folder to replace, made up front so they are not timed
+    zip_backup(data_dir, archive)
+    shutil.copytree(data_dir, restore_dir)
+
+    def kteo():
+        scheduler = KteoScheduler()
+        today = datetime.date.today()
+        for vehicle in collections['vehicles']:
+            scheduler.track(vehicle['plate'], vehicle['kteo_next'], today)
+        kteo_status_batch([parse_date_ordinal(v['kteo_next']) for v in collections['vehicles']], today)
+
+    def restore():
+        staging = open_staging(restore_dir)
+        stage_zip(archive, staging)
+        finish_staging(staging, restore_dir)
+        swap_data_dir(staging, restore_dir)
+
+    benches = {}
+    for fname in COLLECTION_FILES:
+        benches[f'load_json:{fname}'] = lambda f=fname: load_json(f, data_dir)
+        benches[f'save_json:{fname}'] = lambda f=fname: save_json(f, collections[f[:-5]], data_dir)
+    benches['search'] = lambda: sum(1 for _ in search_records('αθήνα', collections))
+    benches['search:no_match'] = lambda: sum(1 for _ in search_records('zzzz', collections))
+    benches['kteo_status'] = kteo
+    benches['fleet_store_open'] = lambda: FleetStore(data_dir)
+    benches['backup:zip'] = lambda: zip_backup(data_dir, os.path.join(scratch, 'bench_timed.zip'), level=6)
+    benches['restore:zip'] = restore
+    benches['backup:incremental'] = lambda: BackupStore(os.path.join(scratch, 'incremental')).backup(data_dir)
+    return benches
+
+def gui_benchmarks():
+    """({name: callable}, app) timing the Tk app on DATA_DIR; ({}, None) without a display"""
+    try:
+        import main
+        app = main.VehicleManager()
+    except Exception as e:  # no display, or Tk missing
+        print(f"GUI benchmarks skipped: {e}", file=sys.stderr)
+        return {}, None
+    app.withdraw()
+    if app.kteo_job is not None:
+        app.after_cancel(app.kteo_job)
+        app.kteo_job = None
+    app.kteo_alerted = True  # re-checks alert only on changes, so no message box pops up
+
+    def refreshed(method, table):
+        loader = app.table_loaders[table]
+        def run():
+            method()
+            while loader.running:
+                app.update()
+        return run
+
+    def search():
+        app.search_input.delete(0, 'end')
+        app.search_input.insert(0, 'αθήνα')
+        app.do_search()
+
+    benches = {
+        'gui:do_search': search,
+        'gui:refresh_driver_table': refreshed(app.refresh_driver_table, app.driver_table),
+        'gui:refresh_vehicle_table': refreshed(app.refresh_vehicle_table, app.vehicle_table),
+        'gui:refresh_trip_table': refreshed(app.refresh_trip_table, app.trip_table),
+        'gui:refresh_service_table': refreshed(app.refresh_service_table, app.service_table),
+        'gui:check_kteo_dates': app.check_kteo_dates,
+        'gui:rebuild_indexes': app.rebuild_indexes,
+    }
+    return benches, app
+
+def run(scale, repeat=3, seed=1, gui=True, only=None):
+    """Generate a data set in a scratch folder and time every benchmark on it"""
+    trips = scale_size(scale)
+    scratch = tempfile.mkdtemp(prefix='vehicle_bench_')
+    cwd = os.getcwd()
+    try:
+        # The app keeps its data, backups and log relative to the working directory
+        os.chdir(scratch)
+        start = time.perf_counter()
+        counts = generate(DATA_DIR, trips, seed)
+        generate_s = time.perf_counter() - start
+
+        benches = core_benchmarks(os.path.abspath(DATA_DIR), scratch, repeat)
+        app = None
+        if gui:
+            gui_benches, app = gui_benchmarks()
+            benches.update(gui_benches)
+        results = {}
+        try:
+            for name, fn in benches.items():
+                if only and not any(part in name for part in only):
+                    continue
+                times = measure(fn, repeat)
+                results[name] = {'median_s': statistics.median(times), 'min_s': min(times), 'runs': len(times)}
+                print(f"{name:<32} {results[name]['median_s'] * 1000:10.1f} ms", file=sys.stderr)
+        finally:
+            if app is not None:
+                app.destroy()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {
+        'scale': scale,
+        'records': counts,
+        'seed': seed,
+        'generate_s': generate_s,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'results': results,
+    }
+
+def compare(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """[(name, baseline s, current s, ratio)] for benchmarks present in both runs"""
+    rows = []
+    for name, result in current['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if old and old['median_s'] > 0:
+            rows.append((name, old['median_s'], result['median_s'], result['median_s'] / old['median_s']))
+    return rows
+
+def cli_generate(args):
+    counts = generate(args.folder, scale_size(args.scale), args.seed)
+    print(", ".join(f"{name}: {count}" for name, count in counts.items()))
+    return 0
+
+def cli_run(args):
+    report = run(args.scale, args.repeat, args.seed, gui=not args.no_gui, only=args.only)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    worst = 0
+    for name, old, new, ratio in compare(report, baseline):
+        flag = ""
+        if ratio > args.tolerance:
+            flag = "  ΠΙΟ ΑΡΓΟ"
+            worst = 1
+        print(f"{name:<32} {old * 1000:10.1f} → {new * 1000:10.1f} ms  x{ratio:.2f}{flag}")
+    return worst
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='vehicle_bench', description="Συνθετικά δεδομένα και μετρήσεις επιδόσεων")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cmd = commands.add_parser('generate', help="δημιουργία συνθετικών δεδομένων σε φάκελο")
+    cmd.add_argument('folder')
+    cmd.add_argument('--scale', default='1k', help="1k, 100k, 1m ή αριθμός διαδρομών")
+    cmd.add_argument('--seed', type=int, default=1)
+    cmd.set_defaults(run=cli_generate)
+
+    cmd = commands.add_parser('run', help="μετρήσεις σε προσωρινά συνθετικά δεδομένα")
+    cmd.add_argument('--scale', default='1k', help="1k, 100k, 1m ή αριθμός διαδρομών")
+    cmd.add_argument('--repeat', type=int, default=3)
+    cmd.add_argument('--seed', type=int, default=1)
+    cmd.add_argument('--output', help="αρχείο JSON με τα αποτελέσματα")
+    cmd.add_argument('--compare', metavar='JSON', help="σύγκριση με προηγούμενα αποτελέσματα (κωδικός εξόδου 1 αν κάτι επιβραδύνθηκε)")
+    cmd.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+    cmd.add_argument('--only', nargs='+', metavar='NAME', help="μόνο μετρήσεις που περιέχουν ένα από αυτά")
+    cmd.add_argument('--no-gui', action='store_true', help="χωρίς τις μετρήσεις του γραφικού περιβάλλοντος")
+    cmd.set_defaults(run=cli_run)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except (ValueError, OSError) as e:
+        print(f"Σφάλμα: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2811 @@
+"""Data layer of the vehicle management app, usable without the GUI.
+
+main.py builds its Tk interface on top of this module; scripts and the
+command line (``python vehicle_core.py --help``) use it directly.
+"""
+
+import sys
+import json
+import os
+import datetime
+import shutil
+import zipfile
+import itertools
+import heapq
+import functools
+import contextlib
+import bisect
+import multiprocessing
+import csv
+import io
+import re
+import zlib
+import array
+import base64
+import hashlib
+import difflib
+import socket
+import time
+import argparse
+import ctypes
+import struct
+from collections import Counter, defaultdict, deque
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, PageBreak, Table, TableStyle
+from reportlab.platypus import Image as PdfImage
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from xml.sax.saxutils import escape as xml_escape
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batch KΤΕΟ status falls back to plain Python
+    np = None
+
+try:
+    import openpyxl
+except ImportError:  # Optional: only needed for XLSX export
+    openpyxl = None
+
+# Constants
+DATA_DIR = 'vehicle_data'
+BACKUP_DIR = 'vehicle_backups'
+INCREMENTAL_DIR = 'incremental'  # Deduplicated store inside a backup folder
+LOG_FILE = 'app_log.txt'
+SIGNATURE_DIR = 'signatures'  # Blob store, relative to the data directory
+SIGNATURE_GC_GRACE = 24 * 60 * 60  # Unreferenced blobs younger than this, in seconds, are kept
+KTEO_NOTICE_DAYS = 30
+KTEO_WARNING_DAYS = 15
+
+# Driving time limits, in minutes
+MAX_DAILY_DRIVING = 9 * 60
+MAX_WEEKLY_DRIVING = 56 * 60
+MAX_FORTNIGHT_DRIVING = 90 * 60  # Any 14 consecutive days
+MIN_REST_BETWEEN_TRIPS = 45
+
+def default_error_handler(title, message):
+    print(f"{title}: {message}", file=sys.stderr)
+
+_error_handler = default_error_handler
+
+def set_error_handler(handler):
+    """Route errors reported by this module, e.g. to message boxes in the GUI"""
+    global _error_handler
+    _error_handler = handler
+
+def report_error(title, message):
+    _error_handler(title, message)
+
+PERF_WINDOW = 512  # Timings kept per operation for the percentiles
+PERF_RECENT = 200  # Latest operations kept for the slowest-recent list
+
+class _PerfTimer:
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.name, time.perf_counter() - self.start)
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+NULL_TIMER = _NullTimer()
+
+class PerfRecorder:
+    """Rolling timings of the hot paths, kept in memory only while enabled.
+
+    Off unless VEHICLE_PERF=1 is set or the diagnostics tab turns it on;
+    while off, an instrumented call costs one attribute check.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.clear()
+
+    def clear(self):
+        self.samples = defaultdict(lambda: deque(maxlen=PERF_WINDOW))
+        self.counts = Counter()
+        self.recent = deque(maxlen=PERF_RECENT)  # (wall time, name, seconds)
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        self.samples[name].append(seconds)
+        self.counts[name] += 1
+        self.recent.append((time.time(), name, seconds))
+
+    def measure(self, name):
+        """Context manager recording the time its block takes"""
+        return _PerfTimer(self, name) if self.enabled else NULL_TIMER
+
+    def stats(self):
+        """[(name, calls, p50, p90, p99, max)] in ms over the rolling window, slowest p90 first"""
+        rows = []
+        for name, window in list(self.samples.items()):
+            values = sorted(window)
+            if not values:
+                continue
+            pick = lambda q: values[min(len(values) - 1, int(len(values) * q))] * 1000
+            rows.append((name, self.counts[name], pick(0.5), pick(0.9), pick(0.99), values[-1] * 1000))
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def slowest(self, count=20):
+        """[(wall time, name, ms)] of the slowest recent operations"""
+        return [(when, name, seconds * 1000)
+                for when, name, seconds in heapq.nlargest(count, list(self.recent), key=lambda r: r[2])]
+
+    def dump(self, path):
+        """Write the current statistics as JSON"""
+        report = {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'window': PERF_WINDOW,
+            'operations': [dict(zip(('name', 'calls', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms'), row))
+                           for row in self.stats()],
+            'slowest': [{'time': datetime.datetime.fromtimestamp(when).isoformat(timespec='seconds'),
+                         'name': name, 'ms': ms} for when, name, ms in self.slowest()],
+        }
+        with open(path + '.part', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(path + '.part', path)
+
+perf = PerfRecorder(enabled=os.environ.get('VEHICLE_PERF') == '1')
+
+def timed(name, arg=None):
+    """Record each call of the decorated function in perf.
+
+    With arg, the positional argument at that index is appended to the
+    name, e.g. the file name for save_json.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not perf.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                perf.record(f"{name}:{args[arg]}" if arg is not None else name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def ensure_dirs(data_dir=None):
+    """Create necessary directories if they don't exist"""
+    data_dir = data_dir or DATA_DIR
+    # A restore interrupted between its two renames left the old data aside
+    old = os.path.normpath(data_dir) + '.old'
+    if not os.path.exists(data_dir) and os.path.isdir(old):
+        os.rename(old, data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(os.path.join(data_dir, SIGNATURE_DIR), exist_ok=True)
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+
+# Several seats may share one data folder. Each save takes a lock file next
+# to the collection, compares the file with the version this process last
+# read or wrote, and merges record by record if another seat changed it.
+# Files are replaced atomically, so readers never take the lock.
+LOCK_TIMEOUT = 2.0  # seconds to wait for another seat's save
+LOCK_STALE = 30.0  # a lock this old was left by a crashed writer
+TRANSIENT_SUFFIXES = ('.part', '.lock')
+
+class WriteConflict(Exception):
+    pass
+
+_versions = {}  # path -> (sha1 of the bytes last read or written, zlib of those bytes)
+_reload_handler = None
+
+def set_reload_handler(handler):
+    """Call handler(filename) whenever save_json replaces a caller's list in place"""
+    global _reload_handler
+    _reload_handler = handler
+
+def remember_version(path, raw):
+    if raw is None:
+        _versions[os.path.abspath(path)] = (None, None)
+    else:
+        _versions[os.path.abspath(path)] = (hashlib.sha1(raw).digest(), zlib.compress(raw, 1))
+
+def is_transient(fname):
+    """Files that only exist while a save is in progress"""
+    return fname.endswith(TRANSIENT_SUFFIXES)
+
+@contextlib.contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+    """Hold path + '.lock' against other processes, also on other machines.
+
+    Exclusive creation works on network shares where byte-range locks
+    often do not.
+    """
+    lock = path + '.lock'
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > LOCK_STALE:
+                    os.remove(lock)
+                    continue
+            except OSError:
+                continue  # released in the meantime
+            if time.monotonic() > deadline:
+                raise WriteConflict(f"Το {os.path.basename(path)} αποθηκεύεται από άλλο σταθμό. Δοκιμάστε ξανά.")
+            time.sleep(0.02)
+    try:
+        os.write(fd, f"{socket.gethostname()} {os.getpid()}".encode('utf-8'))
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(lock)
+        except OSError:
+            pass
+
+def record_content(record):
+    """A record's fields without its ID, which changes whenever rows are renumbered.
+
+    Collections only hold flat records of JSON scalars, so this is hashable.
+    """
+    return tuple(sorted((k, v) for k, v in record.items() if k != 'id'))
+
+def record_changes(base_keys, records):
+    """Align records with the base version they were edited from.
+
+    Returns (aligned, changed, inserted): aligned[i] is the record that base
+    row i became, or None if it was deleted; changed holds the base rows
+    that were edited or deleted; inserted maps a base row to the new records
+    placed before it (len(base_keys) for the end).
+    """
+    keys = [record_content(r) for r in records]
+    aligned = [None] * len(base_keys)
+    changed = set()
+    inserted = defaultdict(list)
+    matcher = difflib.SequenceMatcher(None, base_keys, keys, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            aligned[i1:i2] = records[j1:j2]
+            continue
+        # Rows replaced one for one were edited in place
+        paired = min(i2 - i1, j2 - j1) if op == 'replace' else 0
+        aligned[i1:i1 + paired] = records[j1:j1 + paired]
+        changed.update(range(i1, i2))
+        inserted[i2].extend(records[j1 + paired:j2])
+    return aligned, changed, inserted
+
+# Fields that must stay unique after a merge, as the entry forms require
+MERGE_UNIQUE = {
+    'drivers.json': lambda d: d['name'].lower(),
+    'vehicles.json': lambda v: v['plate'].upper(),
+}
+
+def merge_records(filename, base, ours, theirs):
+    """Three-way merge of a collection edited by this and another process.
+
+    Records unchanged on one side take the other side's version; new
+    records from both are kept. Raises WriteConflict if both edited the
+    same record differently or the result breaks a uniqueness rule.
+    """
+    base_keys = [record_content(r) for r in base]
+    our_rows, our_changes, our_inserts = record_changes(base_keys, ours)
+    their_rows, their_changes, their_inserts = record_changes(base_keys, theirs)
+    conflict = WriteConflict(f"Οι αλλαγές στο {filename} συγκρούονται με αλλαγές άλλου σταθμού. "
+                             "Τα δεδομένα φορτώθηκαν ξανά, επαναλάβετε την αλλαγή.")
+    merged = []
+    for i in range(len(base) + 1):
+        theirs_new = their_inserts.get(i, [])
+        merged.extend(theirs_new)
+        seen = {record_content(r) for r in theirs_new}
+        merged.extend(r for r in our_inserts.get(i, ()) if record_content(r) not in seen)
+        if i == len(base):
+            break
+        record = their_rows[i] if i in their_changes else our_rows[i]
+        if i in our_changes and i in their_changes:
+            mine, other = our_rows[i], their_rows[i]
+            if (mine is None) != (other is None) or (mine is not None and record_content(mine) != record_content(other)):
+                raise conflict
+        if record is not None:
+            merged.append(record)
+    unique = MERGE_UNIQUE.get(filename)
+    if unique and len({unique(r) for r in merged}) != len(merged):
+        raise conflict
+    for idx, record in enumerate(merged):
+        record['id'] = idx + 1
+    return merged
+
+@timed('save_json', 0)
+def save_json(filename, data, data_dir=None, on_reload=None):
+    """Save data to JSON file with error handling.
+
+    If another process saved the file since this one read it, its changes
+    are merged into data in place first. On a conflict nothing is written
+    and data is replaced with the saved version. Either way rows may have
+    moved and IDs been renumbered, so on_reload (default: the handler set
+    with set_reload_handler) is called with the file name; callers holding
+    row numbers or IDs across the call must drop them then.
+    """
+    path = os.path.join(data_dir or DATA_DIR, filename)
+    reloaded = False
+    try:
+        with file_lock(path):
+            try:
+                with open(path, 'rb') as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                raw = None
+            # A file this process never read is simply overwritten, as before
+            version = _versions.get(os.path.abspath(path))
+            if raw is not None and version is not None and hashlib.sha1(raw).digest() != version[0]:
+                theirs = json.loads(raw.decode('utf-8'))
+                base = json.loads(zlib.decompress(version[1]).decode('utf-8')) if version[1] is not None else []
+                try:
+                    merged = merge_records(filename, base, data, theirs)
+                except WriteConflict:
+                    data[:] = theirs
+                    remember_version(path, raw)
+                    reloaded = True
+                    raise
+                data[:] = merged
+                reloaded = True
+            payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+            with open(path + '.part', 'wb') as f:
+                f.write(payload)
+            os.replace(path + '.part', path)
+            remember_version(path, payload)
+        return True
+    except WriteConflict as e:
+        log_error(f"Conflict saving {filename}: {str(e)}")
+        report_error("Σύγκρουση αλλαγών", str(e))
+        return False
+    except Exception as e:
+        log_error(f"Error saving {filename}: {str(e)}")
+        report_error("Σφάλμα αποθήκευσης δεδομένων", f"Σφάλμα αρχείου: {str(e)}")
+        return False
+    finally:
+        handler = on_reload or _reload_handler
+        if reloaded and handler:
+            handler(filename)
+
+@timed('load_json', 0)
+def load_json(filename, data_dir=None):
+    """Load data from JSON file with error handling"""
+    try:
+        filepath = os.path.join(data_dir or DATA_DIR, filename)
+        if os.path.exists(filepath):
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+                remember_version(filepath, raw)
+                data = json.loads(raw.decode('utf-8'))
+                
+                # Migrate old data format if needed
+                if filename == 'drivers.json' and data and 'id' not in data[0]:
+                    for i, item in enumerate(data):
+                        item['id'] = i + 1
+                    save_json(filename, data, data_dir)
+                    
+                elif filename == 'vehicles.json' and data and 'id' not in data[0]:
+                    for i, item in enumerate(data):
+                        item['id'] = i + 1
+                    save_json(filename, data, data_dir)
+                    
+                elif filename == 'trips.json' and data and 'id' not in data[0]:
+                    for i, item in enumerate(data):
+                        item['id'] = i + 1
+                    save_json(filename, data, data_dir)
+                    
+                elif filename == 'services.json' and data and 'id' not in data[0]:
+                    for i, item in enumerate(data):
+                        item['id'] = i + 1
+                    save_json(filename, data, data_dir)
+                
+                return data
+        remember_version(filepath, None)
+        return []
+    except Exception as e:
+        log_error(f"Error loading {filename}: {str(e)}")
+        report_error("Σφάλμα φόρτωσης δεδομένων", f"Σφάλμα αρχείου: {str(e)}")
+        return []
+
+def version_is_current(path):
+    """True if path still holds the bytes this process last read or wrote"""
+    version = _versions.get(os.path.abspath(path))
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return version is not None and version[0] is None
+    return version is not None and hashlib.sha1(raw).digest() == version[0]
+
+def diff_by_id(old, new):
+    """(changed [(old, new)], added, removed) between two versions of a collection"""
+    old_by_id = {r['id']: r for r in old}
+    new_ids = set()
+    changed, added = [], []
+    for record in new:
+        new_ids.add(record['id'])
+        before = old_by_id.get(record['id'])
+        if before is None:
+            added.append(record)
+        elif before != record:
+            changed.append((before, record))
+    removed = [r for r in old if r['id'] not in new_ids]
+    return changed, added, removed
+
+class DataDirWatcher:
+    """Report which collection files of a data folder were changed on disk.
+
+    Uses inotify on Linux and compares file stats everywhere else; changes()
+    never blocks, so the GUI can call it from a timer.
+    """
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, data_dir=None, files=None):
+        self.data_dir = data_dir or DATA_DIR
+        self.files = set(files or COLLECTION_FILES)
+        self.fd = None
+        self.wd = -1
+        self.libc = None
+        if sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            except (OSError, AttributeError):
+                fd = -1
+            if fd >= 0:
+                self.fd, self.libc = fd, libc
+                self.watch()
+        self.stats = self.scan() if self.fd is None else {}
+
+    @property
+    def mode(self):
+        return 'inotify' if self.fd is not None else 'polling'
+
+    def watch(self):
+        # A restore swaps in a new folder, so the watch follows the path, not the inode
+        mask = (self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_DELETE
+                | self.IN_DELETE_SELF | self.IN_MOVE_SELF)
+        self.wd = self.libc.inotify_add_watch(self.fd, os.fsencode(self.data_dir), mask)
+
+    def scan(self):
+        stats = {}
+        for fname in self.files:
+            try:
+                st = os.stat(os.path.join(self.data_dir, fname))
+                stats[fname] = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except OSError:
+                stats[fname] = None
+        return stats
+
+    def changes(self):
+        """Collection files changed since the last call"""
+        if self.fd is None:
+            stats = self.scan()
+            changed = {f for f in self.files if stats[f] != self.stats.get(f)}
+            self.stats = stats
+            return changed
+        changed = set()
+        lost = self.wd < 0
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = self.EVENT.unpack_from(buf, offset)
+                name = buf[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b'\0')
+                offset += self.EVENT.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    changed |= self.files
+                elif wd == self.wd and mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                    lost = True
+                elif name and os.fsdecode(name) in self.files:
+                    changed.add(os.fsdecode(name))
+        if lost:
+            if self.wd >= 0:
+                self.libc.inotify_rm_watch(self.fd, self.wd)
+            self.watch()
+            # Whatever the folder holds now may differ from what was loaded
+            if self.wd >= 0:
+                changed |= self.files
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def log_error(message):
+    """Log errors to file with timestamp"""
+    try:
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(LOG_FILE, 'a', encoding="utf-8") as f:
+            f.write(f"[{timestamp}] {message}\n")
+    except:
+        pass  # Avoid crashing if logging fails
+
+def backup_all_data(destination_folder):
+    """Backup data to specified folder with error handling"""
+    try:
+        os.makedirs(destination_folder, exist_ok=True)
+        for fname in os.listdir(DATA_DIR):
+            src = os.path.join(DATA_DIR, fname)
+            if os.path.isfile(src) and not is_transient(fname):
+                dst = os.path.join(destination_folder, fname)
+                shutil.copy2(src, dst)
+        copy_signature_blobs(DATA_DIR, destination_folder)
+        return True
+    except Exception as e:
+        log_error(f"Backup error: {str(e)}")
+        report_error("Σφάλμα Backup", f"Σφάλμα κατά τη δημιουργίας backup: {str(e)}")
+        return False
+
+def import_all_data(source_folder):
+    """Import data from backup folder with error handling"""
+    try:
+        imported = []
+        for fname in os.listdir(source_folder):
+            src = os.path.join(source_folder, fname)
+            if os.path.isfile(src) and fname.endswith('.json'):
+                dst = os.path.join(DATA_DIR, fname)
+                shutil.copy2(src, dst)
+                imported.append(fname)
+        copy_signature_blobs(source_folder, DATA_DIR)
+        return imported
+    except Exception as e:
+        log_error(f"Import error: {str(e)}")
+        report_error("Σφάλμα Εισαγωγής", f"Σφάλμα κατά την εισαγωγή δεδομένων: {str(e)}")
+        return []
+
+class BackupStore:
+    """Deduplicated incremental backups.
+
+    Objects are zlib-compressed blobs named by the SHA-256 of their content
+    and written once; each backup is a manifest mapping data files to
+    objects. JSON collections are split into record chunks at
+    content-defined boundaries, so unchanged records are shared between
+    backups even when the file around them changes.
+    """
+
+    CHUNK_MASK = 0x3f  # A boundary after ~1 in 64 records
+    MAX_CHUNK = 1 << 20
+
+    def __init__(self, root):
+        self.root = root
+        self.objects = os.path.join(root, 'objects')
+        self.manifest_dir = os.path.join(root, 'manifests')
+
+    def object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest)
+
+    def put_object(self, data):
+        """Store data once; returns (digest, compressed bytes newly written)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        packed = zlib.compress(data, 6)
+        tmp = path + '.part'
+        with open(tmp, 'wb') as f:
+            f.write(packed)
+        os.replace(tmp, path)
+        return digest, len(packed)
+
+    def get_object(self, digest):
+        with open(self.object_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Corrupt backup object {digest}")
+        return data
+
+    def record_chunks(self, records):
+        """Group serialized records into chunks whose boundaries depend only on content"""
+        chunk = []
+        length = 0
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+            chunk.append(line)
+            length += len(line)
+            if (zlib.crc32(line) & self.CHUNK_MASK) == 0 or length >= self.MAX_CHUNK:
+                yield b''.join(chunk)
+                chunk = []
+                length = 0
+        if chunk:
+            yield b''.join(chunk)
+
+    def manifests(self):
+        """Backup names, oldest first"""
+        if not os.path.isdir(self.manifest_dir):
+            return []
+        return sorted(f[:-5] for f in os.listdir(self.manifest_dir) if f.endswith('.json'))
+
+    def load_manifest(self, name):
+        with open(os.path.join(self.manifest_dir, name + '.json'), encoding='utf-8') as f:
+            return json.load(f)
+
+    @timed('backup:incremental')
+    def backup(self, data_dir):
+        """Back up every file under data_dir; returns (name, stats)"""
+        previous = {}
+        names = self.manifests()
+        if names:
+            previous = self.load_manifest(names[-1])['files']
+        stats = {'files': 0, 'unchanged': 0, 'objects': 0, 'bytes': 0}
+        files = {}
+        for folder, _, fnames in os.walk(data_dir):
+            for fname in sorted(fnames):
+                if is_transient(fname):
+                    continue
+                path = os.path.join(folder, fname)
+                rel = os.path.relpath(path, data_dir).replace(os.sep, '/')
+                st = os.stat(path)
+                stats['files'] += 1
+                old = previous.get(rel)
+                # Same size and mtime as last time: reuse the entry without reading the file
+                if old and old['size'] == st.st_size and old['mtime'] == st.st_mtime_ns:
+                    files[rel] = old
+                    stats['unchanged'] += 1
+                    continue
+                entry = {'size': st.st_size, 'mtime': st.st_mtime_ns}
+                with open(path, 'rb') as f:
+                    data = f.read()
+                records = None
+                if fname.endswith('.json') and '/' not in rel:
+                    try:
+                        records = json.loads(data.decode('utf-8'))
+                    except ValueError:
+                        records = None
+                if isinstance(records, list):
+                    entry['records'] = len(records)
+                    entry['chunks'] = []
+                    for chunk in self.record_chunks(records):
+                        digest, written = self.put_object(chunk)
+                        entry['chunks'].append(digest)
+                        stats['objects'] += bool(written)
+                        stats['bytes'] += written
+                else:
+                    digest, written = self.put_object(data)
+                    entry['object'] = digest
+                    stats['objects'] += bool(written)
+                    stats['bytes'] += written
+                files[rel] = entry
+        name = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        path = os.path.join(self.manifest_dir, name + '.json')
+        with open(path + '.part', 'w', encoding='utf-8') as f:
+            json.dump({'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                       'files': files}, f, ensure_ascii=False)
+        os.replace(path + '.part', path)
+        return name, stats
+
+    def file_data(self, entry):
+        """Contents of one manifest entry, JSON collections in save_json's format"""
+        if 'object' in entry:
+            return self.get_object(entry['object'])
+        records = []
+        for digest in entry['chunks']:
+            records.extend(json.loads(line) for line in self.get_object(digest).splitlines())
+        return json.dumps(records, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def iter_files(self, name):
+        """(relative path, bytes) for every file in a backup"""
+        for rel, entry in self.load_manifest(name)['files'].items():
+            yield rel, self.file_data(entry)
+
+    @timed('restore:incremental')
+    def restore_to(self, name, folder):
+        """Materialize a backup as a plain folder"""
+        for rel, data in self.iter_files(name):
+            path = os.path.join(folder, *rel.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+
+    def export_zip(self, name, zip_path):
+        """Write a backup as a standalone zip, laid out like a full backup"""
+        tmp = zip_path + '.part'
+        try:
+            with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zf:
+                files = {}
+                for rel, data in self.iter_files(name):
+                    zf.writestr(rel, data)
+                    files[rel] = manifest_entry(rel, hashlib.sha256(data).hexdigest(), len(data), data)
+                write_backup_manifest(zf, files)
+            os.replace(tmp, zip_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+COLLECTION_FILES = ('drivers.json', 'vehicles.json', 'trips.json', 'services.json')
+
+def file_digest(path, block=1 << 20):
+    """SHA-256 of a file, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(block), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def open_staging(data_dir):
+    """A fresh, empty staging directory next to data_dir"""
+    staging = os.path.normpath(data_dir) + '.staging'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    return staging
+
+@timed('restore:stage')
+def stage_zip(archive_path, staging, block=1 << 20):
+    """Stream every member of a backup zip into staging, rejecting unsafe paths"""
+    with zipfile.ZipFile(archive_path) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or info.filename == BACKUP_MANIFEST:
+                continue
+            parts = info.filename.replace('\\', '/').split('/')
+            if info.filename.startswith(('/', '\\')) or ':' in parts[0] or any(p in ('', '.', '..') for p in parts):
+                raise ValueError(f"Μη έγκυρη διαδρομή στο backup: {info.filename}")
+            dst = os.path.join(staging, *parts)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            # zipfile checks the member's CRC when the stream reaches its end
+            with zf.open(info) as src, open(dst, 'wb') as out:
+                shutil.copyfileobj(src, out, block)
+
+@timed('restore:finish')
+def finish_staging(staging, data_dir):
+    """Validate a staged restore and complete it from the live data.
+
+    Collections must parse as lists and signature blobs must match their
+    digest. Files the backup does not contain are carried over (hard linked
+    where possible). Returns the collection files whose content differs
+    from the live ones.
+    """
+    if not any(os.path.exists(os.path.join(staging, f)) for f in COLLECTION_FILES):
+        raise ValueError("Το backup δεν περιέχει δεδομένα")
+    for fname in COLLECTION_FILES:
+        path = os.path.join(staging, fname)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+                raise ValueError(f"Μη έγκυρο αρχείο στο backup: {fname}")
+    blob_dir = os.path.join(staging, SIGNATURE_DIR)
+    if os.path.isdir(blob_dir):
+        for fname in os.listdir(blob_dir):
+            if fname.endswith('.sig') and file_digest(os.path.join(blob_dir, fname)) != fname[:-4]:
+                raise ValueError(f"Κατεστραμμένη υπογραφή στο backup: {fname}")
+    
+    for folder, _, fnames in os.walk(data_dir):
+        for fname in fnames:
+            if is_transient(fname):
+                continue
+            src = os.path.join(folder, fname)
+            dst = os.path.join(staging, os.path.relpath(src, data_dir))
+            if os.path.exists(dst):
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+    
+    return {fname for fname in COLLECTION_FILES
+            if file_digest(os.path.join(staging, fname)) != file_digest(os.path.join(data_dir, fname))}
+
+def swap_data_dir(staging, data_dir):
+    """Make staging the live data directory; the switch itself is one rename.
+
+    The old directory is moved aside first and restored if the rename fails;
+    ensure_dirs also puts it back if the process dies in between.
+    """
+    old = os.path.normpath(data_dir) + '.old'
+    shutil.rmtree(old, ignore_errors=True)
+    os.rename(data_dir, old)
+    try:
+        os.rename(staging, data_dir)
+    except BaseException:
+        os.rename(old, data_dir)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+def validate_date(date_str):
+    """Validate date format (YYYY-MM-DD)"""
+    try:
+        datetime.datetime.strptime(date_str, '%Y-%m-%d')
+        return True
+    except ValueError:
+        return False
+
+def validate_time(time_str):
+    """Validate time format (HH:MM)"""
+    try:
+        datetime.datetime.strptime(time_str, '%H:%M')
+        return True
+    except ValueError:
+        return False
+
+@functools.lru_cache(maxsize=8192)
+def parse_date_ordinal(date_str):
+    """Parse a YYYY-MM-DD string to a date ordinal, or None if invalid"""
+    try:
+        return datetime.datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+    except (TypeError, ValueError):
+        return None
+
+KTEO_STATUS_KEYS = ("expired", "warning", "notice", "ok", "error")
+
+def kteo_status_for_days(delta):
+    """Map the days left until the next KΤΕΟ to a status key"""
+    if delta < 0:
+        return "expired"
+    elif delta < KTEO_WARNING_DAYS:
+        return "warning"
+    elif delta < KTEO_NOTICE_DAYS:
+        return "notice"
+    else:
+        return "ok"
+
+def kteo_status_batch(due_ordinals, today):
+    """KΤΕΟ status for a whole fleet in one pass.
+
+    due_ordinals is a sequence of date ordinals, None for unparsable dates.
+    """
+    now = today.toordinal()
+    if np is None:
+        return ["error" if d is None else kteo_status_for_days(d - now) for d in due_ordinals]
+    
+    due = np.fromiter((0 if d is None else d for d in due_ordinals), dtype=np.int64, count=len(due_ordinals))
+    # Index into KTEO_STATUS_KEYS: <0 expired, <15 warning, <30 notice, else ok
+    bounds = np.array([0, KTEO_WARNING_DAYS, KTEO_NOTICE_DAYS])
+    codes = np.searchsorted(bounds, due - now, side='right')
+    codes[due == 0] = len(KTEO_STATUS_KEYS) - 1
+    return np.asarray(KTEO_STATUS_KEYS)[codes].tolist()
+
+class KteoScheduler:
+    """Min-heap of the days on which a vehicle's KΤΕΟ status will change.
+
+    Entries are invalidated lazily: an entry whose due date no longer
+    matches the tracked vehicle is skipped when it reaches the top.
+    """
+
+    # Day offsets from the due date at which the status changes
+    CROSSINGS = (-(KTEO_NOTICE_DAYS - 1), -(KTEO_WARNING_DAYS - 1), 1)
+
+    def __init__(self):
+        self.heap = []  # (crossing ordinal, plate, due ordinal)
+        self.due = {}  # plate -> due ordinal, None if unparsable
+        self.status = {}  # plate -> last reported status
+
+    def track(self, plate, kteo_next, today):
+        """(Re)schedule a vehicle and return its current status"""
+        due = parse_date_ordinal(kteo_next)
+        self.due[plate] = due
+        
+        if due is None:
+            status = "error"
+        else:
+            now = today.toordinal()
+            status = kteo_status_for_days(due - now)
+            for offset in self.CROSSINGS:
+                if due + offset > now:
+                    heapq.heappush(self.heap, (due + offset, plate, due))
+        
+        self.status[plate] = status
+        self._compact()
+        return status
+
+    def untrack(self, plate):
+        self.due.pop(plate, None)
+        self.status.pop(plate, None)
+
+    def pop_due(self, today):
+        """Advance to today and return {plate: (old, new)} for changed vehicles"""
+        now = today.toordinal()
+        changed = {}
+        while self.heap and self.heap[0][0] <= now:
+            _, plate, due = heapq.heappop(self.heap)
+            if self.due.get(plate) != due:
+                continue  # Vehicle edited or deleted since this was scheduled
+            old = self.status.get(plate)
+            new = kteo_status_for_days(due - now)
+            if new != old:
+                self.status[plate] = new
+                first_old = changed.get(plate, (old, None))[0]
+                changed[plate] = (first_old, new)
+        return changed
+
+    def next_crossing(self):
+        """Ordinal of the earliest pending crossing, or None"""
+        while self.heap and self.due.get(self.heap[0][1]) != self.heap[0][2]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def _compact(self):
+        # Drop stale entries once they clearly outnumber live ones
+        if len(self.heap) > 4 * len(self.CROSSINGS) * (len(self.due) + 16):
+            self.heap = [e for e in self.heap if self.due.get(e[1]) == e[2]]
+            heapq.heapify(self.heap)
+
+def parse_datetime_minutes(text):
+    """Parse 'YYYY-MM-DD HH:MM' to minutes since 0001-01-01, or None if invalid"""
+    try:
+        date_str, time_str = text.split()
+        t = datetime.datetime.strptime(time_str, '%H:%M')
+    except (AttributeError, ValueError):
+        return None
+    day = parse_date_ordinal(date_str)
+    if day is None:
+        return None
+    return day * 1440 + t.hour * 60 + t.minute
+
+def format_minutes(minutes):
+    """Inverse of parse_datetime_minutes"""
+    day, rest = divmod(minutes, 1440)
+    return f"{datetime.date.fromordinal(day):%Y-%m-%d} {rest // 60:02d}:{rest % 60:02d}"
+
+def trip_interval(trip):
+    """(start, end) of a trip in minutes, or None if its times are invalid"""
+    start = parse_datetime_minutes(trip['depart'])
+    end = parse_datetime_minutes(trip['arrive'])
+    if start is None or end is None:
+        return None
+    return start, max(start, end)
+
+class IntervalIndex:
+    """Half-open intervals kept sorted by start for bisect overlap queries.
+
+    Anything overlapping [start, end) must begin after start minus the
+    longest stored interval, so a query only scans that narrow window.
+    Finding the position is O(log n), but add and remove shift the list
+    behind it, so they are O(n): a memmove over one driver's or vehicle's
+    trips, which stays cheap next to rebuilding the index.
+    """
+
+    def __init__(self):
+        self.items = []  # sorted (start, end, key)
+        self.longest = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, start, end, key):
+        bisect.insort(self.items, (start, end, key))
+        self.longest = max(self.longest, end - start)
+
+    def remove(self, start, end, key):
+        i = bisect.bisect_left(self.items, (start, end, key))
+        if i < len(self.items) and self.items[i] == (start, end, key):
+            del self.items[i]
+
+    def overlapping(self, start, end, exclude=None):
+        lo = bisect.bisect_left(self.items, (start - self.longest,))
+        hi = bisect.bisect_left(self.items, (end,))
+        return [item for item in self.items[lo:hi]
+                if item[1] > start and item[2] != exclude]
+
+    def conflicts(self):
+        """All overlapping pairs, found with one sweep in start order"""
+        pairs = []
+        active = []  # heap of (end, start, key) still open at the sweep point
+        for start, end, key in self.items:
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for a_end, a_start, a_key in active:
+                pairs.append(((a_start, a_end, a_key), (start, end, key)))
+            heapq.heappush(active, (end, start, key))
+        return pairs
+
+class BookingIndex:
+    """Per-driver and per-vehicle interval indexes over trips.
+
+    Trips are keyed by object identity, so renumbering IDs after a delete
+    does not invalidate the index.
+    """
+
+    def __init__(self):
+        self.by_driver = defaultdict(IntervalIndex)
+        self.by_vehicle = defaultdict(IntervalIndex)
+        self.trips = {}  # key -> (trip, interval)
+
+    def rebuild(self, trips):
+        self.__init__()
+        for trip in trips:
+            self.add_trip(trip)
+
+    def add_trip(self, trip):
+        interval = trip_interval(trip)
+        if interval is None:
+            return
+        key = id(trip)
+        self.trips[key] = (trip, interval, trip['driver'], trip['vehicle'])
+        self.by_driver[trip['driver']].add(*interval, key)
+        self.by_vehicle[trip['vehicle']].add(*interval, key)
+
+    def remove_trip(self, trip):
+        entry = self.trips.pop(id(trip), None)
+        if entry is None:
+            return
+        _, interval, driver, vehicle = entry
+        self.by_driver[driver].remove(*interval, id(trip))
+        self.by_vehicle[vehicle].remove(*interval, id(trip))
+
+    def check(self, driver, vehicle, start, end, exclude=None):
+        """Trips that would overlap a booking of driver and vehicle over [start, end)"""
+        exclude = id(exclude) if exclude is not None else None
+        found = {}
+        for index in (self.by_driver.get(driver), self.by_vehicle.get(vehicle)):
+            if index is not None:
+                for _, _, key in index.overlapping(start, end, exclude):
+                    found[key] = self.trips[key][0]
+        return sorted(found.values(), key=lambda t: t['depart'])
+
+    def conflicts(self):
+        """[(kind, resource, trip_a, trip_b)] for every double booking"""
+        report = []
+        for kind, indexes in (("driver", self.by_driver), ("vehicle", self.by_vehicle)):
+            for resource in sorted(indexes):
+                for a, b in indexes[resource].conflicts():
+                    report.append((kind, resource, self.trips[a[2]][0], self.trips[b[2]][0]))
+        return report
+
+def day_label(day):
+    return datetime.date.fromordinal(day).strftime('%Y-%m-%d')
+
+class ComplianceEngine:
+    """Driving hours and rest checks over each driver's time-sorted trips.
+
+    Minutes driven per driver per day are materialized as trips come and go,
+    so checking one trip only looks at the days, week and 14-day windows it
+    touches. audit() re-walks the full history with sliding windows.
+
+    Violations are (kind, driver, period, minutes) tuples where kind is one
+    of "daily", "weekly", "fortnight" or "rest".
+    """
+
+    def __init__(self):
+        self.timelines = defaultdict(IntervalIndex)  # driver -> trips by start
+        self.daily = defaultdict(Counter)  # driver -> {day ordinal: minutes}
+        self.trips = {}  # key -> (driver, interval)
+
+    def rebuild(self, trips):
+        self.__init__()
+        for trip in trips:
+            self.add_trip(trip)
+
+    @staticmethod
+    def split_days(start, end):
+        """Yield (day ordinal, minutes) for each calendar day of [start, end)"""
+        while start < end:
+            day = start // 1440
+            stop = min(end, (day + 1) * 1440)
+            yield day, stop - start
+            start = stop
+
+    def add_trip(self, trip):
+        interval = trip_interval(trip)
+        if interval is None:
+            return
+        driver = trip['driver']
+        self.trips[id(trip)] = (driver, interval)
+        self.timelines[driver].add(*interval, id(trip))
+        for day, minutes in self.split_days(*interval):
+            self.daily[driver][day] += minutes
+
+    def remove_trip(self, trip):
+        entry = self.trips.pop(id(trip), None)
+        if entry is None:
+            return
+        driver, interval = entry
+        self.timelines[driver].remove(*interval, id(trip))
+        daily = self.daily[driver]
+        for day, minutes in self.split_days(*interval):
+            daily[day] -= minutes
+            if daily[day] <= 0:
+                del daily[day]
+
+    def check_trip(self, trip, replacing=None):
+        """Violations the trip would cause, optionally in place of an existing one"""
+        interval = trip_interval(trip)
+        if interval is None:
+            return []
+        if replacing is not None:
+            self.remove_trip(replacing)
+        self.add_trip(trip)
+        try:
+            return self.violations_around(trip['driver'], *interval, key=id(trip))
+        finally:
+            self.remove_trip(trip)
+            if replacing is not None:
+                self.add_trip(replacing)
+
+    def violations_around(self, driver, start, end, key):
+        daily = self.daily[driver]
+        first, last = start // 1440, max(start, end - 1) // 1440
+        found = []
+        
+        for day in range(first, last + 1):
+            if daily.get(day, 0) > MAX_DAILY_DRIVING:
+                found.append(("daily", driver, day_label(day), daily[day]))
+        
+        for monday in sorted({d - (d - 1) % 7 for d in range(first, last + 1)}):
+            total = sum(daily.get(d, 0) for d in range(monday, monday + 7))
+            if total > MAX_WEEKLY_DRIVING:
+                found.append(("weekly", driver, f"{day_label(monday)} – {day_label(monday + 6)}", total))
+        
+        # Worst 14-day window that contains any of the trip's days
+        window = sum(daily.get(d, 0) for d in range(first - 13, first + 1))
+        worst, worst_end = window, first
+        for d in range(first + 1, last + 14):
+            window += daily.get(d, 0) - daily.get(d - 14, 0)
+            if window > worst:
+                worst, worst_end = window, d
+        if worst > MAX_FORTNIGHT_DRIVING:
+            found.append(("fortnight", driver, f"{day_label(worst_end - 13)} – {day_label(worst_end)}", worst))
+        
+        items = self.timelines[driver].items
+        i = bisect.bisect_left(items, (start, end, key))
+        if i > 0:
+            gap = start - items[i - 1][1]
+            if gap < MIN_REST_BETWEEN_TRIPS:
+                found.append(("rest", driver, f"{format_minutes(items[i - 1][1])} → {format_minutes(start)}", gap))
+        if i + 1 < len(items):
+            gap = items[i + 1][0] - end
+            if gap < MIN_REST_BETWEEN_TRIPS:
+                found.append(("rest", driver, f"{format_minutes(end)} → {format_minutes(items[i + 1][0])}", gap))
+        return found
+
+    def audit(self):
+        """Re-check the whole history of every driver"""
+        found = []
+        for driver in sorted(self.timelines):
+            daily = self.daily[driver]
+            days = sorted(daily)
+            
+            for day in days:
+                if daily[day] > MAX_DAILY_DRIVING:
+                    found.append(("daily", driver, day_label(day), daily[day]))
+            
+            weeks = Counter()
+            for day in days:
+                weeks[day - (day - 1) % 7] += daily[day]
+            for monday in sorted(weeks):
+                if weeks[monday] > MAX_WEEKLY_DRIVING:
+                    found.append(("weekly", driver, f"{day_label(monday)} – {day_label(monday + 6)}", weeks[monday]))
+            
+            # Sliding 14-day window over the driven days; report each run of
+            # over-limit windows once, at its peak
+            window, lo, peak = 0, 0, None
+            for hi, day in enumerate(days):
+                window += daily[day]
+                while days[lo] <= day - 14:
+                    window -= daily[days[lo]]
+                    lo += 1
+                if window > MAX_FORTNIGHT_DRIVING:
+                    if peak is None or window > peak[0]:
+                        peak = (window, day)
+                elif peak is not None:
+                    found.append(("fortnight", driver, f"{day_label(peak[1] - 13)} – {day_label(peak[1])}", peak[0]))
+                    peak = None
+            if peak is not None:
+                found.append(("fortnight", driver, f"{day_label(peak[1] - 13)} – {day_label(peak[1])}", peak[0]))
+            
+            prev_end = None
+            for start, end, _ in self.timelines[driver].items:
+                if prev_end is not None and start - prev_end < MIN_REST_BETWEEN_TRIPS:
+                    found.append(("rest", driver, f"{format_minutes(prev_end)} → {format_minutes(start)}", start - prev_end))
+                prev_end = end if prev_end is None else max(prev_end, end)
+        return found
+
+class ServiceTimeline:
+    """Each vehicle's services sorted by date, for bisect lookups and forecasting"""
+
+    FORECAST_INTERVALS = 6  # Recent service intervals the forecast looks at
+
+    def __init__(self):
+        self.by_vehicle = defaultdict(list)  # plate -> sorted (date ordinal, key)
+        self.services = {}  # key -> (service, plate, date ordinal)
+
+    def rebuild(self, services):
+        self.__init__()
+        for service in services:
+            self.add_service(service)
+
+    def add_service(self, service):
+        day = parse_date_ordinal(service['date'])
+        if day is None:
+            return
+        key = id(service)
+        self.services[key] = (service, service['vehicle'], day)
+        bisect.insort(self.by_vehicle[service['vehicle']], (day, key))
+
+    def remove_service(self, service):
+        entry = self.services.pop(id(service), None)
+        if entry is None:
+            return
+        _, plate, day = entry
+        timeline = self.by_vehicle[plate]
+        i = bisect.bisect_left(timeline, (day, id(service)))
+        if i < len(timeline) and timeline[i] == (day, id(service)):
+            del timeline[i]
+
+    def last_service(self, plate, before=None):
+        """Latest service of a vehicle, optionally strictly before a date ordinal"""
+        timeline = self.by_vehicle.get(plate)
+        if not timeline:
+            return None
+        i = len(timeline) if before is None else bisect.bisect_left(timeline, (before,))
+        return self.services[timeline[i - 1][1]][0] if i else None
+
+    def services_in_range(self, plate, start, end):
+        """Services with start <= date ordinal <= end, oldest first"""
+        timeline = self.by_vehicle.get(plate, [])
+        lo = bisect.bisect_left(timeline, (start,))
+        hi = bisect.bisect_left(timeline, (end + 1,))
+        return [self.services[key][0] for _, key in timeline[lo:hi]]
+
+    def intervals(self, plate):
+        """Days between consecutive services of a vehicle"""
+        days = [day for day, _ in self.by_vehicle.get(plate, [])]
+        return [b - a for a, b in zip(days, days[1:])]
+
+    def forecast_next(self, plate):
+        """(last date ordinal, typical interval, forecast ordinal) or None"""
+        timeline = self.by_vehicle.get(plate)
+        if not timeline or len(timeline) < 2:
+            return None
+        recent = [day for day, _ in timeline[-(self.FORECAST_INTERVALS + 1):]]
+        gaps = sorted(b - a for a, b in zip(recent, recent[1:]) if b > a)
+        if not gaps:
+            return None
+        typical = gaps[len(gaps) // 2]
+        return recent[-1], typical, recent[-1] + typical
+
+def filter_trips(trips, date_from=None, date_to=None, driver=None, vehicle=None):
+    """Yield trips departing within [date_from, date_to] for the given driver and vehicle"""
+    lo = parse_date_ordinal(date_from) if date_from else None
+    hi = parse_date_ordinal(date_to) if date_to else None
+    for trip in trips:
+        if driver and trip['driver'] != driver:
+            continue
+        if vehicle and trip['vehicle'] != vehicle:
+            continue
+        if lo is not None or hi is not None:
+            day = parse_date_ordinal(trip['depart'].split()[0])
+            if day is None or (lo is not None and day < lo) or (hi is not None and day > hi):
+                continue
+        yield trip
+
+def filter_services(services, date_from=None, date_to=None, vehicle=None):
+    """Yield services dated within [date_from, date_to] for the given vehicle"""
+    lo = parse_date_ordinal(date_from) if date_from else None
+    hi = parse_date_ordinal(date_to) if date_to else None
+    for service in services:
+        if vehicle and service['vehicle'] != vehicle:
+            continue
+        if lo is not None or hi is not None:
+            day = parse_date_ordinal(service['date'])
+            if day is None or (lo is not None and day < lo) or (hi is not None and day > hi):
+                continue
+        yield service
+
+# Exportable columns per collection: (record key, header)
+EXPORT_COLUMNS = {
+    'trips': (('id', 'ID'), ('driver', 'Οδηγός'), ('vehicle', 'Όχημα'), ('depart', 'Αναχώρηση'),
+              ('arrive', 'Άφιξη'), ('details', 'Λεπτομέρειες')),
+    'services': (('id', 'ID'), ('vehicle', 'Όχημα'), ('date', 'Ημερομηνία'), ('details', 'Λεπτομέρειες')),
+}
+
+class ExportCancelled(Exception):
+    pass
+
+def export_rows(path, fmt, headers, rows, on_progress=None, cancel=None, every=500):
+    """Stream rows to a CSV or XLSX file and return how many were written.
+
+    Rows are consumed one at a time and written straight out, so memory use
+    does not grow with the export. The file only appears under its final
+    name once complete.
+    """
+    tmp_path = path + '.part'
+    count = 0
+    try:
+        if fmt == 'xlsx':
+            if openpyxl is None:
+                raise RuntimeError("Η εξαγωγή XLSX απαιτεί το πακέτο openpyxl")
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet()
+            ws.append(list(headers))
+            write = ws.append
+        else:
+            f = open(tmp_path, 'w', encoding='utf-8-sig', newline='')
+            write = csv.writer(f).writerow
+            write(headers)
+        
+        try:
+            for row in rows:
+                write(row)
+                count += 1
+                if count % every == 0:
+                    if cancel is not None and cancel.is_set():
+                        raise ExportCancelled()
+                    if on_progress is not None:
+                        on_progress(count)
+            if fmt == 'xlsx':
+                wb.save(tmp_path)
+        finally:
+            if fmt != 'xlsx':
+                f.close()
+        
+        os.replace(tmp_path, path)
+        return count
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+BACKUP_LEVELS = [("Χωρίς συμπίεση", 0), ("Γρήγορη", 1), ("Κανονική", 6), ("Μέγιστη", 9)]
+
+@timed('backup:zip')
+def zip_backup(data_dir, path, level=6, snapshots=None, on_progress=None, cancel=None, block=1 << 20):
+    """Stream data_dir into a zip and return (files, bytes) written.
+
+    snapshots maps relative paths to bytes taken on the caller's thread, for
+    files that may be rewritten while the backup runs. Progress is reported
+    as on_progress(files_done, bytes_done, total_files, total_bytes). The
+    archive only appears under its final name once complete.
+    """
+    snapshots = snapshots or {}
+    members = []
+    for folder, _, fnames in os.walk(data_dir):
+        for fname in sorted(fnames):
+            if is_transient(fname):
+                continue
+            src = os.path.join(folder, fname)
+            rel = os.path.relpath(src, data_dir).replace(os.sep, '/')
+            size = len(snapshots[rel]) if rel in snapshots else os.path.getsize(src)
+            members.append((rel, src, size))
+    total_bytes = sum(size for _, _, size in members)
+    compression = zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED
+    tmp_path = path + '.part'
+    done_bytes = 0
+    files = {}
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', compression, compresslevel=level or None) as zf:
+            for done_files, (rel, src, size) in enumerate(members):
+                h = hashlib.sha256()
+                written = 0
+                # Opened by name, the member takes the archive's method and level
+                with zf.open(rel, 'w', force_zip64=size > 1 << 30) as out:
+                    if rel in snapshots:
+                        out.write(snapshots[rel])
+                        h.update(snapshots[rel])
+                        written = size
+                    else:
+                        with open(src, 'rb') as f:
+                            while True:
+                                chunk = f.read(block)
+                                if not chunk:
+                                    break
+                                out.write(chunk)
+                                h.update(chunk)
+                                written += len(chunk)
+                                if cancel is not None and cancel.is_set():
+                                    raise ExportCancelled()
+                done_bytes += written
+                files[rel] = manifest_entry(rel, h.hexdigest(), written, snapshots.get(rel))
+                if cancel is not None and cancel.is_set():
+                    raise ExportCancelled()
+                if on_progress is not None:
+                    on_progress(done_files + 1, done_bytes, len(members), total_bytes)
+            write_backup_manifest(zf, files)
+        os.replace(tmp_path, path)
+        return len(members), done_bytes
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+BACKUP_MANIFEST = 'manifest.json'
+VERIFY_SPLIT_BYTES = 8 << 20  # Archives smaller than this are checked by a single worker
+
+def manifest_entry(rel, digest, size, data=None):
+    """Manifest entry for one backup member; data is given for collections to count records.
+
+    A collection that does not parse gets no count but is still backed up as is.
+    """
+    entry = {'size': size, 'sha256': digest}
+    if rel in COLLECTION_FILES and data is not None:
+        try:
+            entry['records'] = len(json.loads(data.decode('utf-8')))
+        except ValueError:  # includes UnicodeDecodeError
+            pass
+    return entry
+
+def write_backup_manifest(zf, files):
+    manifest = {'created': datetime.datetime.now().isoformat(timespec='seconds'), 'files': files}
+    zf.writestr(BACKUP_MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+def read_backup_manifest(zf):
+    """The manifest of an open backup zip, or None for backups made before manifests"""
+    try:
+        return json.loads(zf.read(BACKUP_MANIFEST).decode('utf-8'))
+    except KeyError:
+        return None
+
+def verify_members(path, names, expected, block=1 << 20):
+    """Stream members of a backup zip and check them; returns (path, checked, problems).
+
+    Runs in a worker process. zipfile validates each member's CRC as it
+    reaches the end, which catches truncated and corrupt data; members with
+    a manifest entry are also checked against its size, hash and record count.
+    """
+    problems = []
+    checked = 0
+    try:
+        with zipfile.ZipFile(path) as zf:
+            for name in names:
+                h = hashlib.sha256()
+                size = 0
+                data = bytearray() if name in COLLECTION_FILES else None
+                try:
+                    with zf.open(name) as f:
+                        for chunk in iter(lambda: f.read(block), b''):
+                            h.update(chunk)
+                            size += len(chunk)
+                            if data is not None:
+                                data += chunk
+                except (zipfile.BadZipFile, zlib.error, EOFError, OSError) as e:
+                    problems.append(f"{name}: κατεστραμμένο ({e})")
+                    continue
+                checked += 1
+                entry = expected.get(name)
+                if entry is not None and (size != entry['size'] or h.hexdigest() != entry['sha256']):
+                    problems.append(f"{name}: δεν ταιριάζει με το manifest")
+                    continue
+                if data is not None:
+                    try:
+                        records = json.loads(bytes(data).decode('utf-8'))
+                    except ValueError:
+                        problems.append(f"{name}: μη έγκυρο JSON")
+                        continue
+                    if entry is not None and entry.get('records', len(records)) != len(records):
+                        problems.append(f"{name}: {len(records)} εγγραφές αντί για {entry['records']}")
+    except (zipfile.BadZipFile, OSError) as e:
+        problems.append(f"Σφάλμα ανάγνωσης: {e}")
+    return path, checked, problems
+
+def plan_verify(paths, workers):
+    """Split archives into groups of members of similar compressed size.
+
+    Returns (tasks for verify_members, per-archive results to fill in).
+    Only the central directories and manifests are read here.
+    """
+    tasks = []
+    results = {}
+    for path in paths:
+        result = results[path] = {'members': 0, 'checked': 0, 'manifest': False, 'problems': []}
+        try:
+            with zipfile.ZipFile(path) as zf:
+                manifest = read_backup_manifest(zf)
+                members = [info for info in zf.infolist()
+                           if not info.is_dir() and info.filename != BACKUP_MANIFEST]
+        except (zipfile.BadZipFile, OSError, ValueError) as e:
+            result['problems'].append(f"Μη αναγνώσιμο αρχείο: {e}")
+            continue
+        expected = manifest['files'] if manifest else {}
+        result['manifest'] = manifest is not None
+        result['members'] = len(members)
+        present = {info.filename for info in members}
+        result['problems'] += [f"{name}: λείπει από το αρχείο" for name in expected if name not in present]
+        
+        total = sum(info.compress_size for info in members)
+        count = max(1, min(workers, len(members), total // VERIFY_SPLIT_BYTES))
+        bins = [(0, i, []) for i in range(count)]
+        for info in sorted(members, key=lambda i: i.compress_size, reverse=True):
+            load, i, names = heapq.heappop(bins)
+            names.append(info.filename)
+            heapq.heappush(bins, (load + info.compress_size, i, names))
+        for _, _, names in bins:
+            if names:
+                tasks.append((path, names, {n: expected[n] for n in names if n in expected}))
+    return tasks, results
+
+def verify_report(results):
+    lines = []
+    for path, result in results.items():
+        name = os.path.basename(path)
+        if result['problems']:
+            lines.append(f"✗ {name}")
+            lines += [f"    {problem}" for problem in result['problems']]
+        else:
+            lines.append(f"✓ {name}: {result['checked']} αρχεία σωστά")
+        if not result['manifest'] and result['members']:
+            lines.append("    (χωρίς manifest: ελέγχθηκαν μόνο CRC και JSON)")
+    return "\n".join(lines)
+
+def trip_pdf_name(trip):
+    return f"trip_{trip['id']}_{trip['depart'].split()[0]}.pdf"
+
+# Greek-capable TrueType fonts tried in order: (regular, bold)
+PDF_FONT_CANDIDATES = (
+    (r"C:\Windows\Fonts\arial.ttf", r"C:\Windows\Fonts\arialbd.ttf"),
+    (r"C:\Windows\Fonts\segoeui.ttf", r"C:\Windows\Fonts\segoeuib.ttf"),
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/dejavu/DejaVuSans.ttf", "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf"),
+    ("/Library/Fonts/Arial Unicode.ttf", None),
+)
+
+@functools.lru_cache(maxsize=None)
+def pdf_fonts():
+    """Register a Greek-capable font once per process and return (regular, bold) names"""
+    for regular, bold in PDF_FONT_CANDIDATES:
+        if not os.path.exists(regular):
+            continue
+        try:
+            pdfmetrics.registerFont(TTFont('AppFont', regular))
+            bold_name = 'AppFont'
+            if bold and os.path.exists(bold):
+                pdfmetrics.registerFont(TTFont('AppFont-Bold', bold))
+                bold_name = 'AppFont-Bold'
+            pdfmetrics.registerFontFamily('AppFont', normal='AppFont', bold=bold_name, italic='AppFont', boldItalic=bold_name)
+            return 'AppFont', bold_name
+        except Exception as e:
+            log_error(f"Font registration error ({regular}): {str(e)}")
+    return 'Helvetica', 'Helvetica-Bold'
+
+@functools.lru_cache(maxsize=None)
+def pdf_styles():
+    """Paragraph and table styles shared by every PDF; built once, never mutated"""
+    base = getSampleStyleSheet()
+    regular, bold = pdf_fonts()
+    return {
+        'title': ParagraphStyle('AppTitle', parent=base['Heading1'], fontName=bold, alignment=1),
+        'heading': ParagraphStyle('AppHeading', parent=base['Heading2'], fontName=bold),
+        'body': ParagraphStyle('AppBody', parent=base['BodyText'], fontName=regular),
+        'table': TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), regular),
+            ('FONTNAME', (0, 0), (-1, 0), bold),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#e6e6e6")),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]),
+    }
+
+class FlowableStream(list):
+    """List facade that feeds doc.build from a generator.
+
+    Platypus consumes flowables from the front of the list it is given; this
+    keeps only a small buffer filled, so long reports never hold all of
+    their flowables at once.
+    """
+
+    LOW_WATER = 16
+
+    def __init__(self, flowables, batch=64):
+        super().__init__()
+        self.source = iter(flowables)
+        self.batch = batch
+
+    def _fill(self):
+        if self.source is not None and list.__len__(self) < self.LOW_WATER:
+            more = list(itertools.islice(self.source, self.batch))
+            if len(more) < self.batch:
+                self.source = None
+            self.extend(more)
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+def trip_pdf_elements(trip, data_dir):
+    """Flowables for one trip sheet, signature included"""
+    styles = pdf_styles()
+    info_style = styles['body']
+    elements = []
+    
+    # Title
+    elements.append(Paragraph("<b>ΚΑΤΑΓΓΕΛΙΑ ΔΙΑΔΡΟΜΗΣ</b>", styles['title']))
+    elements.append(Spacer(1, 24))
+    
+    # Driver and Vehicle
+    elements.append(Paragraph(f"<b>Οδηγός:</b> {xml_escape(trip['driver'])}", info_style))
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph(f"<b>Όχημα:</b> {xml_escape(trip['vehicle'])}", info_style))
+    elements.append(Spacer(1, 24))
+    
+    # Departure and Arrival
+    elements.append(Paragraph(f"<b>Αναχώρηση:</b> {xml_escape(trip['depart'])}", info_style))
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph(f"<b>Άφιξη:</b> {xml_escape(trip['arrive'])}", info_style))
+    elements.append(Spacer(1, 24))
+    
+    # Details
+    elements.append(Paragraph("<b>Λεπτομέρειες Διαδρομής:</b>", info_style))
+    elements.append(Spacer(1, 8))
+    elements.append(Paragraph(xml_escape(trip['details']).replace("\n", "<br/>"), info_style))
+    elements.append(Spacer(1, 36))
+    
+    # Signature, placed in the document flow and rasterized at print resolution
+    signature = trip_signature_png(trip, data_dir, scale=3)
+    if signature is not None:
+        with Image.open(io.BytesIO(signature)) as img:
+            img_width, img_height = img.size
+        max_width = 300
+        elements.append(Paragraph("<b>Υπογραφή Οδηγού:</b>", info_style))
+        elements.append(Spacer(1, 8))
+        elements.append(PdfImage(io.BytesIO(signature), width=max_width, height=max_width * img_height / float(img_width)))
+    
+    return elements
+
+@timed('pdf:trip')
+def render_trip_pdf(trip, fname, data_dir):
+    """Write one trip sheet. Also runs in worker processes, so it touches no UI"""
+    doc = SimpleDocTemplate(fname, pagesize=letter)
+    doc.build(trip_pdf_elements(trip, data_dir))
+    return fname
+
+@timed('pdf:trips')
+def render_trips_pdf(trips, fname, data_dir):
+    """Write many trip sheets into one PDF, each starting on a new page"""
+    def elements():
+        for i, trip in enumerate(trips):
+            if i:
+                yield PageBreak()
+            yield from trip_pdf_elements(trip, data_dir)
+    
+    doc = SimpleDocTemplate(fname, pagesize=letter)
+    doc.build(FlowableStream(elements()))
+    return fname
+
+def shorten(text, width):
+    """Single-line cell text cut to width characters"""
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+def report_tables(header, rows, col_widths, chunk=40):
+    """Yield a long table as several small ones, so rows are built lazily"""
+    style = pdf_styles()['table']
+    rows = iter(rows)
+    while True:
+        part = list(itertools.islice(rows, chunk))
+        if not part:
+            return
+        table = Table([header] + part, colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        yield table
+
+def month_bounds(month):
+    """First and last date of a 'YYYY-MM' month"""
+    first = datetime.datetime.strptime(month, '%Y-%m').date()
+    last = (first + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+    return first, last
+
+def fleet_report_flowables(month, trips, vehicles, statuses, aggregates, timeline):
+    """Generate the monthly fleet report one flowable at a time.
+
+    statuses holds each vehicle's KΤΕΟ status key, in the order of vehicles.
+    """
+    styles = pdf_styles()
+    first, last = month_bounds(month)
+    
+    yield Paragraph(f"ΜΗΝΙΑΙΑ ΑΝΑΦΟΡΑ ΣΤΟΛΟΥ {month}", styles['title'])
+    yield Paragraph(f"Δημιουργήθηκε: {datetime.datetime.now():%Y-%m-%d %H:%M}", styles['body'])
+    yield Spacer(1, 12)
+    
+    # Trips per driver and per vehicle, straight from the materialized counters
+    per_driver = sorted(((n, d) for (d, m), n in aggregates.trips_per_driver_month.items() if m == month), reverse=True)
+    per_vehicle = sorted(((n, v) for (v, m), n in aggregates.trips_per_vehicle_month.items() if m == month), reverse=True)
+    yield Paragraph(f"Διαδρομές: {sum(n for n, _ in per_driver)}", styles['heading'])
+    yield Paragraph("Ανά οδηγό", styles['body'])
+    yield from report_tables(["Οδηγός", "Διαδρομές"], ([d, n] for n, d in per_driver), [300, 100])
+    yield Spacer(1, 8)
+    yield Paragraph("Ανά όχημα", styles['body'])
+    yield from report_tables(["Όχημα", "Διαδρομές"], ([v, n] for n, v in per_vehicle), [300, 100])
+    yield Spacer(1, 12)
+    
+    # Trip log for the month
+    yield Paragraph("Αναλυτικά Διαδρομές", styles['heading'])
+    yield from report_tables(
+        ["Οδηγός", "Όχημα", "Αναχώρηση", "Άφιξη", "Λεπτομέρειες"],
+        ([t['driver'], t['vehicle'], t['depart'], t['arrive'], shorten(t['details'], 40)]
+         for t in filter_trips(trips, first.isoformat(), last.isoformat())),
+        [90, 70, 85, 85, 200])
+    yield Spacer(1, 12)
+    
+    # Service events, via the per-vehicle timelines
+    yield Paragraph("Service", styles['heading'])
+    first_day, last_day = first.toordinal(), last.toordinal()
+    service_rows = ([s['vehicle'], s['date'], shorten(s['details'], 80)]
+                    for plate in sorted(timeline.by_vehicle)
+                    for s in timeline.services_in_range(plate, first_day, last_day))
+    yield from report_tables(["Όχημα", "Ημερομηνία", "Λεπτομέρειες"], service_rows, [90, 85, 355])
+    yield Spacer(1, 12)
+    
+    # KΤΕΟ status of every vehicle
+    yield Paragraph("Κατάσταση ΚΤΕΟ", styles['heading'])
+    labels = {"expired": "ΛΗΓΜΕΝΟ", "warning": "ΠΡΟΣΕΧΩΣ", "notice": "ΚΟΝΤΑ", "ok": "ΕΝΤΑΞΕΙ", "error": "ΛΑΘΟΣ"}
+    yield from report_tables(
+        ["Πινακίδα", "ΚΤΕΟ πέρασε", "ΚΤΕΟ επόμενο", "Κατάσταση"],
+        ([v['plate'], v['kteo_passed'], v['kteo_next'], labels.get(st, st)] for v, st in zip(vehicles, statuses)),
+        [120, 110, 110, 110])
+
+@timed('pdf:fleet_report')
+def render_fleet_report(fname, month, trips, vehicles, statuses, aggregates, timeline):
+    doc = SimpleDocTemplate(fname, pagesize=letter, title=f"Αναφορά Στόλου {month}")
+    doc.build(FlowableStream(fleet_report_flowables(month, trips, vehicles, statuses, aggregates, timeline)))
+    return fname
+
+SIGNATURE_LINE_WIDTH = 2
+SIGNATURE_TOLERANCE = 0.75  # Largest deviation, in pixels, that decimation may drop
+SIGNATURE_INK = 34  # Grey level of '#222'
+
+def simplify_stroke(points, tolerance=SIGNATURE_TOLERANCE):
+    """Ramer-Douglas-Peucker decimation of a stroke's points"""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    limit = tolerance * tolerance
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        seg = dx * dx + dy * dy
+        best, index = 0, None
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if seg:
+                cross = dx * (py - y1) - dy * (px - x1)
+                dist = cross * cross / seg
+            else:
+                dist = (px - x1) ** 2 + (py - y1) ** 2
+            if dist > best:
+                best, index = dist, i
+        if index is not None and best > limit:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+def pack_strokes(strokes, size):
+    """Pack (width, points) strokes as zlib-compressed int16 coordinate deltas.
+
+    A width of 0 marks a run of raster pixels from (x0, y) to (x1, y), as
+    produced when migrating PNG signatures.
+    """
+    values = [size[0], size[1], len(strokes)]
+    for width, points in strokes:
+        values += [len(points), width]
+        px = py = 0
+        for x, y in points:
+            values += [x - px, y - py]
+            px, py = x, y
+    data = array.array('h', values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return zlib.compress(data.tobytes(), 9)
+
+def unpack_strokes(blob):
+    """Inverse of pack_strokes: returns (size, strokes)"""
+    data = array.array('h')
+    data.frombytes(zlib.decompress(blob))
+    if sys.byteorder == 'big':
+        data.byteswap()
+    values = iter(data)
+    size = (next(values), next(values))
+    strokes = []
+    for _ in range(next(values)):
+        count, width = next(values), next(values)
+        points = []
+        x = y = 0
+        for _ in range(count):
+            x += next(values)
+            y += next(values)
+            points.append((x, y))
+        strokes.append((width, points))
+    return size, strokes
+
+def encode_strokes(strokes, size):
+    """pack_strokes as base64 text, for strokes kept inline in a trip record"""
+    return base64.b64encode(pack_strokes(strokes, size)).decode('ascii')
+
+def decode_strokes(text):
+    return unpack_strokes(base64.b64decode(text))
+
+def draw_stroke(draw, width, points, scale=1.0):
+    """Draw one stroke onto a greyscale ImageDraw"""
+    if width == 0:
+        (x0, y), (x1, _) = points
+        draw.rectangle([x0 * scale, y * scale, (x1 + 1) * scale - 1, (y + 1) * scale - 1], fill=SIGNATURE_INK)
+        return
+    pts = [(x * scale, y * scale) for x, y in points]
+    line_width = max(1, round(width * scale))
+    if len(pts) == 1:
+        r = line_width / 2
+        draw.ellipse([pts[0][0] - r, pts[0][1] - r, pts[0][0] + r, pts[0][1] + r], fill=SIGNATURE_INK)
+    else:
+        draw.line(pts, fill=SIGNATURE_INK, width=line_width, joint='curve')
+
+def render_strokes(strokes, size, scale=1.0):
+    """Rasterize strokes to a greyscale image at any scale"""
+    img = Image.new('L', (max(1, round(size[0] * scale)), max(1, round(size[1] * scale))), 255)
+    draw = ImageDraw.Draw(img)
+    for width, points in strokes:
+        draw_stroke(draw, width, points, scale)
+    return img
+
+def strokes_from_image(img, threshold=160):
+    """Vectorize a raster signature as horizontal runs of dark pixels"""
+    gray = img.convert('L')
+    w, h = gray.size
+    ink = gray.tobytes().translate(bytes(1 if v < threshold else 0 for v in range(256)))
+    strokes = []
+    for y in range(h):
+        for run in re.finditer(b'\x01+', ink[y * w:(y + 1) * w]):
+            strokes.append((0, [(run.start(), y), (run.end() - 1, y)]))
+    return strokes
+
+class SignatureStore:
+    """Content-addressed signature blobs under the data directory.
+
+    Each blob is a packed set of strokes named by its SHA-256, so identical
+    signatures are stored once and trips reference them by digest rather
+    than by trip ID.
+    """
+
+    def __init__(self, data_dir):
+        self.root = os.path.join(data_dir, SIGNATURE_DIR)
+
+    def path(self, digest):
+        return os.path.join(self.root, digest + '.sig')
+
+    def put(self, strokes, size):
+        return self.put_blob(pack_strokes(strokes, size))
+
+    def put_blob(self, blob):
+        digest = hashlib.sha256(blob).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(self.root, exist_ok=True)
+            tmp = path + '.part'
+            with open(tmp, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        return digest
+
+    def strokes(self, digest):
+        return load_signature(self.root, digest)
+
+    def png(self, digest, scale=1.0):
+        return signature_png(self.root, digest, scale)
+
+    def collect(self, trips):
+        """Delete blobs no trip references; returns how many were removed.
+
+        Another seat sharing the folder may have saved trips this process
+        has not loaded, or written a blob for a trip it has not saved yet.
+        So the saved trips.json is read under its lock as well, and blobs
+        younger than SIGNATURE_GC_GRACE are kept.
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        trips_path = os.path.join(os.path.dirname(self.root), 'trips.json')
+        removed = 0
+        with file_lock(trips_path):
+            try:
+                with open(trips_path, encoding='utf-8') as f:
+                    saved = json.load(f)
+            except FileNotFoundError:
+                saved = []
+            used = {t['signature_ref'] for t in itertools.chain(trips, saved) if t.get('signature_ref')}
+            cutoff = time.time() - SIGNATURE_GC_GRACE
+            for fname in os.listdir(self.root):
+                path = os.path.join(self.root, fname)
+                if fname.endswith('.sig') and fname[:-4] not in used and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+@functools.lru_cache(maxsize=256)
+def load_signature(root, digest):
+    """Decoded (size, strokes) of a stored blob; blobs never change, so cache by digest"""
+    with open(os.path.join(root, digest + '.sig'), 'rb') as f:
+        size, strokes = unpack_strokes(f.read())
+    return size, tuple((width, tuple(points)) for width, points in strokes)
+
+@functools.lru_cache(maxsize=64)
+def signature_png(root, digest, scale=1.0):
+    """A stored signature rendered at scale as a 1-bit PNG"""
+    size, strokes = load_signature(root, digest)
+    return signature_image_png(render_strokes(strokes, size, scale))
+
+def signature_image_png(img):
+    buf = io.BytesIO()
+    img.convert('L').point(lambda v: 0 if v < 160 else 255, '1').save(buf, 'PNG', optimize=True)
+    return buf.getvalue()
+
+def copy_signature_blobs(src_dir, dst_dir):
+    """Copy signature blobs missing from dst_dir; existing digests are identical by definition"""
+    src_root = os.path.join(src_dir, SIGNATURE_DIR)
+    if not os.path.isdir(src_root):
+        return 0
+    dst_root = os.path.join(dst_dir, SIGNATURE_DIR)
+    os.makedirs(dst_root, exist_ok=True)
+    copied = 0
+    for fname in os.listdir(src_root):
+        dst = os.path.join(dst_root, fname)
+        if fname.endswith('.sig') and not os.path.exists(dst):
+            shutil.copy2(os.path.join(src_root, fname), dst)
+            copied += 1
+    return copied
+
+def trip_signature_png(trip, data_dir, scale=1.0):
+    """PNG bytes of the trip's signature, or None if it has none"""
+    if trip.get('signature_ref'):
+        return signature_png(os.path.join(data_dir, SIGNATURE_DIR), trip['signature_ref'], scale)
+    if trip.get('signature_strokes'):
+        size, strokes = decode_strokes(trip['signature_strokes'])
+        return signature_image_png(render_strokes(strokes, size, scale))
+    if trip.get('signature'):
+        path = os.path.join(data_dir, trip['signature'])
+        if os.path.exists(path):
+            with Image.open(path) as img:
+                img = img.convert('L')
+            if scale != 1.0:
+                img = img.resize((round(img.width * scale), round(img.height * scale)))
+            return signature_image_png(img)
+    return None
+
+def migrate_signature_files(trips, data_dir):
+    """Move legacy PNG and inline signatures into the blob store.
+
+    Returns (number of trips converted, PNG paths that can be deleted once
+    the trips are saved).
+    """
+    store = SignatureStore(data_dir)
+    count = 0
+    old_files = []
+    for trip in trips:
+        if trip.get('signature_strokes'):
+            size, strokes = decode_strokes(trip.pop('signature_strokes'))
+            trip['signature_ref'] = store.put(strokes, size)
+            count += 1
+        name = trip.pop('signature', None)
+        if not name:
+            continue
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            with Image.open(path) as img:
+                size = img.size
+                strokes = strokes_from_image(img)
+            if strokes and not trip.get('signature_ref'):
+                trip['signature_ref'] = store.put(strokes, size)
+            count += 1
+            old_files.append(path)
+    return count, old_files
+
+def normalize_name(name):
+    return ' '.join(str(name).split()).casefold()
+
+def normalize_plate(plate):
+    return re.sub(r'[\s.\-]', '', str(plate)).upper()
+
+def record_key(*fields):
+    """Content hash identifying a trip or service independently of its ID"""
+    return hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode('utf-8')).digest()
+
+def trip_key(trip):
+    return record_key(trip.get('driver'), trip.get('vehicle'), trip.get('depart'), trip.get('arrive'),
+                      trip.get('details', ''))
+
+def service_key(service):
+    return record_key(service.get('vehicle'), service.get('date'), service.get('details', ''))
+
+@contextlib.contextmanager
+def open_backup_source(path):
+    """Yield (collections, read) for a backup zip or folder without extracting it.
+
+    read(relative path) returns the file's bytes, or None if it is missing.
+    """
+    if os.path.isdir(path):
+        def read(rel):
+            full = os.path.join(path, *rel.split('/'))
+            if not os.path.isfile(full):
+                return None
+            with open(full, 'rb') as f:
+                return f.read()
+        zf = None
+    else:
+        zf = zipfile.ZipFile(path)
+        names = set(zf.namelist())
+        def read(rel):
+            return zf.read(rel) if rel in names else None
+    try:
+        collections = {}
+        for fname in COLLECTION_FILES:
+            data = read(fname)
+            collections[fname[:-5]] = json.loads(data.decode('utf-8')) if data else []
+        yield collections, read
+    finally:
+        if zf is not None:
+            zf.close()
+
+def incoming_signature(trip, read, blobs):
+    """Digest of an incoming trip's signature as a store blob, queued in blobs.
+
+    Inline strokes and legacy PNG files (named by the other side's trip IDs)
+    are converted, so every merged signature is a content reference.
+    """
+    if trip.get('signature_ref'):
+        ref = trip['signature_ref']
+        blob = read(f"{SIGNATURE_DIR}/{ref}.sig")
+        if blob is None or hashlib.sha256(blob).hexdigest() != ref:
+            return None
+    elif trip.get('signature_strokes'):
+        blob = base64.b64decode(trip['signature_strokes'])
+    elif trip.get('signature'):
+        data = read(trip['signature'])
+        if data is None:
+            return None
+        with Image.open(io.BytesIO(data)) as img:
+            blob = pack_strokes(strokes_from_image(img), img.size)
+    else:
+        return None
+    digest = hashlib.sha256(blob).hexdigest()
+    blobs[digest] = blob
+    return digest
+
+def plan_merge(local, incoming, read):
+    """Merge incoming collections into copies of the local ones, in linear time.
+
+    Drivers and vehicles are hash-joined on normalized name and plate, and
+    incoming trips and services are rewritten to the local spelling. Trips
+    and services whose content hash is already present are skipped. New
+    records get IDs after the local ones. Nothing is written here; the plan
+    is reported as a dry run and applied with apply_merge.
+    """
+    stats = {}
+    notes = []
+    
+    drivers = list(local['drivers'])
+    names = {}
+    for d in drivers:
+        names.setdefault(normalize_name(d['name']), d['name'])
+    added = matched = 0
+    next_id = max((d['id'] for d in drivers), default=0) + 1
+    for d in incoming['drivers']:
+        key = normalize_name(d.get('name', ''))
+        if not key:
+            continue
+        if key in names:
+            matched += 1
+            if names[key] != d['name']:
+                notes.append(f"Οδηγός «{d['name']}» → «{names[key]}»")
+            continue
+        names[key] = d['name']
+        drivers.append({**d, 'id': next_id})
+        next_id += 1
+        added += 1
+    stats['drivers'] = (added, matched)
+    
+    vehicles = list(local['vehicles'])
+    plates = {}
+    for v in vehicles:
+        plates.setdefault(normalize_plate(v['plate']), v)
+    added = matched = 0
+    next_id = max((v['id'] for v in vehicles), default=0) + 1
+    for v in incoming['vehicles']:
+        key = normalize_plate(v.get('plate', ''))
+        if not key:
+            continue
+        mine = plates.get(key)
+        if mine is not None:
+            matched += 1
+            if mine['plate'] != v['plate']:
+                notes.append(f"Όχημα «{v['plate']}» → «{mine['plate']}»")
+            if (mine.get('kteo_passed'), mine.get('kteo_next')) != (v.get('kteo_passed'), v.get('kteo_next')):
+                notes.append(f"Σύγκρουση ΚΤΕΟ για {mine['plate']}: τοπικά {mine.get('kteo_passed')} / "
+                             f"{mine.get('kteo_next')}, εισερχόμενα {v.get('kteo_passed')} / "
+                             f"{v.get('kteo_next')} (κρατήθηκαν τα τοπικά)")
+            continue
+        vehicle = {**v, 'id': next_id}
+        plates[key] = vehicle
+        vehicles.append(vehicle)
+        next_id += 1
+        added += 1
+    stats['vehicles'] = (added, matched)
+    
+    def driver_name(name):
+        return names.get(normalize_name(name), name)
+    
+    def plate(value):
+        vehicle = plates.get(normalize_plate(value))
+        return vehicle['plate'] if vehicle is not None else value
+    
+    blobs = {}
+    trips = list(local['trips'])
+    seen = {trip_key(t) for t in trips}
+    added = duplicates = 0
+    next_id = max((t['id'] for t in trips), default=0) + 1
+    for t in incoming['trips']:
+        trip = dict(t, driver=driver_name(t.get('driver', '')), vehicle=plate(t.get('vehicle', '')))
+        key = trip_key(trip)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        signature = incoming_signature(trip, read, blobs)
+        if signature is None and any(trip.get(f) for f in ('signature_ref', 'signature_strokes', 'signature')):
+            notes.append(f"Η υπογραφή της διαδρομής {trip.get('depart')} ({trip['driver']}) δεν βρέθηκε")
+        for field in ('signature_ref', 'signature_strokes', 'signature'):
+            trip.pop(field, None)
+        if signature:
+            trip['signature_ref'] = signature
+        trip['id'] = next_id
+        trips.append(trip)
+        next_id += 1
+        added += 1
+    stats['trips'] = (added, duplicates)
+    
+    services = list(local['services'])
+    seen = {service_key(s) for s in services}
+    added = duplicates = 0
+    next_id = max((s['id'] for s in services), default=0) + 1
+    for s in incoming['services']:
+        service = dict(s, vehicle=plate(s.get('vehicle', '')))
+        key = service_key(service)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        service['id'] = next_id
+        services.append(service)
+        next_id += 1
+        added += 1
+    stats['services'] = (added, duplicates)
+    
+    return {
+        'collections': {'drivers': drivers, 'vehicles': vehicles, 'trips': trips, 'services': services},
+        'blobs': blobs,
+        'stats': stats,
+        'notes': notes,
+    }
+
+def merge_report(plan):
+    labels = [('drivers', "Οδηγοί", "υπάρχοντες"), ('vehicles', "Οχήματα", "υπάρχοντα"),
+              ('trips', "Διαδρομές", "διπλότυπες"), ('services', "Service", "διπλότυπα")]
+    lines = ["Προεπισκόπηση συγχώνευσης (δεν έχει γίνει καμία αλλαγή)", ""]
+    for key, label, skipped in labels:
+        added, other = plan['stats'][key]
+        lines.append(f"{label}: {added} νέα, {other} {skipped}")
+    lines.append(f"Νέες υπογραφές: {len(plan['blobs'])}")
+    if plan['notes']:
+        lines += ["", "Ταυτίσεις και συγκρούσεις:"]
+        lines += [f"• {note}" for note in plan['notes']]
+    return "\n".join(lines)
+
+def apply_merge(plan, data_dir):
+    """Write a merge plan's signature blobs; returns the collections that gained records"""
+    store = SignatureStore(data_dir)
+    for blob in plan['blobs'].values():
+        store.put_blob(blob)
+    return {f"{key}.json" for key, (added, _) in plan['stats'].items() if added}
+
+IMPORT_COLUMNS = {
+    'drivers': (('name', 'Όνομα'),),
+    'vehicles': (('plate', 'Πινακίδα'), ('kteo_passed', 'ΚΤΕΟ'), ('kteo_next', 'Επόμενο ΚΤΕΟ')),
+    'trips': EXPORT_COLUMNS['trips'][1:],
+    'services': EXPORT_COLUMNS['services'][1:],
+}
+
+def read_import_csv(path, collection):
+    """Columns of a CSV file as {key: [values]} plus the line each row ends on.
+
+    Headers may be the field keys or the Greek headers used by exports;
+    an ID column is ignored since imported records get new IDs.
+    """
+    names = {}
+    for key, header in IMPORT_COLUMNS[collection]:
+        names[key] = key
+        names[header.casefold()] = key
+    columns = {key: [] for key, _ in IMPORT_COLUMNS[collection]}
+    lines = []
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        first = f.readline()
+        f.seek(0)
+        reader = csv.reader(f, delimiter=';' if first.count(';') > first.count(',') else ',')
+        header = next(reader, [])
+        positions = {names[h.strip().casefold()]: i for i, h in enumerate(header) if h.strip().casefold() in names}
+        missing = [h for key, h in IMPORT_COLUMNS[collection] if key not in positions and key != 'details']
+        if missing:
+            raise ValueError(f"{os.path.basename(path)}: λείπουν οι στήλες {', '.join(missing)}")
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            for key, values in columns.items():
+                i = positions.get(key)
+                values.append(row[i].strip() if i is not None and i < len(row) else '')
+            lines.append(reader.line_num)
+    return columns, lines
+
+def parse_column(values, parse):
+    """Parse a whole column, each distinct value once; -1 marks invalid entries"""
+    lookup = {}
+    for value in set(values):
+        parsed = parse(value)
+        lookup[value] = -1 if parsed is None else parsed
+    if np is not None:
+        return np.fromiter((lookup[v] for v in values), dtype=np.int64, count=len(values))
+    return [lookup[v] for v in values]
+
+def invalid_rows(parsed):
+    """Row positions where parse_column found an invalid value"""
+    if np is not None:
+        return np.flatnonzero(parsed < 0).tolist()
+    return [i for i, v in enumerate(parsed) if v < 0]
+
+def plan_csv_import(collections, sources):
+    """Validate CSV files against the current collections, column by column.
+
+    sources maps collection names to CSV paths. Dates and times are parsed
+    once per distinct value, duplicates are found with hash sets, and every
+    problem is collected instead of stopping at the first. Files are
+    processed drivers first, so trips may refer to drivers imported in the
+    same run. Nothing is changed here; see apply_csv_import.
+    """
+    plan = {'added': {}, 'duplicates': {}, 'rows': {}, 'errors': []}
+    known_drivers = {d['name'] for d in collections['drivers']}
+    known_plates = {v['plate'] for v in collections['vehicles']}
+    
+    for name in ('drivers', 'vehicles', 'trips', 'services'):
+        if name not in sources:
+            continue
+        path = sources[name]
+        fname = os.path.basename(path)
+        columns, lines = read_import_csv(path, name)
+        count = len(lines)
+        bad = {}  # row -> first error
+        
+        def flag(rows, message):
+            for i in rows:
+                bad.setdefault(i, message)
+        
+        def required(key, message):
+            flag([i for i, v in enumerate(columns[key]) if not v], message)
+        
+        if name == 'drivers':
+            required('name', "Συμπληρώστε όνομα οδηγού")
+            seen = {d.lower() for d in known_drivers}
+            keys = [v.lower() for v in columns['name']]
+        elif name == 'vehicles':
+            columns['plate'] = [v.upper() for v in columns['plate']]
+            required('plate', "Συμπληρώστε πινακίδα οχήματος")
+            flag(invalid_rows(parse_column(columns['kteo_passed'], parse_date_ordinal)),
+                 "Μη έγκυρη ημερομηνία ΚΤΕΟ (YYYY-MM-DD)")
+            flag(invalid_rows(parse_column(columns['kteo_next'], parse_date_ordinal)),
+                 "Μη έγκυρη ημερομηνία επόμενου ΚΤΕΟ (YYYY-MM-DD)")
+            seen = set(known_plates)
+            keys = columns['plate']
+        elif name == 'trips':
+            columns['vehicle'] = [v.upper() for v in columns['vehicle']]
+            flag([i for i, v in enumerate(columns['driver']) if v not in known_drivers], "Άγνωστος οδηγός")
+            flag([i for i, v in enumerate(columns['vehicle']) if v not in known_plates], "Άγνωστο όχημα")
+            depart = parse_column(columns['depart'], parse_datetime_minutes)
+            arrive = parse_column(columns['arrive'], parse_datetime_minutes)
+            flag(invalid_rows(depart), "Μη έγκυρη αναχώρηση (YYYY-MM-DD HH:MM)")
+            flag(invalid_rows(arrive), "Μη έγκυρη άφιξη (YYYY-MM-DD HH:MM)")
+            if np is not None:
+                early = np.flatnonzero((arrive < depart) & (arrive >= 0)).tolist()
+            else:
+                early = [i for i, (a, d) in enumerate(zip(arrive, depart)) if 0 <= a < d]
+            flag(early, "Η άφιξη είναι πριν από την αναχώρηση")
+            seen = {trip_key(t) for t in collections['trips']}
+            keys = [record_key(*fields) for fields in zip(columns['driver'], columns['vehicle'], columns['depart'],
+                                                          columns['arrive'], columns['details'])]
+        else:
+            columns['vehicle'] = [v.upper() for v in columns['vehicle']]
+            flag([i for i, v in enumerate(columns['vehicle']) if v not in known_plates], "Άγνωστο όχημα")
+            flag(invalid_rows(parse_column(columns['date'], parse_date_ordinal)), "Μη έγκυρη ημερομηνία (YYYY-MM-DD)")
+            required('details', "Συμπληρώστε λεπτομέρειες service")
+            seen = {service_key(s) for s in collections['services']}
+            keys = [record_key(*fields) for fields in zip(columns['vehicle'], columns['date'], columns['details'])]
+        
+        added = []
+        duplicates = 0
+        next_id = max((r['id'] for r in collections[name]), default=0) + 1
+        fields = list(columns)
+        for i in range(count):
+            if i in bad:
+                plan['errors'].append((fname, lines[i], bad[i]))
+                continue
+            if keys[i] in seen:
+                duplicates += 1
+                continue
+            seen.add(keys[i])
+            record = {'id': next_id + len(added)}
+            record.update((key, columns[key][i]) for key in fields)
+            added.append(record)
+        
+        if name == 'drivers':
+            known_drivers.update(r['name'] for r in added)
+        elif name == 'vehicles':
+            known_plates.update(r['plate'] for r in added)
+        plan['added'][name] = added
+        plan['duplicates'][name] = duplicates
+        plan['rows'][name] = count
+    plan['errors'].sort()
+    return plan
+
+def apply_csv_import(collections, plan):
+    """Append a plan's valid rows; returns the collection files to save, once each"""
+    changed = set()
+    for name, records in plan['added'].items():
+        if records:
+            collections[name].extend(records)
+            changed.add(f"{name}.json")
+    return changed
+
+def csv_import_report(plan, limit=500):
+    labels = {'drivers': "Οδηγοί", 'vehicles': "Οχήματα", 'trips': "Διαδρομές", 'services': "Service"}
+    lines = []
+    for name, label in labels.items():
+        if name in plan['rows']:
+            lines.append(f"{label}: {plan['rows'][name]} γραμμές, {len(plan['added'][name])} έγκυρες νέες, "
+                         f"{plan['duplicates'][name]} διπλότυπες")
+    errors = plan['errors']
+    lines += ["", f"Σφάλματα: {len(errors)}"]
+    lines += [f"• {fname}, γραμμή {line}: {message}" for fname, line, message in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f"… και {len(errors) - limit} ακόμη")
+    return "\n".join(lines)
+
+class FleetAggregates:
+    """Materialized fleet counters, kept current by every add/edit/delete.
+
+    Each counter is adjusted by the record that changed, so reading them
+    never scans the trip or service history.
+    """
+
+    def __init__(self):
+        self.trips_per_driver = Counter()
+        self.trips_per_driver_month = Counter()  # (driver, 'YYYY-MM') -> trips
+        self.trips_per_vehicle_month = Counter()  # (plate, 'YYYY-MM') -> trips
+        self.services_per_vehicle = Counter()
+        self.kteo_status = Counter()
+        self.vehicle_status = {}  # plate -> status currently counted
+
+    def rebuild(self, vehicle_status, trips, services):
+        self.__init__()
+        for plate, status in vehicle_status.items():
+            self.set_vehicle_status(plate, status)
+        for t in trips:
+            self.add_trip(t)
+        for s in services:
+            self.add_service(s)
+
+    @staticmethod
+    def _bump(counter, key, delta):
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+    def add_trip(self, trip, delta=1):
+        self._bump(self.trips_per_driver, trip['driver'], delta)
+        self._bump(self.trips_per_driver_month, (trip['driver'], trip['depart'][:7]), delta)
+        self._bump(self.trips_per_vehicle_month, (trip['vehicle'], trip['depart'][:7]), delta)
+
+    def remove_trip(self, trip):
+        self.add_trip(trip, -1)
+
+    def add_service(self, service, delta=1):
+        self._bump(self.services_per_vehicle, service['vehicle'], delta)
+
+    def remove_service(self, service):
+        self.add_service(service, -1)
+
+    def set_vehicle_status(self, plate, status):
+        old = self.vehicle_status.get(plate)
+        if old == status:
+            return
+        if old is not None:
+            self._bump(self.kteo_status, old, -1)
+        self.vehicle_status[plate] = status
+        self._bump(self.kteo_status, status, 1)
+
+    def remove_vehicle(self, plate):
+        old = self.vehicle_status.pop(plate, None)
+        if old is not None:
+            self._bump(self.kteo_status, old, -1)
+
+KTEO_STATUS_LABELS = {
+    "expired": ("ΛΗΓΜΕΝΟ", "danger"),
+    "warning": ("ΠΡΟΣΕΧΩΣ", "warning"),
+    "notice": ("ΚΟΝΤΑ", "info"),
+    "ok": ("ΕΝΤΑΞΕΙ", "success"),
+    "error": ("ΛΑΘΟΣ", "danger")
+}
+
+def describe_violation(violation):
+    kind, driver, period, minutes = violation
+    hours = f"{minutes // 60}:{minutes % 60:02d}"
+    if kind == "daily":
+        return f"{driver}: {hours} ώρες οδήγησης στις {period} (όριο {MAX_DAILY_DRIVING // 60})"
+    elif kind == "weekly":
+        return f"{driver}: {hours} ώρες οδήγησης την εβδομάδα {period} (όριο {MAX_WEEKLY_DRIVING // 60})"
+    elif kind == "fortnight":
+        return f"{driver}: {hours} ώρες οδήγησης στο δεκαπενθήμερο {period} (όριο {MAX_FORTNIGHT_DRIVING // 60})"
+    else:
+        return f"{driver}: ανάπαυση {max(minutes, 0)}' μεταξύ διαδρομών {period} (ελάχιστο {MIN_REST_BETWEEN_TRIPS}')"
+
+def describe_conflicts(conflicts):
+    lines = []
+    for kind, resource, a, b in conflicts:
+        label = "ΟΔΗΓΟΣ" if kind == "driver" else "ΟΧΗΜΑ"
+        lines.append(f"{label}: {resource}")
+        lines.append(f"   #{a['id']} {a['depart']} → {a['arrive']} ({a['driver']} - {a['vehicle']})")
+        lines.append(f"   #{b['id']} {b['depart']} → {b['arrive']} ({b['driver']} - {b['vehicle']})")
+    return lines
+
+SEARCH_FIELDS = {
+    'drivers': ('name',),
+    'vehicles': ('plate', 'kteo_passed', 'kteo_next'),
+    'trips': ('driver', 'vehicle', 'details', 'depart', 'arrive'),
+    'services': ('vehicle', 'details', 'date'),
+}
+
+def search_records(query, collections):
+    """(collection name, record) for every record with a field containing query, case-insensitively"""
+    query = query.lower()
+    for name, fields in SEARCH_FIELDS.items():
+        for record in collections.get(name, ()):
+            if any(query in str(record.get(field, '')).lower() for field in fields):
+                yield name, record
+
+class FleetStore:
+    """The four collections of a data directory and their indexes, without a GUI.
+
+    Applies the same rules as the entry forms, raising ValueError with the
+    form's message when a record is rejected, so scripts and the command
+    line can make the changes VehicleManager does.
+    """
+
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir or DATA_DIR
+        ensure_dirs(self.data_dir)
+        self.drivers = load_json('drivers.json', self.data_dir)
+        self.vehicles = load_json('vehicles.json', self.data_dir)
+        self.trips = load_json('trips.json', self.data_dir)
+        self.services = load_json('services.json', self.data_dir)
+        self.bookings = BookingIndex()
+        self.bookings.rebuild(self.trips)
+
+    def collections(self):
+        return {'drivers': self.drivers, 'vehicles': self.vehicles, 'trips': self.trips, 'services': self.services}
+
+    def save(self, name):
+        """Write one collection; returns False if it could not be saved.
+
+        Changes another process saved meanwhile are merged in first.
+        """
+        return save_json(f"{name}.json", getattr(self, name), self.data_dir, on_reload=self.reindex)
+
+    def reindex(self, filename):
+        if filename == 'trips.json':
+            self.bookings.rebuild(self.trips)
+
+    @staticmethod
+    def next_id(records):
+        return max((r['id'] for r in records), default=0) + 1
+
+    # Fields each collection takes from a caller, with their defaults
+    FIELDS = {
+        'drivers': {'name': ''},
+        'vehicles': {'plate': '', 'kteo_passed': '', 'kteo_next': ''},
+        'trips': {'driver': '', 'vehicle': '', 'depart': '', 'arrive': '', 'details': ''},
+        'services': {'vehicle': '', 'date': '', 'details': ''},
+    }
+
+    def record_from(self, name, fields, base=None):
+        """A new record of fields over base (or the defaults), normalized like the forms"""
+        record = dict(base) if base is not None else dict(self.FIELDS[name])
+        for key in self.FIELDS[name]:
+            if key in fields:
+                record[key] = str(fields[key]).strip()
+        if name == 'vehicles':
+            record['plate'] = record['plate'].upper()
+        return record
+
+    def check(self, name, record, replacing=None, allow_overlap=False):
+        """Raise ValueError with the form's message if record may not be stored"""
+        if name == 'drivers':
+            if not record['name']:
+                raise ValueError("Συμπληρώστε όνομα οδηγού")
+            if any(d is not replacing and d['name'].lower() == record['name'].lower() for d in self.drivers):
+                raise ValueError("Ο οδηγός υπάρχει ήδη στο σύστημα")
+        elif name == 'vehicles':
+            if not record['plate']:
+                raise ValueError("Συμπληρώστε πινακίδα οχήματος")
+            if not validate_date(record['kteo_passed']):
+                raise ValueError("Μη έγκυρη ημερομηνία ΚΤΕΟ (YYYY-MM-DD)")
+            if not validate_date(record['kteo_next']):
+                raise ValueError("Μη έγκυρη ημερομηνία επόμενου ΚΤΕΟ (YYYY-MM-DD)")
+            if any(v is not replacing and v['plate'].upper() == record['plate'] for v in self.vehicles):
+                raise ValueError("Η πινακίδα υπάρχει ήδη στο σύστημα")
+        elif name == 'trips':
+            if not record['driver']:
+                raise ValueError("Επιλέξτε οδηγό")
+            if not record['vehicle']:
+                raise ValueError("Επιλέξτε όχημα")
+            for label, value in (("αναχώρησης", record['depart']), ("άφιξης", record['arrive'])):
+                date, _, time_ = value.partition(' ')
+                if not validate_date(date):
+                    raise ValueError(f"Μη έγκυρη ημερομηνία {label} (YYYY-MM-DD)")
+                if not validate_time(time_):
+                    raise ValueError(f"Μη έγκυρη ώρα {label} (HH:MM)")
+            interval = trip_interval(record)
+            if (not allow_overlap and interval is not None
+                    and self.bookings.check(record['driver'], record['vehicle'], *interval, exclude=replacing)):
+                raise ValueError("Η διαδρομή επικαλύπτεται με υπάρχουσα κράτηση οδηγού ή οχήματος")
+        elif name == 'services':
+            if not record['vehicle']:
+                raise ValueError("Επιλέξτε όχημα")
+            if not validate_date(record['date']):
+                raise ValueError("Μη έγκυρη ημερομηνία (YYYY-MM-DD)")
+            if not record['details']:
+                raise ValueError("Συμπληρώστε λεπτομέρειες service")
+        else:
+            raise KeyError(name)
+
+    def add(self, name, fields, allow_overlap=False):
+        records = getattr(self, name)
+        record = self.record_from(name, fields)
+        self.check(name, record, allow_overlap=allow_overlap)
+        record = {'id': self.next_id(records), **record}
+        records.append(record)
+        if name == 'trips':
+            self.bookings.add_trip(record)
+        return record
+
+    def update(self, name, row, fields, allow_overlap=False):
+        """Replace the record at row with a copy carrying the changed fields.
+
+        The old dict is left untouched, so a reader still holding it sees a
+        consistent record.
+        """
+        records = getattr(self, name)
+        old = records[row]
+        record = self.record_from(name, fields, base=old)
+        self.check(name, record, replacing=old, allow_overlap=allow_overlap)
+        records[row] = record
+        if name == 'trips':
+            self.bookings.remove_trip(old)
+            self.bookings.add_trip(record)
+        return record
+
+    def delete(self, name, row):
+        """Remove the record at row and renumber IDs, as the tables do"""
+        records = getattr(self, name)
+        record = records.pop(row)
+        if name == 'trips':
+            self.bookings.remove_trip(record)
+        for idx in range(row, len(records)):
+            records[idx]['id'] = idx + 1
+        return record
+
+    def add_driver(self, name):
+        return self.add('drivers', {'name': name})
+
+    def add_vehicle(self, plate, kteo_passed, kteo_next):
+        return self.add('vehicles', {'plate': plate, 'kteo_passed': kteo_passed, 'kteo_next': kteo_next})
+
+    def add_trip(self, driver, vehicle, depart, arrive, details='', allow_overlap=False):
+        """Add a trip; depart and arrive are 'YYYY-MM-DD HH:MM'"""
+        return self.add('trips', {'driver': driver, 'vehicle': vehicle, 'depart': depart,
+                                  'arrive': arrive, 'details': details}, allow_overlap)
+
+    def add_service(self, vehicle, date, details):
+        return self.add('services', {'vehicle': vehicle, 'date': date, 'details': details})
+
+    def kteo_statuses(self, today=None):
+        """[(vehicle, status key)] for the whole fleet"""
+        today = today or datetime.date.today()
+        statuses = kteo_status_batch([parse_date_ordinal(v['kteo_next']) for v in self.vehicles], today)
+        return list(zip(self.vehicles, statuses))
+
+    def search(self, query):
+        return search_records(query, self.collections())
+
+    def aggregates(self):
+        aggregates = FleetAggregates()
+        status = {v['plate']: s for v, s in self.kteo_statuses()}
+        aggregates.rebuild(status, self.trips, self.services)
+        return aggregates
+
+    def service_timeline(self):
+        timeline = ServiceTimeline()
+        timeline.rebuild(self.services)
+        return timeline
+
+    def compliance(self):
+        engine = ComplianceEngine()
+        engine.rebuild(self.trips)
+        return engine
+
+def cli_kteo(store, args):
+    worst = 0
+    for vehicle, status in store.kteo_statuses():
+        if args.all or status != "ok":
+            print(f"{vehicle['plate']}\t{vehicle['kteo_next']}\t{KTEO_STATUS_LABELS[status][0]}")
+        if status in ("expired", "error"):
+            worst = 1
+    return worst
+
+def cli_search(store, args):
+    labels = {'drivers': "ΟΔΗΓΟΣ", 'vehicles': "ΟΧΗΜΑ", 'trips': "ΔΙΑΔΡΟΜΗ", 'services': "SERVICE"}
+    for name, record in store.search(args.query):
+        fields = "\t".join(str(record.get(f, '')) for f in SEARCH_FIELDS[name])
+        print(f"{labels[name]}\t{record['id']}\t{fields}")
+    return 0
+
+def cli_export(store, args):
+    if args.collection == 'trips':
+        records = filter_trips(store.trips, args.date_from, args.date_to, args.driver, args.vehicle)
+    else:
+        records = filter_services(store.services, args.date_from, args.date_to, args.vehicle)
+    columns = EXPORT_COLUMNS[args.collection]
+    fmt = 'xlsx' if args.output.lower().endswith('.xlsx') else 'csv'
+    rows = ([r.get(key, '') for key, _ in columns] for r in records)
+    count = export_rows(args.output, fmt, [header for _, header in columns], rows)
+    print(f"{count} εγγραφές → {args.output}")
+    return 0
+
+def cli_report(store, args):
+    month_bounds(args.month)
+    statuses = [status for _, status in store.kteo_statuses()]
+    render_fleet_report(args.output, args.month, store.trips, store.vehicles, statuses,
+                        store.aggregates(), store.service_timeline())
+    print(args.output)
+    return 0
+
+def cli_check(store, args):
+    conflicts = store.bookings.conflicts()
+    violations = store.compliance().audit()
+    for line in describe_conflicts(conflicts):
+        print(line)
+    for violation in violations:
+        print(describe_violation(violation))
+    print(f"Επικαλύψεις: {len(conflicts)}, παραβάσεις ωραρίου: {len(violations)}")
+    return 1 if conflicts or violations else 0
+
+def cli_backup(store, args):
+    os.makedirs(args.folder, exist_ok=True)
+    if args.incremental:
+        name, stats = BackupStore(os.path.join(args.folder, INCREMENTAL_DIR)).backup(store.data_dir)
+        print(f"{name}: {stats['files']} αρχεία, {stats['objects']} νέα αντικείμενα")
+        return 0
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(args.folder, f"vehicle_backup_{timestamp}.zip")
+    files, size = zip_backup(store.data_dir, path, args.level)
+    print(f"{path}: {files} αρχεία, {size} bytes")
+    return 0
+
+def cli_verify(store, args):
+    workers = os.cpu_count() or 1
+    tasks, results = plan_verify(args.archives, workers)
+    if len(tasks) > 1 and workers > 1:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            outcomes = pool.starmap(verify_members, tasks)
+    else:
+        outcomes = [verify_members(*task) for task in tasks]
+    for path, checked, problems in outcomes:
+        results[path]['checked'] += checked
+        results[path]['problems'] += problems
+    print(verify_report(results))
+    return 1 if any(r['problems'] for r in results.values()) else 0
+
+def cli_import_csv(store, args):
+    sources = {name: getattr(args, name) for name in IMPORT_COLUMNS if getattr(args, name)}
+    if not sources:
+        raise ValueError("Δώστε τουλάχιστον ένα αρχείο CSV")
+    collections = store.collections()
+    plan = plan_csv_import(collections, sources)
+    print(csv_import_report(plan))
+    if args.dry_run:
+        return 1 if plan['errors'] else 0
+    for fname in sorted(apply_csv_import(collections, plan)):
+        if not store.save(fname[:-5]):
+            return 2
+    return 1 if plan['errors'] else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='vehicle_core', description="Διαχείριση κίνησης οχημάτων χωρίς γραφικό περιβάλλον")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="φάκελος δεδομένων (προεπιλογή: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    cmd = commands.add_parser('kteo', help="κατάσταση ΚΤΕΟ του στόλου (κωδικός εξόδου 1 αν υπάρχουν ληγμένα)")
+    cmd.add_argument('--all', action='store_true', help="και τα οχήματα που είναι εντάξει")
+    cmd.set_defaults(run=cli_kteo)
+    
+    cmd = commands.add_parser('search', help="αναζήτηση σε όλα τα δεδομένα")
+    cmd.add_argument('query')
+    cmd.set_defaults(run=cli_search)
+    
+    cmd = commands.add_parser('export', help="εξαγωγή διαδρομών ή service σε CSV/XLSX")
+    cmd.add_argument('collection', choices=sorted(EXPORT_COLUMNS))
+    cmd.add_argument('output', help="αρχείο .csv ή .xlsx")
+    cmd.add_argument('--from', dest='date_from')
+    cmd.add_argument('--to', dest='date_to')
+    cmd.add_argument('--driver')
+    cmd.add_argument('--vehicle')
+    cmd.set_defaults(run=cli_export)
+    
+    cmd = commands.add_parser('report', help="μηνιαία αναφορά στόλου σε PDF")
+    cmd.add_argument('month', help="YYYY-MM")
+    cmd.add_argument('output')
+    cmd.set_defaults(run=cli_report)
+    
+    cmd = commands.add_parser('check', help="έλεγχος επικαλύψεων και ωραρίου (κωδικός εξόδου 1 αν βρεθούν)")
+    cmd.set_defaults(run=cli_check)
+    
+    cmd = commands.add_parser('backup', help="δημιουργία backup")
+    cmd.add_argument('folder')
+    cmd.add_argument('--level', type=int, choices=[level for _, level in BACKUP_LEVELS], default=6)
+    cmd.add_argument('--incremental', action='store_true')
+    cmd.set_defaults(run=cli_backup)
+    
+    cmd = commands.add_parser('import-csv', help="μαζική εισαγωγή από CSV (κωδικός εξόδου 1 αν υπάρχουν σφάλματα)")
+    for name in IMPORT_COLUMNS:
+        cmd.add_argument(f'--{name}', metavar='CSV')
+    cmd.add_argument('--dry-run', action='store_true', help="μόνο έλεγχος, χωρίς αποθήκευση")
+    cmd.set_defaults(run=cli_import_csv)
+    
+    cmd = commands.add_parser('verify', help="έλεγχος ακεραιότητας αρχείων backup")
+    cmd.add_argument('archives', nargs='+')
+    cmd.set_defaults(run=cli_verify)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = FleetStore(args.data_dir)
+    try:
+        return args.run(store, args)
+    except (ValueError, OSError) as e:
+        log_error(f"CLI {args.command} error: {str(e)}")
+        print(f"Σφάλμα: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())